@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from py_wholebodymovement import JointTensor
+from py_wholebodymovement import StreamingAngleCalculator
+from py_wholebodymovement import compile_angle_schema
+from py_wholebodymovement import calculate_2d_articulated_figure_angle
+from py_wholebodymovement import calculate_2d_articulated_figure_angles
+from py_wholebodymovement import extend_2d_articulated_figure
+from py_wholebodymovement import calculate_3d_articulated_figure_angle
+from py_wholebodymovement import calculate_3d_articulated_figure_angles
+from py_wholebodymovement import extend_3d_articulated_figure
+
+from .common import SCHEMAS, N_FRAMES, SUFFIXES, make_skeleton
+
+class ArticulatedFigureSuite:
+    """Angle calculation and figure extension on synthetic skeletons of every predefined schema."""
+    params      = (list(SCHEMAS), N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        self.n_dims, joint_names, self.dims, self.angles = SCHEMAS[schema]
+        self.raw    = make_skeleton(schema, n_frames)
+        self.data   = make_skeleton(schema, n_frames, extended=True)
+        self.tensor = JointTensor.from_dataframe(self.data, suffixes=SUFFIXES[:self.n_dims])
+        self.schema = compile_angle_schema(self.angles)
+        self.angle  = next(iter(self.angles.values()))[:3]
+
+    def _calculate_angles(self, data, dtype=None):
+        if self.n_dims == 2:
+            return calculate_2d_articulated_figure_angles(data, self.schema, dtype=dtype)
+        return calculate_3d_articulated_figure_angles(data, self.schema, dtype=dtype)
+
+    def time_compile_angle_schema(self, schema, n_frames):
+        compile_angle_schema(self.angles)
+
+    def time_calculate_2d_articulated_figure_angle(self, schema, n_frames):
+        calculate_2d_articulated_figure_angle(self.data, *self.angle)
+
+    def peakmem_calculate_2d_articulated_figure_angle(self, schema, n_frames):
+        calculate_2d_articulated_figure_angle(self.data, *self.angle)
+
+    def time_calculate_articulated_figure_angles(self, schema, n_frames):
+        self._calculate_angles(self.data)
+
+    def peakmem_calculate_articulated_figure_angles(self, schema, n_frames):
+        self._calculate_angles(self.data)
+
+    def time_calculate_articulated_figure_angles_float32(self, schema, n_frames):
+        self._calculate_angles(self.data, 'float32')
+
+    def peakmem_calculate_articulated_figure_angles_float32(self, schema, n_frames):
+        self._calculate_angles(self.data, 'float32')
+
+    def time_calculate_articulated_figure_angles_joint_tensor(self, schema, n_frames):
+        self._calculate_angles(self.tensor)
+
+    def peakmem_calculate_articulated_figure_angles_joint_tensor(self, schema, n_frames):
+        self._calculate_angles(self.tensor)
+
+    def time_extend_articulated_figure(self, schema, n_frames):
+        if self.dims is not None:
+            (extend_2d_articulated_figure if self.n_dims == 2 else extend_3d_articulated_figure)(self.raw, self.dims)
+
+    def peakmem_extend_articulated_figure(self, schema, n_frames):
+        if self.dims is not None:
+            (extend_2d_articulated_figure if self.n_dims == 2 else extend_3d_articulated_figure)(self.raw, self.dims)
+
+    def time_joint_tensor_from_dataframe(self, schema, n_frames):
+        JointTensor.from_dataframe(self.data, suffixes=SUFFIXES[:self.n_dims])
+
+    def peakmem_joint_tensor_from_dataframe(self, schema, n_frames):
+        JointTensor.from_dataframe(self.data, suffixes=SUFFIXES[:self.n_dims])
+
+    def time_streaming_angle_calculator(self, schema, n_frames):
+        calculator = StreamingAngleCalculator(self.schema, n_dims=self.n_dims)
+        for start in range(0, n_frames, 1000):
+            calculator.push(self.tensor[start:start + 1000])
+
+    def peakmem_streaming_angle_calculator(self, schema, n_frames):
+        calculator = StreamingAngleCalculator(self.schema, n_dims=self.n_dims)
+        for start in range(0, n_frames, 1000):
+            calculator.push(self.tensor[start:start + 1000])
+
+class ArticulatedFigure3DSuite:
+    """Single 3D angle calculation on synthetic skeletons of the 3D schemas; skipped for the 2D schema."""
+    params      = (list(SCHEMAS), N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        n_dims, _, _, angles = SCHEMAS[schema]
+        if n_dims != 3:
+            raise NotImplementedError("schema %s is not 3D"%schema)
+        self.data   = make_skeleton(schema, n_frames, extended=True)
+        self.angle  = next(iter(angles.values()))[:3]
+
+    def time_calculate_3d_articulated_figure_angle(self, schema, n_frames):
+        calculate_3d_articulated_figure_angle(self.data, *self.angle)
+
+    def peakmem_calculate_3d_articulated_figure_angle(self, schema, n_frames):
+        calculate_3d_articulated_figure_angle(self.data, *self.angle)
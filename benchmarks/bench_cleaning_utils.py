@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+
+from py_wholebodymovement import clean_gaussian_outliers
+from py_wholebodymovement import clean_dimensions_gaussian_outliers
+from py_wholebodymovement import denoise_data
+from py_wholebodymovement import resample_data
+from py_wholebodymovement import iter_resampled_data
+
+from .common import SCHEMAS, N_FRAMES, make_skeleton
+
+class CleaningUtilsSuite:
+    """Outlier cleaning and wavelet denoising of the coordinates of synthetic skeletons."""
+    params      = (list(SCHEMAS), N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        self.data   = make_skeleton(schema, n_frames)
+        self.values = self.data.to_numpy()
+        self.sig    = self.values[:, 0].copy()
+
+    def time_clean_gaussian_outliers(self, schema, n_frames):
+        clean_gaussian_outliers(self.sig)
+
+    def peakmem_clean_gaussian_outliers(self, schema, n_frames):
+        clean_gaussian_outliers(self.sig)
+
+    def time_clean_gaussian_outliers_rolling(self, schema, n_frames):
+        clean_gaussian_outliers(self.sig, window=301)
+
+    def time_clean_dimensions_gaussian_outliers(self, schema, n_frames):
+        clean_dimensions_gaussian_outliers(self.data)
+
+    def peakmem_clean_dimensions_gaussian_outliers(self, schema, n_frames):
+        clean_dimensions_gaussian_outliers(self.data)
+
+    def time_denoise_data(self, schema, n_frames):
+        denoise_data(self.sig, haarlevel=2, shrinking_factor=1)
+
+    def peakmem_denoise_data(self, schema, n_frames):
+        denoise_data(self.sig, haarlevel=2, shrinking_factor=1)
+
+    def time_denoise_data_channels(self, schema, n_frames):
+        denoise_data(self.values, haarlevel=2, shrinking_factor=1)
+
+    def peakmem_denoise_data_channels(self, schema, n_frames):
+        denoise_data(self.values, haarlevel=2, shrinking_factor=1)
+
+class ResamplingSuite:
+    """Resampling of synthetic skeletons captured at jittered timestamps with 5% of the frames dropped, whole or in chunks."""
+    params      = (list(SCHEMAS), N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        rs          = np.random.RandomState(0)
+        data        = make_skeleton(schema, n_frames)
+        data.insert(0, 'Timestamp', (np.arange(n_frames) + rs.uniform(-0.3, 0.3, size=n_frames)) / 30.)
+        self.data   = data[rs.uniform(size=n_frames) > 0.05].reset_index(drop=True)
+
+    def _iter_chunks(self):
+        for start in range(0, len(self.data), 10000):
+            yield self.data.iloc[start:start + 10000]
+
+    def time_resample_data(self, schema, n_frames):
+        resample_data(self.data, 30.)
+
+    def peakmem_resample_data(self, schema, n_frames):
+        resample_data(self.data, 30.)
+
+    def time_resample_data_cubic(self, schema, n_frames):
+        resample_data(self.data, 30., max_gap=0.2, method='cubic')
+
+    def time_iter_resampled_data(self, schema, n_frames):
+        for _ in iter_resampled_data(self._iter_chunks(), 30.):
+            pass
+
+    def peakmem_iter_resampled_data(self, schema, n_frames):
+        for _ in iter_resampled_data(self._iter_chunks(), 30.):
+            pass
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import pandas as pd
+
+from py_wholebodymovement import detect_gait_cycles
+from py_wholebodymovement import normalize_gait_cycles
+from py_wholebodymovement import calculate_gait_cycle_synchrony_measures
+
+from .common import N_FRAMES, make_skeleton, make_angles
+
+class GaitSuite:
+    """Gait event detection and per-cycle measures of synthetic skeletons; only the schemas with ankles and feet."""
+    params      = (['1', '3'], N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        angles      = make_angles(schema, n_frames)
+        self.data   = pd.concat([make_skeleton(schema, n_frames), angles], axis=1)
+        self.dims   = list(angles.columns[:2])
+        self.cycles = detect_gait_cycles(self.data).cycles('Right')
+
+    def time_detect_gait_cycles(self, schema, n_frames):
+        detect_gait_cycles(self.data)
+
+    def peakmem_detect_gait_cycles(self, schema, n_frames):
+        detect_gait_cycles(self.data)
+
+    def time_normalize_gait_cycles(self, schema, n_frames):
+        normalize_gait_cycles(self.data, self.dims, self.cycles)
+
+    def peakmem_normalize_gait_cycles(self, schema, n_frames):
+        normalize_gait_cycles(self.data, self.dims, self.cycles)
+
+    def time_calculate_gait_cycle_synchrony_measures(self, schema, n_frames):
+        calculate_gait_cycle_synchrony_measures(self.data, self.dims, self.cycles)
+
+    def peakmem_calculate_gait_cycle_synchrony_measures(self, schema, n_frames):
+        calculate_gait_cycle_synchrony_measures(self.data, self.dims, self.cycles)
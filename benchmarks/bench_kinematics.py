@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from py_wholebodymovement import JointTensor
+from py_wholebodymovement import StreamingKinematicsCalculator
+from py_wholebodymovement import calculate_joint_kinematics
+from py_wholebodymovement import calculate_angle_kinematics
+
+from .common import SCHEMAS, N_FRAMES, SUFFIXES, make_skeleton, make_angles
+
+class KinematicsSuite:
+    """Velocity, acceleration and jerk of all the joints of synthetic skeletons."""
+    params      = (list(SCHEMAS), N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        n_dims, joint_names, _, _ = SCHEMAS[schema]
+        self.data   = JointTensor.from_dataframe(make_skeleton(schema, n_frames), joint_names, SUFFIXES[:n_dims])
+        self.angles = make_angles(schema, n_frames)
+
+    def time_calculate_joint_kinematics(self, schema, n_frames):
+        calculate_joint_kinematics(self.data, sampling_rate=30., suffixes=self.data.suffixes)
+
+    def peakmem_calculate_joint_kinematics(self, schema, n_frames):
+        calculate_joint_kinematics(self.data, sampling_rate=30., suffixes=self.data.suffixes)
+
+    def time_calculate_joint_kinematics_savgol(self, schema, n_frames):
+        calculate_joint_kinematics(self.data, sampling_rate=30., method='savgol', window_length=9, suffixes=self.data.suffixes)
+
+    def time_calculate_angle_kinematics(self, schema, n_frames):
+        calculate_angle_kinematics(self.angles, sampling_rate=30.)
+
+    def peakmem_calculate_angle_kinematics(self, schema, n_frames):
+        calculate_angle_kinematics(self.angles, sampling_rate=30.)
+
+    def time_streaming_kinematics_calculator(self, schema, n_frames):
+        calculator = StreamingKinematicsCalculator(self.data.joint_names, sampling_rate=30., suffixes=self.data.suffixes)
+        for start in range(0, n_frames, 1000):
+            calculator.push(self.data[start:start + 1000])
+        calculator.flush()
+
+    def peakmem_streaming_kinematics_calculator(self, schema, n_frames):
+        calculator = StreamingKinematicsCalculator(self.data.joint_names, sampling_rate=30., suffixes=self.data.suffixes)
+        for start in range(0, n_frames, 1000):
+            calculator.push(self.data[start:start + 1000])
+        calculator.flush()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from py_wholebodymovement import run_pipeline
+from py_wholebodymovement import calculate_2d_articulated_figure_angles
+from py_wholebodymovement import calculate_3d_articulated_figure_angles
+from py_wholebodymovement import calculate_cohort_articulated_figure_angles
+from py_wholebodymovement.session import Session
+
+from .common import SCHEMAS, N_FRAMES, make_skeleton
+
+class PipelineSuite:
+    """Feature extraction over a cohort of 10 sessions sharing `n_frames` frames of synthetic skeletons."""
+    params      = (list(SCHEMAS), N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        n_dims, _, dims, angles = SCHEMAS[schema]
+        data          = make_skeleton(schema, n_frames)
+        n_session     = n_frames // 10
+        self.sessions = [Session('s%d'%sidx, data.iloc[sidx*n_session:(sidx + 1)*n_session]) for sidx in range(10)]
+        self.stages   = ([] if dims is None else [('extend_%dd'%n_dims, {'dims': dims})]) + \
+                        [('angles_%dd'%n_dims, {'angles': angles}), 'clean', ('phase_locking_value', {'dims': [list(angles)[:2]]})]
+
+    def time_run_pipeline(self, schema, n_frames):
+        run_pipeline(self.sessions, self.stages)
+
+    def peakmem_run_pipeline(self, schema, n_frames):
+        run_pipeline(self.sessions, self.stages)
+
+class CohortAnglesSuite:
+    """Angles of a cohort of 200 short sessions of synthetic skeletons, at once or one session at a time."""
+    params      = (list(SCHEMAS), [50, 500])
+    param_names = ['schema', 'n_session_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_session_frames):
+        n_dims, _, _, angles = SCHEMAS[schema]
+        data          = make_skeleton(schema, 200*n_session_frames, extended=True)
+        self.sessions = [Session('s%d'%sidx, data.iloc[sidx*n_session_frames:(sidx + 1)*n_session_frames]) for sidx in range(200)]
+        self.n_dims   = n_dims
+        self.angles   = angles
+
+    def time_calculate_cohort_articulated_figure_angles(self, schema, n_session_frames):
+        calculate_cohort_articulated_figure_angles(self.sessions, self.angles, self.n_dims)
+
+    def time_calculate_session_articulated_figure_angles(self, schema, n_session_frames):
+        calculate = calculate_2d_articulated_figure_angles if self.n_dims == 2 else calculate_3d_articulated_figure_angles
+        for session in self.sessions:
+            calculate(session._data, self.angles)
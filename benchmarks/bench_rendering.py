@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import os
+import shutil
+import tempfile
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement import iter_skeleton_frames
+from py_wholebodymovement import render_skeleton_animation
+
+from .common import SCHEMAS, make_skeleton
+
+_BONES = {'1': psc._BONES_1, '2': psc._BONES_2, '3': psc._BONES_3}
+
+class RenderingSuite:
+    """Headless rendering of 1000 frames of synthetic skeletons, every frame or every 4th one."""
+    params      = (list(SCHEMAS), [1, 4])
+    param_names = ['schema', 'step']
+    timeout     = 600
+
+    def setup(self, schema, step):
+        self.data   = make_skeleton(schema, 1000)
+
+    def time_iter_skeleton_frames(self, schema, step):
+        for _ in iter_skeleton_frames(self.data, _BONES[schema], step=step, size=(320, 240)):
+            pass
+
+    def peakmem_iter_skeleton_frames(self, schema, step):
+        for _ in iter_skeleton_frames(self.data, _BONES[schema], step=step, size=(320, 240)):
+            pass
+
+class RenderingAnimationSuite:
+    """Encoding 1000 frames of synthetic skeletons into a video and a GIF with ffmpeg; skipped without ffmpeg."""
+    params      = (list(SCHEMAS), ['mp4', 'gif'])
+    param_names = ['schema', 'format']
+    timeout     = 600
+
+    def setup(self, schema, format):
+        if shutil.which('ffmpeg') is None:
+            raise NotImplementedError("ffmpeg not installed")
+        self.data    = make_skeleton(schema, 1000)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path    = os.path.join(self.tmp_dir.name, 'skeleton.' + format)
+
+    def teardown(self, schema, format):
+        self.tmp_dir.cleanup()
+
+    def time_render_skeleton_animation(self, schema, format):
+        render_skeleton_animation(self.data, _BONES[schema], self.path, size=(320, 240))
+
+    def peakmem_render_skeleton_animation(self, schema, format):
+        render_skeleton_animation(self.data, _BONES[schema], self.path, size=(320, 240))
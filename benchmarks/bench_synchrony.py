@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from py_wholebodymovement import calculate_phase_locking_value
+from py_wholebodymovement import iter_windowed_phase_locking_values
+from py_wholebodymovement import calculate_windowed_phase_locking_value
+from py_wholebodymovement import calculate_phase_angles
+from py_wholebodymovement import calculate_phase_angle_measures
+from py_wholebodymovement import calculate_fft_based_synchrony_measures
+from py_wholebodymovement import calculate_synchrony_matrices
+
+from .common import SCHEMAS, N_FRAMES, make_angles
+
+class SynchronySuite:
+    """PLV, phase angle and FFT based synchrony measures of synthetic angle signals of every predefined schema."""
+    params      = (list(SCHEMAS), N_FRAMES)
+    param_names = ['schema', 'n_frames']
+    timeout     = 600
+
+    def setup(self, schema, n_frames):
+        self.data = make_angles(schema, n_frames)
+        self.dims = tuple(self.data.columns[:2])
+
+    def time_calculate_phase_locking_value(self, schema, n_frames):
+        calculate_phase_locking_value(self.data, self.dims)
+
+    def peakmem_calculate_phase_locking_value(self, schema, n_frames):
+        calculate_phase_locking_value(self.data, self.dims)
+
+    def time_iter_windowed_phase_locking_values(self, schema, n_frames):
+        for _ in iter_windowed_phase_locking_values(self.data, self.dims, 256, 128):
+            pass
+
+    def time_calculate_windowed_phase_locking_value(self, schema, n_frames):
+        calculate_windowed_phase_locking_value(self.data, self.dims, 256, 128)
+
+    def peakmem_calculate_windowed_phase_locking_value(self, schema, n_frames):
+        calculate_windowed_phase_locking_value(self.data, self.dims, 256, 128)
+
+    def time_calculate_phase_angles(self, schema, n_frames):
+        calculate_phase_angles(self.data, self.dims[0])
+
+    def peakmem_calculate_phase_angles(self, schema, n_frames):
+        calculate_phase_angles(self.data, self.dims[0])
+
+    def time_calculate_phase_angle_measures(self, schema, n_frames):
+        calculate_phase_angle_measures(self.data, self.dims)
+
+    def peakmem_calculate_phase_angle_measures(self, schema, n_frames):
+        calculate_phase_angle_measures(self.data, self.dims)
+
+    def time_calculate_fft_based_synchrony_measures(self, schema, n_frames):
+        calculate_fft_based_synchrony_measures(self.data, self.dims)
+
+    def peakmem_calculate_fft_based_synchrony_measures(self, schema, n_frames):
+        calculate_fft_based_synchrony_measures(self.data, self.dims)
+
+    def time_calculate_synchrony_matrices(self, schema, n_frames):
+        calculate_synchrony_matrices(self.data)
+
+    def peakmem_calculate_synchrony_matrices(self, schema, n_frames):
+        calculate_synchrony_matrices(self.data)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.articulated_figure import extend_2d_articulated_figure
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+
+# schema name -> (number of dimensions, joint names, extended joints, angles)
+SCHEMAS = {
+    '1': (3, psc._JOINT_NAMES_1, None, psc._ARTICULATED_FIGURE_ANGLES_1),
+    '2': (2, psc._JOINT_NAMES_2, psc._EXTENDED_JOINT_NAMES_2, psc._ARTICULATED_FIGURE_ANGLES_2),
+    '3': (3, psc._JOINT_NAMES_3, psc._EXTENDED_JOINT_NAMES_3, psc._ARTICULATED_FIGURE_ANGLES_3),
+}
+
+N_FRAMES = [1000, 100000, 1000000]
+
+SUFFIXES = ['_X', '_Y', '_Z']
+
+def make_skeleton(schema, n_frames, extended=False, seed=0):
+    """A synthetic recording of `n_frames` frames of the joints of `schema`: every joint sways around a fixed
+    position with its own gait-like frequency and phase, plus measurement noise."""
+    n_dims, joint_names, dims, _ = SCHEMAS[schema]
+    rs       = np.random.RandomState(seed)
+    t        = np.arange(n_frames) / 30.
+    columns  = [jn + dn for jn, dn in itertools.product(joint_names, SUFFIXES[:n_dims])]
+    base     = rs.uniform(-1., 1., size=len(columns))
+    freqs    = rs.uniform(0.5, 2., size=len(columns))
+    phases   = rs.uniform(0., 2.*np.pi, size=len(columns))
+    data     = base + 0.1*np.sin(2.*np.pi*freqs*t[:, None] + phases) + rs.normal(scale=0.01, size=(n_frames, len(columns)))
+    df       = pd.DataFrame(data, columns=columns)
+
+    if extended and dims is not None:
+        df = (extend_2d_articulated_figure if n_dims == 2 else extend_3d_articulated_figure)(df, dims)
+    return df
+
+def make_angles(schema, n_frames, seed=0):
+    """Synthetic angle signals named after the angles of `schema`."""
+    angle_names = list(SCHEMAS[schema][3])
+    rs          = np.random.RandomState(seed)
+    t           = np.arange(n_frames) / 30.
+    freqs       = rs.uniform(0.5, 2., size=len(angle_names))
+    phases      = rs.uniform(0., 2.*np.pi, size=len(angle_names))
+    data        = 90. + 30.*np.sin(2.*np.pi*freqs*t[:, None] + phases) + rs.normal(size=(n_frames, len(angle_names)))
+    return pd.DataFrame(data, columns=angle_names)
@@ -17,22 +17,47 @@
 # Dev branch marker is: 'X.Y.dev' or 'X.Y.devN' where N is an integer.
 # 'X.Y.dev0' is the canonical version of 'X.Y.dev'
 #
-__version__ = '0.1.1'
+__version__ = '0.1.2'
 
+from py_wholebodymovement.joint_tensor import JointTensor
+
+from py_wholebodymovement.articulated_figure import compile_angle_schema
 from py_wholebodymovement.articulated_figure import calculate_2d_articulated_figure_angle
 from py_wholebodymovement.articulated_figure import calculate_2d_articulated_figure_angles
 from py_wholebodymovement.articulated_figure import extend_2d_articulated_figure
 from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angle
 from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
 from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.articulated_figure import calculate_cohort_articulated_figure_angles
 
 from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+from py_wholebodymovement.articulated_figure import iter_windowed_phase_locking_values
+from py_wholebodymovement.articulated_figure import calculate_windowed_phase_locking_value
 from py_wholebodymovement.articulated_figure import calculate_phase_angles
 from py_wholebodymovement.articulated_figure import calculate_phase_angle_measures
 from py_wholebodymovement.articulated_figure import calculate_fft_based_synchrony_measures
+from py_wholebodymovement.articulated_figure import calculate_synchrony_matrices
+
+from py_wholebodymovement.streaming import StreamingAngleCalculator
+from py_wholebodymovement.streaming import StreamingKinematicsCalculator
+
+from py_wholebodymovement.kinematics import calculate_joint_kinematics
+from py_wholebodymovement.kinematics import calculate_angle_kinematics
+
+from py_wholebodymovement.gait import GaitCycleIndex
+from py_wholebodymovement.gait import detect_gait_cycles
+from py_wholebodymovement.gait import normalize_gait_cycles
+from py_wholebodymovement.gait import calculate_gait_cycle_synchrony_measures
+
+from py_wholebodymovement.pipeline import run_pipeline
+
+from py_wholebodymovement.rendering import iter_skeleton_frames
+from py_wholebodymovement.rendering import render_skeleton_animation
 
 import py_wholebodymovement.utils.predefined_schemas as predefined_schemas
 
 from py_wholebodymovement.utils.cleaning_utils import clean_gaussian_outliers
 from py_wholebodymovement.utils.cleaning_utils import clean_dimensions_gaussian_outliers
 from py_wholebodymovement.utils.cleaning_utils import denoise_data
+from py_wholebodymovement.utils.cleaning_utils import resample_data
+from py_wholebodymovement.utils.cleaning_utils import iter_resampled_data
@@ -1,18 +1,264 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+from collections import namedtuple
+
 import numpy as np
 import pandas as pd
+import scipy.fft as spfft
 import scipy.signal as spsig
 
+from py_wholebodymovement.joint_tensor import JointTensor
 from py_wholebodymovement.utils.cleaning_utils import clean_gaussian_outliers
+from py_wholebodymovement.utils.cleaning_utils import _clean_array_gaussian_outliers
+from py_wholebodymovement.utils.profiling import instrumented
+
+_ANGLES_BLOCK_SIZE = 8192
+
+CompiledAngleSchema = namedtuple('CompiledAngleSchema', ['angle_names', 'joint_names', 'vertices', 'ends1', 'ends2', 'signs', 'pos_angles'])
+CompiledAngleSchema.__doc__ = """Articulated figure angle specification compiled into index arrays by `compile_angle_schema`.
+
+    Attributes:
+        angle_names: list, names of the angles in the order of the output columns
+        joint_names: list, names of the distinct points of interest (POIs) used by the angles
+        vertices: ndarray, index of the vertex POI of each angle in `joint_names`
+        ends1: ndarray, index of the first end point of each angle in `joint_names`
+        ends2: ndarray, index of the second end point of each angle in `joint_names`
+        signs: ndarray, clockwise/counterclockwise direction (`z_dir`) of each angle
+        pos_angles: ndarray, whether each angle should be mapped to :math:`[0, 360)`
+"""
+
+def compile_angle_schema(angles):
+    """Compile the articulated figure angles specification `angles`, e.g. `predefined_schemas._ARTICULATED_FIGURE_ANGLES_3`,
+    into index arrays so that all the angles can be calculated in a single batched operation.
 
-def calculate_2d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, z_dir=1, pos_angles=True, x_suffix='_X', y_suffix='_Y'):
+    Args:
+        angles: dict, specification of the articulated figure angles to be calculated, or an already compiled schema
+
+    Returns:
+        a `CompiledAngleSchema` of the angles in `angles`
+    """
+    if isinstance(angles, CompiledAngleSchema):
+        return angles
+    if angles is None or not isinstance(angles, dict):
+        raise TypeError("Invalid angles.")
+
+    joint_names = []
+    joint_idxs  = {}
+    specs       = []
+
+    for angle_name in angles:
+        o_dim, e1_dim, e2_dim, z_dir, pos_angles = angles[angle_name]
+        if o_dim  is None or o_dim  == "" or \
+           e1_dim is None or e1_dim == "" or \
+           e2_dim is None or e2_dim == "":
+            raise TypeError("Invalid dimension name(s).")
+        for dim in (o_dim, e1_dim, e2_dim):
+            if dim not in joint_idxs:
+                joint_idxs[dim] = len(joint_names)
+                joint_names.append(dim)
+        specs.append((joint_idxs[o_dim], joint_idxs[e1_dim], joint_idxs[e2_dim], z_dir, pos_angles))
+
+    specs = list(zip(*specs)) if len(specs) > 0 else 5*[()]
+
+    return CompiledAngleSchema(angle_names=list(angles),
+                               joint_names=joint_names,
+                               vertices=np.array(specs[0], dtype=np.intp),
+                               ends1=np.array(specs[1], dtype=np.intp),
+                               ends2=np.array(specs[2], dtype=np.intp),
+                               signs=np.array(specs[3], dtype=np.float64),
+                               pos_angles=np.array(specs[4], dtype=bool))
+
+def _get_compute_dtype(df, dtype):
+    """The floating point type the calculations on `df` are done in: `dtype` if given, else the type of 
+    a `JointTensor` input and float64 for any other input.
+    """
+    if dtype is None:
+        dtype = df.data.dtype if isinstance(df, JointTensor) else np.float64
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise TypeError("Invalid dtype %s; float32 or float64 expected."%str(dtype))
+    return dtype
+
+def _get_dimension_coordinates(df, dim, suffixes, dtype=np.float64):
+    """Extract the coordinates of the point of interest `dim` as a `(len(suffixes), n_frames)` array of type `dtype`. 
+    For a `JointTensor` of that type this is a view of its buffer.
+    """
+    if isinstance(df, JointTensor):
+        return df.joint(dim)[:, df.suffix_indexer(suffixes)].T.astype(dtype, copy=False)
+    return np.ascontiguousarray(df.loc[:, [dim + suffix for suffix in suffixes]].to_numpy(dtype=dtype).T)
+
+def _gather_joint_coordinates(df, joint_names, suffixes, dtype=np.float64):
+    """Extract the coordinates of all the points of interest in `joint_names` as one `(n_frames, n_joints, len(suffixes))` array."""
+    columns = [jn + suffix for jn in joint_names for suffix in suffixes]
+    return df.loc[:, columns].to_numpy(dtype=dtype).reshape(df.shape[0], len(joint_names), len(suffixes))
+
+def _get_schema_coordinates(df, schema, suffixes, dtype=np.float64):
+    """Extract the coordinates needed by the compiled `schema` as a `(n_frames, n_joints, len(suffixes))` array 
+    along with the schema indexing its joints axis. A `JointTensor` is used as is, by remapping the schema 
+    onto its joints instead of gathering them, and is only converted to `dtype` block by block later on.
+    """
+    if isinstance(df, JointTensor):
+        jidxs  = np.array([df.joint_index(jn) for jn in schema.joint_names], dtype=np.intp)
+        schema = schema._replace(joint_names=df.joint_names, 
+                                 vertices=jidxs[schema.vertices], ends1=jidxs[schema.ends1], ends2=jidxs[schema.ends2])
+        return df.data[:, :, df.suffix_indexer(suffixes)], schema
+    return _gather_joint_coordinates(df, schema.joint_names, suffixes, dtype), schema
+
+def _get_signals(df, dims):
+    """Extract the time series `dims` of `df` as the columns of one `(n_frames, len(dims))` float array."""
+    if isinstance(df, JointTensor):
+        return np.stack([df.coordinate(dim) for dim in dims], axis=1).astype(np.float64, copy=False)
+    return df.loc[:, list(dims)].to_numpy(dtype=np.float64)
+
+def _get_signal(df, dim):
+    """Extract the time series `dim` of `df`; for a `JointTensor`, `dim` is a coordinate name such as 'Head_X'."""
+    if isinstance(df, JointTensor):
+        return df.coordinate(dim)
+    return df.loc[:, dim].values
+
+def _raise_nan_theta(thetas, o_e1_vecs, o_e2_vecs):
+    """Raise a `ValueError` for the first nan value in `thetas`, if any."""
+    nan_idx = np.argwhere(np.isnan(thetas))
+    if nan_idx.shape[0] > 0:
+        nan_idx = (slice(None),) + tuple(nan_idx[0])
+        raise ValueError("nan theta value for vectors " + str(tuple(o_e1_vecs[nan_idx].tolist())) + 
+                         " and " + str(tuple(o_e2_vecs[nan_idx].tolist())))
+
+def _get_coverage(values):
+    """The fraction of the non-nan values of `values` along its first axis, or of the true values of a boolean mask."""
+    if values.shape[0] == 0:
+        return np.zeros(values.shape[1:]) if values.ndim > 1 else 0.
+    valid = values if values.dtype == bool else ~np.isnan(values)
+    return np.count_nonzero(valid, axis=0) / values.shape[0]
+
+def _get_valid_frames(sigs):
+    """The frames in which all the signals in the columns of the `(n_frames, n_signals)` array `sigs` are finite."""
+    return np.all(np.isfinite(sigs), axis=1)
+
+def _unmask_frames(values, valid):
+    """Scatter the per-frame `values` calculated on the `valid` frames only back to all the frames, with nan in the others.
+    Values that are not per-frame arrays are returned as is."""
+    if not isinstance(values, np.ndarray) or values.ndim == 0 or values.shape[0] != np.count_nonzero(valid) or np.all(valid):
+        return values
+    res = np.full((valid.shape[0],) + values.shape[1:], np.nan, dtype=np.result_type(values.dtype, np.float32))
+    res[valid] = values
+    return res
+
+def _calculate_2d_angles(o_e1_vecs, o_e2_vecs, z_dirs=1, pos_angles=True, check_nan=True):
+    """Calculate the signed angles between the vectors `o_e1_vecs` and `o_e2_vecs` for all frames at once. 
+    The vectors are given component-first, i.e. as `(2, ...)` arrays, and `z_dirs` and `pos_angles` 
+    are broadcast against the remaining axes. Unless `check_nan` is True, missing angles are left as nan.
+    """
+    cc      = o_e1_vecs[0]*o_e2_vecs[1] - o_e1_vecs[1]*o_e2_vecs[0]
+    # adding 0. turns the -0. terms of degenerate (e.g. coincident joints) frames into 0., as in `_calculate_3d_angles`
+    _thetas = np.arctan2(cc*z_dirs + 0., 
+                         o_e1_vecs[0]*o_e2_vecs[0] + o_e1_vecs[1]*o_e2_vecs[1] + 0.
+                        )*180./np.pi
+    thetas  = np.where(np.logical_and(pos_angles, _thetas < 0), 360. + _thetas, _thetas)
+    if check_nan:
+        _raise_nan_theta(thetas, o_e1_vecs, o_e2_vecs)
+
+    return thetas
+
+def _calculate_3d_angles(o_e1_vecs, o_e2_vecs, pos_angles=True, check_nan=True):
+    """Calculate the angles between the vectors `o_e1_vecs` and `o_e2_vecs` for all frames at once. 
+    The vectors are given component-first, i.e. as `(3, ...)` arrays, and `pos_angles` is broadcast 
+    against the remaining axes. Unless `check_nan` is True, missing angles are left as nan.
+    """
+    cc_x    = o_e1_vecs[1]*o_e2_vecs[2] - o_e1_vecs[2]*o_e2_vecs[1]
+    cc_y    = o_e1_vecs[2]*o_e2_vecs[0] - o_e1_vecs[0]*o_e2_vecs[2]
+    cc_z    = o_e1_vecs[0]*o_e2_vecs[1] - o_e1_vecs[1]*o_e2_vecs[0]
+    # adding 0. turns the -0. dot products of degenerate (e.g. coincident joints) frames into 0., so that arctan2
+    # gives 0, as the per-frame dot product does, rather than 180
+    _thetas = np.arctan2(np.sqrt(cc_x*cc_x + cc_y*cc_y + cc_z*cc_z),
+                         o_e1_vecs[0]*o_e2_vecs[0] + o_e1_vecs[1]*o_e2_vecs[1] + o_e1_vecs[2]*o_e2_vecs[2] + 0.
+                        )*180./np.pi
+    thetas  = np.where(np.logical_and(pos_angles, _thetas <= 0), 360. + _thetas, _thetas)
+    if check_nan:
+        _raise_nan_theta(thetas, o_e1_vecs, o_e2_vecs)
+
+    return thetas
+
+def _calculate_schema_angles(coords, schema, face=1, block_size=_ANGLES_BLOCK_SIZE, dtype=None, check_nan=True):
+    """Calculate all the angles of the compiled `schema` on the `(n_frames, n_joints, n_dims)` array `coords`,
+    whose joints axis follows `schema.joint_names`, in one broadcasted operation per block of `block_size` frames. 
+    Blocking keeps the intermediate vectors in cache. All the calculations are done in `dtype`, by default that of `coords`.
+
+    Returns:
+        a `(n_frames, n_angles)` array of the angles
+    """
+    dtype      = coords.dtype if dtype is None else dtype
+    thetas     = np.empty((len(schema.angle_names), coords.shape[0]), dtype=dtype)
+    signs      = (schema.signs[:, None]*face).astype(dtype)
+    pos_angles = schema.pos_angles[:, None]
+
+    for start in range(0, coords.shape[0], block_size):
+        block     = np.ascontiguousarray(coords[start:start + block_size].transpose(2, 1, 0), dtype=dtype)
+        o_vecs    = block[:, schema.vertices]
+        o_e1_vecs = block[:, schema.ends1] - o_vecs
+        o_e2_vecs = block[:, schema.ends2] - o_vecs
+        if block.shape[0] == 2:
+            thetas[:, start:start + block_size] = _calculate_2d_angles(o_e1_vecs, o_e2_vecs, signs, pos_angles, check_nan)
+        else:
+            thetas[:, start:start + block_size] = _calculate_3d_angles(o_e1_vecs, o_e2_vecs, pos_angles, check_nan)
+    return thetas.T
+
+def _extend_articulated_figure(df, dims, copy, suffixes, dtype=None):
+    """Calculate all the extra points of interest (POIs) specified by `dims` in one batched operation. Each entry of 
+    `dims` holds a pair of existing POIs per coordinate suffix in `suffixes`, and the new POI is their midpoint.
+    """
+    dtype = _get_compute_dtype(df, dtype)
+    if dims is None or not isinstance(dims, dict):
+        raise TypeError("Invalid dimension(s).")
+    if len(dims) == 0:
+        return df
+
+    for dim_name in dims:
+        if len(dims[dim_name]) != 2*len(suffixes):
+            raise ValueError("Need %d dimensions to compute %s; %d provided."%(2*len(suffixes), dim_name, len(dims[dim_name])))
+
+    if isinstance(df, JointTensor):
+        return _extend_joint_tensor(df, dims, suffixes, dtype)
+
+    columns   = []
+    e1_cols   = []
+    e2_cols   = []
+    for dim_name in dims:
+        for sidx, suffix in enumerate(suffixes):
+            columns.append(dim_name + suffix)
+            e1_cols.append(dims[dim_name][2*sidx] + suffix)
+            e2_cols.append(dims[dim_name][2*sidx + 1] + suffix)
+
+    values    = (df.loc[:, e1_cols].to_numpy(dtype=dtype) + df.loc[:, e2_cols].to_numpy(dtype=dtype)) / 2.
+
+    res = df.copy() if copy else df
+    res[columns] = values
+
+    return res
+
+def _extend_joint_tensor(jt, dims, suffixes, dtype):
+    """`JointTensor` counterpart of `_extend_articulated_figure`. The coordinates of the new POIs that are 
+    not listed in `suffixes` are set to nan, and the extended tensor is of type `dtype`.
+    """
+    if jt.data.dtype != dtype:
+        jt = JointTensor(jt.data, jt.joint_names, jt.suffixes, index=jt.index, dtype=dtype)
+    sidxs   = [jt.suffix_indexer([suffix]).start for suffix in suffixes]
+    e1_idxs = np.array([[jt.joint_index(dims[dim_name][2*k]) for k in range(len(suffixes))] for dim_name in dims], dtype=np.intp)
+    e2_idxs = np.array([[jt.joint_index(dims[dim_name][2*k + 1]) for k in range(len(suffixes))] for dim_name in dims], dtype=np.intp)
+
+    values  = np.full((jt.shape[0], len(dims), jt.shape[2]), np.nan, dtype=jt.data.dtype)
+    values[:, :, sidxs] = (jt.data[:, e1_idxs, sidxs] + jt.data[:, e2_idxs, sidxs]) / 2.
+
+    return jt.append_joints(list(dims), values)
+
+@instrumented
+def calculate_2d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, z_dir=1, pos_angles=True, x_suffix='_X', y_suffix='_Y', dtype=None, masked=False):
     """Calculate the angle :math:`\\angle UTS` where U, T and S are specified by the arguments `e1_dim`, 
     `o_dim` and `e2_dim` respectively. This function uses the :math:`(x,y)` coordinates of the input dimensions.
 
     Args:
-        df: DataFrame, input data
+        df: DataFrame or JointTensor, input data
         o_dim: str, name of the angle vertex point of interest (POI) which is the prefix of the columns corresponding to its coordinates
         e1_dim: str, name of the first end point of the angle which is the prefix of the columns corresponding to its coordinates
         e2_dim: str, name of the second end point of the angle which is the prefix of the columns corresponding to its coordinates
@@ -20,9 +266,12 @@ def calculate_2d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, z_dir=1, po
         pos_angles: bool, determines whether the output angle should always be a positive number between 0 and 360 (True) or could be negative (False)
         x_suffix: str, the suffix of the x ccordinate column. For example, if `o_dim` is 'Head' then its x column in `df` should be 'Head_x'.
         y_suffix: str, the suffix of the y ccordinate column. For example, if `e1_dim` is 'RightKnee' then its y column in `df` should be 'RightKnee_y'.
+        dtype: float32 or float64, the type the angle is calculated in; see `calculate_3d_articulated_figure_angles`
+        masked: bool, whether to leave the angle as nan in the frames missing any of the POIs instead of raising a `ValueError`
 
     Returns:
-        the angle :math:`\\angle UTS` where U, T and S are specified by the arguments `e1_dim`, `o_dim` and `e2_dim` respectively
+        the angle :math:`\\angle UTS` where U, T and S are specified by the arguments `e1_dim`, `o_dim` and `e2_dim` respectively; 
+        with `masked=True`, a tuple of the angle and its coverage, i.e. the fraction of the frames it could be calculated in
 
     """
     if o_dim  is None or o_dim  == "" or \
@@ -30,88 +279,70 @@ def calculate_2d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, z_dir=1, po
        e2_dim is None or e2_dim == "":
         raise TypeError("Invalid dimension name(s).")
 
-    o_e1_vecs = np.array([df[e1_dim + x_suffix] - df[o_dim + x_suffix],
-                          df[e1_dim + y_suffix] - df[o_dim + y_suffix],
-                          df.shape[0]*[0.,]]).transpose()
-    o_e2_vecs = np.array([df[e2_dim + x_suffix] - df[o_dim + x_suffix],
-                          df[e2_dim + y_suffix] - df[o_dim + y_suffix],
-                          df.shape[0]*[0.,]]).transpose()
-    cc = np.cross(o_e1_vecs, o_e2_vecs)
-    _thetas = np.arctan2(np.einsum('ij,ij->i', cc, np.array(df.shape[0]*[(0,0,z_dir)])), 
-                         np.einsum('ij,ij->i', o_e1_vecs, o_e2_vecs)
-                        )*180./np.pi
-    if pos_angles:
-        thetas = pd.Series(_thetas).apply(lambda x: x if x >= 0 else 360. + x).values
-    else:
-        thetas = _thetas
-    if thetas is None or np.any(np.isnan(thetas)):
-        raise ValueError("nan theta value for vectors " + str(o_e1_vecs) + " and " + str(o_e2_vecs))
+    dtype     = _get_compute_dtype(df, dtype)
+    o_vecs    = _get_dimension_coordinates(df, o_dim, (x_suffix, y_suffix), dtype)
+    o_e1_vecs = _get_dimension_coordinates(df, e1_dim, (x_suffix, y_suffix), dtype) - o_vecs
+    o_e2_vecs = _get_dimension_coordinates(df, e2_dim, (x_suffix, y_suffix), dtype) - o_vecs
 
-    return thetas
+    thetas    = _calculate_2d_angles(o_e1_vecs, o_e2_vecs, z_dir, pos_angles, check_nan=not masked)
+    return (thetas, _get_coverage(thetas)) if masked else thetas
 
-def calculate_2d_articulated_figure_angles(df, angles, face=1, x_suffix='_X', y_suffix='_Y'):
-    """Calculate the articulated figure angles determined by `angles` on the data in `df`. This function calls 
-    `calculate_2d_articulated_figure_angle` for the angles in `angles`.
+@instrumented
+def calculate_2d_articulated_figure_angles(df, angles, face=1, x_suffix='_X', y_suffix='_Y', dtype=None, masked=False):
+    """Calculate the articulated figure angles determined by `angles` on the data in `df`. All the angles 
+    are calculated at once by compiling `angles` with `compile_angle_schema`.
 
     Args:
-        df: DataFrame, input data
-        angles: dict, specification of the articulated figure angles to be calculated
+        df: DataFrame or JointTensor, input data
+        angles: dict or CompiledAngleSchema, specification of the articulated figure angles to be calculated
         face: float, whether participnt is walking away from (1) or towards (-1) the recording/display device
         x_suffix: str, the suffix of the x ccordinate column
         y_suffix: str, the suffix of the y ccordinate column
+        dtype: float32 or float64, the type the angles are calculated in; see `calculate_3d_articulated_figure_angles`
+        masked: bool, whether to leave the angles as nan in the frames missing any of their POIs instead of raising a `ValueError`
 
     Returns:
-        a DataFrame containing the articulated figure angles determined by `angles`
+        a DataFrame containing the articulated figure angles determined by `angles`; with `masked=True`, a tuple of that DataFrame 
+        and a Series of the coverage of every angle, i.e. the fraction of the frames it could be calculated in
     """
-    if angles is None or not isinstance(angles, dict):
-        raise TypeError("Invalid angles.")
+    schema = compile_angle_schema(angles)
 
     if df.shape[0] == 0:
         return
 
-    res = {}
-
-    for angle_name in angles:
-        o_dim, e1_dim, e2_dim, z_dir, pos_angles = angles[angle_name]
-        _theta  		= calculate_2d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, z_dir*face, pos_angles, x_suffix, y_suffix)
-        res[angle_name] = _theta
-    return pd.DataFrame(res)
+    dtype          = _get_compute_dtype(df, dtype)
+    coords, schema = _get_schema_coordinates(df, schema, (x_suffix, y_suffix), dtype)
+    thetas         = _calculate_schema_angles(coords, schema, face, dtype=dtype, check_nan=not masked)
+    if masked:
+        return pd.DataFrame(thetas, columns=schema.angle_names), pd.Series(_get_coverage(thetas), index=schema.angle_names)
+    return pd.DataFrame(thetas, columns=schema.angle_names)
 
-def extend_2d_articulated_figure(df, dims=None, copy=True, x_suffix='_X', y_suffix='_Y'):
+@instrumented
+def extend_2d_articulated_figure(df, dims=None, copy=True, x_suffix='_X', y_suffix='_Y', dtype=None):
     """Calculate extra points of interest (POIs) specified by `dims` based on the POIs in `df`. 
     This function uses the :math:`(x,y)` coordinates of the input dimensions.
 
     Args:
-        df: DataFrame, input data
-        angles: dict, specification of the extra articulated figure angles to be calculated
-        copy: bool, whether to use a copy of the input data or add the calculated angles to the input DataFrame
+        df: DataFrame or JointTensor, input data
+        dims: dict, specification of the extra points of interest (POIs) to be calculated, each as the midpoints of pairs of existing POIs; 
+            a new POI is missing (nan) in the frames where either of its end POIs is
+        copy: bool, whether to use a copy of the input data or add the calculated POIs to the input DataFrame; a `JointTensor` input always results in a new `JointTensor`
         x_suffix: str, the suffix of the x ccordinate column
         y_suffix: str, the suffix of the y ccordinate column
+        dtype: float32 or float64, the type of the calculated POIs, by default that of a JointTensor `df` and float64 otherwise
 
     Returns:
         a DataFrame containing the consisting of the data in `df` as well as the extra points of interest (POIs) specified by `dims` based on the POIs in `df`
     """
-    if dims is None or not isinstance(dims, dict):
-        raise TypeError("Invalid dimension(s).")
-    if len(dims) == 0:
-        return df
+    return _extend_articulated_figure(df, dims, copy, (x_suffix, y_suffix), dtype)
 
-    res = df.copy() if copy else df
-
-    for dim_name in dims:
-        x1_dim, x2_dim, y1_dim, y2_dim	= dims[dim_name]
-        for idx, row in df.iterrows():
-            res.loc[idx, dim_name+x_suffix] = (row[x1_dim+x_suffix] + row[x2_dim+x_suffix]) / 2.
-            res.loc[idx, dim_name+y_suffix] = (row[y1_dim+y_suffix] + row[y2_dim+y_suffix]) / 2.
-
-        return res
-
-def calculate_3d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, pos_angles=True, x_suffix='_X', y_suffix='_Y', z_suffix='_Z'):
+@instrumented
+def calculate_3d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, pos_angles=True, x_suffix='_X', y_suffix='_Y', z_suffix='_Z', dtype=None, masked=False):
     """Calculate the angle :math:`\\angle UTS` where U, T and S are specified by the arguments `e1_dim`, 
     `o_dim` and `e2_dim` respectively. This function uses the :math:`(x,y,z)` coordinates of the input dimensions.
 
     Args:
-        df: DataFrame, input data
+        df: DataFrame or JointTensor, input data
         o_dim: str, name of the angle vertex point of interest (POI) which is the prefix of the columns corresponding to its coordinates
         e1_dim: str, name of the first end point of the angle which is the prefix of the columns corresponding to its coordinates
         e2_dim: str, name of the second end point of the angle which is the prefix of the columns corresponding to its coordinates
@@ -120,9 +351,12 @@ def calculate_3d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, pos_angles=
         x_suffix: str, the suffix of the x ccordinate column. For example, if `o_dim` is 'Head' then its x column in `df` should be 'Head_x'.
         y_suffix: str, the suffix of the y ccordinate column. For example, if `e1_dim` is 'RightKnee' then its y column in `df` should be 'RightKnee_y'.
         z_suffix: str, the suffix of the z ccordinate column. For example, if `e2_dim` is 'LeftElbow' then its z column in `df` should be 'LeftElbow_z'.
+        dtype: float32 or float64, the type the angle is calculated in; see `calculate_3d_articulated_figure_angles`
+        masked: bool, whether to leave the angle as nan in the frames missing any of the POIs instead of raising a `ValueError`
 
     Returns:
-        the angle :math:`\\angle UTS` where U, T and S are specified by the arguments `e1_dim`, `o_dim` and `e2_dim` respectively
+        a NumPy array of the angle :math:`\\angle UTS` in every frame of `df`, where U, T and S are specified by the arguments `e1_dim`, `o_dim` and `e2_dim` respectively; 
+        with `masked=True`, a tuple of the angle and its coverage, i.e. the fraction of the frames it could be calculated in
 
     """
     if o_dim  is None or o_dim  == "" or \
@@ -130,94 +364,158 @@ def calculate_3d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, pos_angles=
        e2_dim is None or e2_dim == "":
         raise TypeError("Invalid dimension name(s).")
 
-    thetas = []
-
-    for idx, row in df.iterrows():
-        o_e1_vec = (row[e1_dim + x_suffix] - row[o_dim + x_suffix],
-                    row[e1_dim + y_suffix] - row[o_dim + y_suffix],
-                    row[e1_dim + z_suffix] - row[o_dim + z_suffix])
-        o_e2_vec = (row[e2_dim + x_suffix] - row[o_dim + x_suffix],
-                    row[e2_dim + y_suffix] - row[o_dim + y_suffix],
-                    row[e2_dim + z_suffix] - row[o_dim + z_suffix])
-        _theta = np.arctan2(np.linalg.norm(np.cross(o_e1_vec, o_e2_vec)), np.dot(o_e1_vec, o_e2_vec))*180./np.pi
-        if pos_angles:
-            theta = _theta if _theta > 0 else 360. + _theta
-        else:
-            theta = _theta
-        if theta is None or np.isnan(theta):
-            raise ValueError("nan theta value for vectors " + str(o_e1_vec) + " and " + str(o_e2_vec))
-        thetas.append(theta)
-    return thetas
+    dtype     = _get_compute_dtype(df, dtype)
+    o_vecs    = _get_dimension_coordinates(df, o_dim, (x_suffix, y_suffix, z_suffix), dtype)
+    o_e1_vecs = _get_dimension_coordinates(df, e1_dim, (x_suffix, y_suffix, z_suffix), dtype) - o_vecs
+    o_e2_vecs = _get_dimension_coordinates(df, e2_dim, (x_suffix, y_suffix, z_suffix), dtype) - o_vecs
 
-def calculate_3d_articulated_figure_angles(df, angles, face=1, x_suffix='_X', y_suffix='_Y', z_suffix='_Z'):
-    """Calculate the articulated figure angles determined by `angles` on the data in `df`. This function calls 
-    `calculate_3d_articulated_figure_angle` for the angles in `angles`.
+    thetas    = _calculate_3d_angles(o_e1_vecs, o_e2_vecs, pos_angles, check_nan=not masked)
+    return (thetas, _get_coverage(thetas)) if masked else thetas
+
+@instrumented
+def calculate_3d_articulated_figure_angles(df, angles, face=1, x_suffix='_X', y_suffix='_Y', z_suffix='_Z', dtype=None, masked=False):
+    """Calculate the articulated figure angles determined by `angles` on the data in `df`. All the angles 
+    are calculated at once by compiling `angles` with `compile_angle_schema`.
 
     Args:
-        df: DataFrame, input data
-        angles: dict, specification of the articulated figure angles to be calculated
+        df: DataFrame or JointTensor, input data
+        angles: dict or CompiledAngleSchema, specification of the articulated figure angles to be calculated
         face: float, whether participnt is walking away from (1) or towards (-1) the recording/display device
         x_suffix: str, the suffix of the x ccordinate column
         y_suffix: str, the suffix of the y ccordinate column
         z_suffix: str, the suffix of the z ccordinate column
+        dtype: float32 or float64, the type the angles are calculated in, by default that of a JointTensor `df` and float64 
+            otherwise. With float32, the coordinates are converted once (block by block for a JointTensor) and no intermediate 
+            is upcast, which halves the memory traffic. The angles then typically differ from the float64 ones by about 
+            1e-5 degrees times the ratio of the distance of the joints from the origin to the bone length, e.g. 1e-4 degrees 
+            for 10 cm bones 1 m away from the origin and 0.01 degrees for 1 cm bones 10 m away; degenerate (near zero length) 
+            vectors can be off by much more, and angles within the error of 0 may wrap to 360
+        masked: bool, whether to leave the angles as nan in the frames missing any of their POIs (e.g. occluded joints) 
+            instead of raising a `ValueError` on the first one
 
     Returns:
-        a DataFrame containing the articulated figure angles determined by `angles`
+        a DataFrame containing the articulated figure angles determined by `angles`; with `masked=True`, a tuple of that DataFrame 
+        and a Series of the coverage of every angle, i.e. the fraction of the frames it could be calculated in
     """
-    if angles is None or not isinstance(angles, dict):
-        raise TypeError("Invalid angles.")
+    schema = compile_angle_schema(angles)
 
     if df.shape[0] == 0:
         return
 
-    res = {}
-
-    for angle_name in angles:
-        o_dim, e1_dim, e2_dim, _, pos_angles = angles[angle_name]
-        _theta          = calculate_3d_articulated_figure_angle(df, o_dim, e1_dim, e2_dim, pos_angles, x_suffix, y_suffix, z_suffix)
-        res[angle_name] = _theta
-    return pd.DataFrame(res)
+    dtype          = _get_compute_dtype(df, dtype)
+    coords, schema = _get_schema_coordinates(df, schema, (x_suffix, y_suffix, z_suffix), dtype)
+    thetas         = _calculate_schema_angles(coords, schema, face, dtype=dtype, check_nan=not masked)
+    if masked:
+        return pd.DataFrame(thetas, columns=schema.angle_names), pd.Series(_get_coverage(thetas), index=schema.angle_names)
+    return pd.DataFrame(thetas, columns=schema.angle_names)
 
-def extend_3d_articulated_figure(df, dims=None, copy=True, x_suffix='_X', y_suffix='_Y', z_suffix='_Z'):
+@instrumented
+def extend_3d_articulated_figure(df, dims=None, copy=True, x_suffix='_X', y_suffix='_Y', z_suffix='_Z', dtype=None):
     """Calculate extra points of interest (POIs) specified by `dims` based on the POIs in `df`. 
     This function uses the :math:`(x,y,z)` coordinates of the input dimensions.
 
     Args:
-        df: DataFrame, input data
-        angles: dict, specification of the extra articulated figure angles to be calculated
-        copy: bool, whether to use a copy of the input data or add the calculated angles to the input DataFrame
+        df: DataFrame or JointTensor, input data
+        dims: dict, specification of the extra points of interest (POIs) to be calculated, each as the midpoints of pairs of existing POIs; 
+            a new POI is missing (nan) in the frames where either of its end POIs is
+        copy: bool, whether to use a copy of the input data or add the calculated POIs to the input DataFrame; a `JointTensor` input always results in a new `JointTensor`
         x_suffix: str, the suffix of the x ccordinate column
         y_suffix: str, the suffix of the y ccordinate column
         z_suffix: str, the suffix of the z ccordinate column
+        dtype: float32 or float64, the type of the calculated POIs, by default that of a JointTensor `df` and float64 otherwise
 
     Returns:
         a DataFrame containing the consisting of the data in `df` as well as the extra points of interest (POIs) specified by `dims` based on the POIs in `df`
     """
-    if dims is None or not isinstance(dims, dict):
-        raise TypeError("Invalid dimension(s).")
-    if len(dims) == 0:
-        return df
-
-    res = df.copy() if copy else df
+    return _extend_articulated_figure(df, dims, copy, (x_suffix, y_suffix, z_suffix), dtype)
 
-    for dim_name in dims:
-        x1_dim, x2_dim, y1_dim, y2_dim, z1_dim, z2_dim  = dims[dim_name]
-        for idx, row in df.iterrows():
-            res.loc[idx, dim_name+x_suffix] = (row[x1_dim+x_suffix] + row[x2_dim+x_suffix]) / 2.
-            res.loc[idx, dim_name+y_suffix] = (row[y1_dim+y_suffix] + row[y2_dim+y_suffix]) / 2.
-            res.loc[idx, dim_name+z_suffix] = (row[z1_dim+z_suffix] + row[z2_dim+z_suffix]) / 2.
+def _pack_cohort_coordinates(datas, schema, suffixes, dtype):
+    """Copy the coordinates of the joints of `schema` of every session data in `datas` into consecutive frames
+    of one `(n_frames, n_joints, len(suffixes))` buffer of type `dtype`, and return it with the session offsets.
+    Runs of DataFrames with the same columns, e.g. the sessions of a `SessionCollection`, are concatenated
+    and gathered at once, since selecting the columns of every DataFrame costs more than copying its frames.
+    """
+    offsets = np.concatenate([[0], np.cumsum([len(data) for data in datas])]).astype(np.intp)
+    coords  = np.empty((offsets[-1], len(schema.joint_names), len(suffixes)), dtype=dtype)
+
+    didx = 0
+    while didx < len(datas):
+        data = datas[didx]
+        if isinstance(data, JointTensor):
+            jidxs = np.array([data.joint_index(jn) for jn in schema.joint_names], dtype=np.intp)
+            coords[offsets[didx]:offsets[didx + 1]] = data.data[:, jidxs][:, :, data.suffix_indexer(suffixes)]
+            didx += 1
+            continue
+
+        stop = didx + 1
+        while stop < len(datas) and isinstance(datas[stop], pd.DataFrame) and datas[stop].columns.equals(data.columns):
+            stop += 1
+        run = data if stop == didx + 1 else pd.concat(datas[didx:stop], ignore_index=True)
+        coords[offsets[didx]:offsets[stop]] = _gather_joint_coordinates(run, schema.joint_names, suffixes, dtype)
+        didx = stop
+    return coords, offsets
+
+@instrumented
+def calculate_cohort_articulated_figure_angles(sessions, angles, n_dims=3, face=1, x_suffix='_X', y_suffix='_Y', z_suffix='_Z',
+                                               dtype=None, masked=False):
+    """Calculate the articulated figure angles determined by `angles` for a whole cohort of sessions at once.
+
+    The recordings of all the sessions, whatever their lengths, are packed into one frame buffer with an array
+    of session offsets, and the angles of all the frames are calculated by a single call of the batched kernel of
+    `calculate_3d_articulated_figure_angles`, instead of paying the setup costs once per session. The angles
+    of every session are views of one output buffer.
 
-        return res
+    Args:
+        sessions: iterable, the `Session` objects (or directly their DataFrame or JointTensor data) to be processed
+        angles: dict or CompiledAngleSchema, specification of the articulated figure angles to be calculated
+        n_dims: int, whether to calculate 2D (2) or 3D (3) angles
+        face: float, whether participnt is walking away from (1) or towards (-1) the recording/display device
+        x_suffix: str, the suffix of the x ccordinate column
+        y_suffix: str, the suffix of the y ccordinate column
+        z_suffix: str, the suffix of the z ccordinate column
+        dtype: float32 or float64, the type the angles are calculated in, by default that of the first session's JointTensor
+            data and float64 otherwise; see `calculate_3d_articulated_figure_angles`
+        masked: bool, whether to leave the angles as nan in the frames missing any of their POIs instead of raising a `ValueError`
 
-def calculate_phase_locking_value(df, dims, should_remove_outliers=False):
+    Returns:
+        a list of DataFrames of the angles of every session, in order, each one a view of the shared output buffer;
+        with `masked=True`, a tuple of that list and a DataFrame of the coverage of every angle (columns) in every session (rows)
+    """
+    if sessions is None:
+        raise TypeError("No input sessions provided.")
+    if n_dims not in (2, 3):
+        raise ValueError("Invalid number of dimensions %s; 2 or 3 expected."%str(n_dims))
+    sessions = list(sessions)
+    datas    = [session if isinstance(session, (pd.DataFrame, JointTensor)) else session._data for session in sessions]
+    schema   = compile_angle_schema(angles)
+    suffixes = (x_suffix, y_suffix, z_suffix)[:n_dims]
+
+    dtype           = _get_compute_dtype(datas[0] if len(datas) > 0 else None, dtype)
+    coords, offsets = _pack_cohort_coordinates(datas, schema, suffixes, dtype)
+    thetas          = _calculate_schema_angles(coords, schema, face, dtype=dtype, check_nan=not masked)
+    del coords
+
+    columns = pd.Index(schema.angle_names)
+    res     = [pd.DataFrame(thetas[start:stop], columns=columns, copy=False) for start, stop in zip(offsets[:-1], offsets[1:])]
+    if masked:
+        n_valid  = np.concatenate([np.zeros((1, thetas.shape[1]), dtype=np.intp), np.cumsum(~np.isnan(thetas), axis=0)])
+        lengths  = np.diff(offsets)[:, None]
+        coverage = np.where(lengths > 0, (n_valid[offsets[1:]] - n_valid[offsets[:-1]]) / np.maximum(lengths, 1), 0.)
+        return res, pd.DataFrame(coverage, columns=schema.angle_names,
+                                 index=[getattr(session, '_name', sidx) for sidx, session in enumerate(sessions)])
+    return res
+
+@instrumented
+def calculate_phase_locking_value(df, dims, should_remove_outliers=False, masked=False):
     """Calculate phase locking value (PLV)
 
     See https://doi.org/10.1109/IEMBS.2006.259673 for details.
 
     Args:
-        df: DataFrame, input data
+        df: DataFrame or JointTensor, input data
         dims: tuple, the two dimensions (angle) in `df` to compute the PLV for
         should_remove_outliers: bool, whether to remove outliers before calculating PLV
+        masked: bool, whether to skip the frames missing (nan in) either dimension instead of letting them spoil the results
 
     Returns:
         tuple:
@@ -228,6 +526,9 @@ def calculate_phase_locking_value(df, dims, should_remove_outliers=False):
             - Hilbert transform of the second angle
             - phase of the first angle
             - phase of the second angle
+
+        With `masked=True`, a tuple of the above, whose time series are nan in the skipped frames, and the coverage, 
+        i.e. the fraction of the frames used
     """
 
     if df is None:
@@ -237,13 +538,18 @@ def calculate_phase_locking_value(df, dims, should_remove_outliers=False):
     if len(dims) != 2:
         raise ValueError("Need two angles to compute the PLV for; %d provided."%len(dims))
 
-    sig1        = df.loc[:, dims[0]].values
+    sig1        = _get_signal(df, dims[0])
+    sig2        = _get_signal(df, dims[1])
+    if masked:
+        valid   = _get_valid_frames(np.stack([sig1, sig2], axis=1))
+        if np.any(valid):
+            sig1, sig2 = sig1[valid], sig2[valid]
+
     yy1         = clean_gaussian_outliers(sig1) if should_remove_outliers else sig1
     yy1         = yy1 - np.mean(yy1)
     yy1_hilbert = spsig.hilbert(yy1)
     yy1_phase   = np.unwrap(np.angle(yy1_hilbert))
 
-    sig2        = df.loc[:, dims[1]].values
     yy2         = clean_gaussian_outliers(sig2) if should_remove_outliers else sig2
     yy2         = yy2 - np.mean(yy2)
     yy2_hilbert = spsig.hilbert(yy2)
@@ -252,37 +558,178 @@ def calculate_phase_locking_value(df, dims, should_remove_outliers=False):
     instantaneous_phase_diff = yy1_phase - yy2_phase
     avg_phase_diff = np.average(instantaneous_phase_diff)
     
-    return instantaneous_phase_diff, avg_phase_diff, yy1_hilbert, yy2_hilbert, yy1_phase, yy2_phase
+    res = instantaneous_phase_diff, avg_phase_diff, yy1_hilbert, yy2_hilbert, yy1_phase, yy2_phase
+    if masked:
+        return tuple(_unmask_frames(values, valid) for values in res), _get_coverage(valid)
+    return res
+
+def _hilbert_multiplier(n):
+    """The frequency domain multiplier turning the FFT of a length `n` real signal into that of its analytic signal, 
+    as in `scipy.signal.hilbert`.
+    """
+    h = np.zeros(n)
+    if n % 2 == 0:
+        h[0] = h[n // 2] = 1
+        h[1:n // 2] = 2
+    else:
+        h[0] = 1
+        h[1:(n + 1) // 2] = 2
+    return h
+
+def _get_windowed_phase_locking_value_signals(df, dims, window, hop, should_remove_outliers):
+    """Validate the arguments of the windowed PLV functions and extract the two signals."""
+    if df is None:
+        raise TypeError("No input data provided.")
+    if dims is None or not isinstance(dims, (tuple, list)):
+        raise TypeError("Invalid input dimensions.")
+    if len(dims) != 2:
+        raise ValueError("Need two angles to compute the PLV for; %d provided."%len(dims))
+    hop = window if hop is None else hop
+    if window < 2 or hop < 1:
+        raise ValueError("Invalid window length %d or hop size %d."%(window, hop))
+
+    sig1 = _get_signal(df, dims[0])
+    sig1 = clean_gaussian_outliers(sig1) if should_remove_outliers else sig1
+    sig2 = _get_signal(df, dims[1])
+    sig2 = clean_gaussian_outliers(sig2) if should_remove_outliers else sig2
+
+    return sig1, sig2, hop
+
+def _iter_windowed_phase_locking_value_blocks(sig1, sig2, window, hop, block_size):
+    """Calculate the average instantaneous phase difference of `sig1` and `sig2` over sliding windows, 
+    for blocks of `block_size` windows at a time.
+    """
+    if len(sig1) < window:
+        return
+
+    n_windows = (len(sig1) - window) // hop + 1
+    windows1  = np.lib.stride_tricks.sliding_window_view(sig1, window)[::hop]
+    windows2  = np.lib.stride_tricks.sliding_window_view(sig2, window)[::hop]
+    h         = _hilbert_multiplier(window)
+
+    for start in range(0, n_windows, block_size):
+        yy        = np.stack([windows1[start:start + block_size], windows2[start:start + block_size]])
+        yy        = yy - np.mean(yy, axis=-1, keepdims=True)
+        yy_phase  = np.unwrap(np.angle(spfft.ifft(spfft.fft(yy, axis=-1)*h, axis=-1)), axis=-1)
+        yield hop*np.arange(start, start + yy.shape[1]), np.mean(yy_phase[0] - yy_phase[1], axis=-1)
 
-def calculate_phase_angles(df, dim, should_remove_outliers=False):
+@instrumented
+def iter_windowed_phase_locking_values(df, dims, window, hop=None, should_remove_outliers=False, block_size=256):
+    """Calculate the phase locking value (PLV) of two dimensions over sliding windows in a single pass.
+
+    Each window is mean-centered and its analytic signal is calculated on its own, the same way 
+    `calculate_phase_locking_value` does for the whole signal. Windows are transformed in blocks of 
+    `block_size` with one FFT size, so that the FFT plans are reused and the memory use is bounded 
+    by the block rather than the recording.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        dims: tuple, the two dimensions (angle) in `df` to compute the PLV for
+        window: int, the window length in frames
+        hop: int, the number of frames between the starts of consecutive windows; defaults to `window`
+        should_remove_outliers: bool, whether to remove outliers before calculating PLV
+        block_size: int, the number of windows transformed at once
+
+    Yields:
+        tuple:
+
+            - index of the first frame of the window
+            - PLV of the input dimensions over the window
+    """
+    sig1, sig2, hop = _get_windowed_phase_locking_value_signals(df, dims, window, hop, should_remove_outliers)
+
+    for starts, plvs in _iter_windowed_phase_locking_value_blocks(sig1, sig2, window, hop, block_size):
+        for start, plv in zip(starts, plvs):
+            yield start, plv
+
+@instrumented
+def calculate_windowed_phase_locking_value(df, dims, window, hop=None, should_remove_outliers=False, block_size=256):
+    """Calculate the phase locking value (PLV) of two dimensions over sliding windows. 
+    See `iter_windowed_phase_locking_values` for details.
+
+    Returns:
+        tuple:
+
+            - indices of the first frames of the windows
+            - PLVs of the input dimensions over the windows
+    """
+    sig1, sig2, hop = _get_windowed_phase_locking_value_signals(df, dims, window, hop, should_remove_outliers)
+
+    blocks = list(_iter_windowed_phase_locking_value_blocks(sig1, sig2, window, hop, block_size))
+    if len(blocks) == 0:
+        return np.array([], dtype=int), np.array([])
+    starts, plvs = zip(*blocks)
+    return np.concatenate(starts), np.concatenate(plvs)
+
+def _calculate_phase_angles(yy, method='arctan', normalize=False):
+    """Calculate the phase angles of the mean-centered time series in the columns of `yy` (i.e. along its first axis)."""
+    if method not in ['arctan', 'arctan2']:
+        raise ValueError("Invalid phase angle method.")
+
+    dyy_dt = np.gradient(yy, axis=0)
+    if normalize:
+        yy_min    = np.min(yy, axis=0)
+        yy_range  = np.max(yy, axis=0) - yy_min
+        yy        = 2.*(yy - yy_min) / np.where(yy_range > 0, yy_range, 1.) - 1.
+        dyy_max   = np.max(np.abs(dyy_dt), axis=0)
+        dyy_dt    = dyy_dt / np.where(dyy_max > 0, dyy_max, 1.)
+
+    if method == 'arctan':
+        # arctan(dyy_dt / yy), with the limits +/-90 at the zero crossings of yy
+        return np.arctan2(np.where(yy < 0, -dyy_dt, dyy_dt), np.abs(yy))*180/np.pi
+    return np.arctan2(dyy_dt, yy)*180/np.pi
+
+@instrumented
+def calculate_phase_angles(df, dim, should_remove_outliers=False, method='arctan', normalize=False, masked=False):
     """Calculate the phase angle (PA) time series of the dimension `dim` of input data `df`
 
     See https://doi.org/10.1016/j.ridd.2012.03.020 for details
 
+    By default, the PA is :math:`\\arctan(\\dot{y}/y)` of the mean-centered signal :math:`y`, which lies in 
+    :math:`[-90, 90]` and tends to :math:`\\pm 90` at the zero crossings of :math:`y`. With `method='arctan2'`, 
+    the four-quadrant PA in :math:`(-180, 180]` of the phase portrait :math:`(y, \\dot{y})` is calculated instead. 
+    With `normalize=True`, :math:`y` is first scaled to :math:`[-1, 1]` and :math:`\\dot{y}` is divided by its 
+    maximum absolute value, as commonly done for continuous relative phase.
+
     Args:
-        df: DataFrame: input data
-        dim: str, name of the `df` column to calculate PA for
+        df: DataFrame or JointTensor: input data
+        dim: str or list, name(s) of the `df` column(s) to calculate PA for
+        should_remove_outliers: bool, whether to remove outliers before calculating PA
+        method: str, 'arctan' or 'arctan2'
+        normalize: bool, whether to normalize the position and velocity before calculating PA
+        masked: bool, whether to skip the frames missing (nan in) any of the dimensions `dim`
 
     Returns:
-        phase angle time series of dimension `dim` of input data `df`
+        phase angle time series of dimension `dim` of input data `df`; a `(n_frames, len(dim))` array if `dim` is a list. 
+        With `masked=True`, a tuple of the PA, which is nan in the skipped frames, and the coverage, i.e. the fraction of the frames used
     """
-    if dim is None or not isinstance(dim, str):
+    if dim is None or not isinstance(dim, (str, tuple, list)):
         raise TypeError("Invalid input dimension.")
 
-    sig    = df.loc[:, dim].values
-    yy     = clean_gaussian_outliers(sig) if should_remove_outliers else sig
-    yy     = yy - np.mean(yy)
-    dyy_dt = np.gradient(yy)
-    pa_ts  = np.array([np.arctan(dyy_dt[jj] / yy[jj])*180/np.pi for jj in range(len(yy))])
-    return pa_ts
-
-def calculate_phase_angle_measures(df, dims, should_remove_outliers=False):
+    dims   = [dim] if isinstance(dim, str) else list(dim)
+    yy     = _get_signals(df, dims)
+    if masked:
+        valid  = _get_valid_frames(yy)
+        yy     = yy[valid] if np.any(valid) else yy
+    yy     = _clean_array_gaussian_outliers(yy.T, 3).T if should_remove_outliers else yy
+    yy     = yy - np.mean(yy, axis=0)
+    pa_ts  = _calculate_phase_angles(yy, method, normalize)
+    if masked:
+        pa_ts  = _unmask_frames(pa_ts, valid)
+        return pa_ts[:, 0] if isinstance(dim, str) else pa_ts, _get_coverage(valid)
+    return pa_ts[:, 0] if isinstance(dim, str) else pa_ts
+
+@instrumented
+def calculate_phase_angle_measures(df, dims, should_remove_outliers=False, method='arctan', normalize=False, masked=False):
     """Calculate various synchrony measures based on phase angle (PA)
 
     Args:
-        df: DataFrame, input data
+        df: DataFrame or JointTensor, input data
         dims: tuple, the two dimensions (angle) in `df` to compute the PA measures for
         should_remove_outliers: bool, whether to remove outliers before calculating the PA measures
+        method: str, the PA calculation method; see `calculate_phase_angles`
+        normalize: bool, whether to normalize the position and velocity before calculating PA
+        masked: bool, whether to skip the frames missing (nan in) either dimension
 
     Returns:
         tuple:
@@ -291,6 +738,8 @@ def calculate_phase_angle_measures(df, dims, should_remove_outliers=False):
             - marp: float, mean absolute relative phase over the gait cycle
             - mrp: float, sign of mean crp over the gait cycle
             - crpsd: float, standard deviation (SA) of crp over the gait cycle
+
+        With `masked=True`, a tuple of the above, with crp nan in the skipped frames, and the coverage, i.e. the fraction of the frames used
     """
     if df is None:
         raise TypeError("No input data provided.")
@@ -299,32 +748,38 @@ def calculate_phase_angle_measures(df, dims, should_remove_outliers=False):
     if len(dims) != 2:
         raise ValueError("Need two angles to compute the measures; %d provided."%len(dims))
 
-    pa_ts_1 = calculate_phase_angles(df, dims[0], should_remove_outliers)
-    pa_ts_2 = calculate_phase_angles(df, dims[1], should_remove_outliers)
+    pa_ts     = calculate_phase_angles(df, list(dims), should_remove_outliers, method, normalize, masked)
+    if masked:
+        pa_ts, coverage = pa_ts
 
-    crp       = pa_ts_1 - pa_ts_2
-    marp      = np.mean(np.abs(crp))
-    mrp       = np.sign(np.mean(crp))
-    crpsd     = np.std(crp)
+    crp       = pa_ts[:, 0] - pa_ts[:, 1]
+    crp_valid = crp[~np.isnan(crp)] if masked else crp
+    marp      = np.mean(np.abs(crp_valid))
+    mrp       = np.sign(np.mean(crp_valid))
+    crpsd     = np.std(crp_valid)
 
-    return crp, marp, mrp, crpsd
+    return ((crp, marp, mrp, crpsd), coverage) if masked else (crp, marp, mrp, crpsd)
 
-def calculate_fft_based_synchrony_measures(df, dims, should_remove_outliers=False):
+@instrumented
+def calculate_fft_based_synchrony_measures(df, dims, should_remove_outliers=False, masked=False):
     """Calculate various synchrony measures using fast Fourier transform (FFT)
 
     Currently, the only calculated measure is the variance of the dominant frequencies 
     of the signals corresponding to the series in `dims` columns of `df`.
 
     Args:
-        df: DataFrame, input data
+        df: DataFrame or JointTensor, input data
         dims: tuple, the two dimensions (angle) in `df` to compute the PA measures for
         should_remove_outliers: bool, whether to remove outliers before calculating the PA measures
+        masked: bool, whether to skip the frames missing (nan in) any of the dimensions
 
     Returns:
         tuple:
 
             - dominant_freqs_var: float, variance of the dominant frequencies in `dominant_freqs` (see below)
             - dominant_freqs: dict, dominant frequencies of each dimension in `dims`
+
+        With `masked=True`, a tuple of the above and the coverage, i.e. the fraction of the frames used
     """
     if df is None:
         raise TypeError("No input data provided.")
@@ -334,9 +789,12 @@ def calculate_fft_based_synchrony_measures(df, dims, should_remove_outliers=Fals
         raise ValueError("Need two or more angles to compute the measures; %d provided."%len(dims))
 
     dominant_freqs = {}
+    if masked:
+        valid          = _get_valid_frames(_get_signals(df, dims))
 
     for dim in dims:
-        sig                 = df.loc[:, dim]
+        sig                 = _get_signal(df, dim)
+        sig                 = sig[valid] if masked and np.any(valid) else sig
         yy                  = clean_gaussian_outliers(sig) if should_remove_outliers else sig
         yy                  = yy - np.mean(yy)
 
@@ -346,5 +804,77 @@ def calculate_fft_based_synchrony_measures(df, dims, should_remove_outliers=Fals
 
     dominant_freqs_var = np.var(list(dominant_freqs.values()))
 
+    if masked:
+        return (dominant_freqs_var, dominant_freqs), _get_coverage(valid)
     return dominant_freqs_var, dominant_freqs
 
+
+@instrumented
+def calculate_synchrony_matrices(df, dims=None, should_remove_outliers=False, method='arctan', normalize=False, masked=False):
+    """Calculate the PLV, PA and FFT based synchrony measures of all the pairs of dimensions in `dims`.
+
+    The Hilbert transform, phase angles and FFT of every dimension are calculated exactly once, and the pairwise 
+    measures are then built by broadcasting. Entry :math:`(i, j)` of each matrix is the value that 
+    `calculate_phase_locking_value`, `calculate_phase_angle_measures` and `calculate_fft_based_synchrony_measures` 
+    return for the pair `(dims[i], dims[j])`.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        dims: list, the dimensions (angles) in `df` to compute the measures for; all the columns of a DataFrame if None
+        should_remove_outliers: bool, whether to remove outliers before calculating the measures
+        method: str, the PA calculation method; see `calculate_phase_angles`
+        normalize: bool, whether to normalize the position and velocity before calculating PA
+        masked: bool, whether to skip the frames missing (nan in) any of the dimensions, so that all the pairs 
+            are calculated on the same frames
+
+    Returns:
+        tuple of DataFrames indexed by `dims` on both axes:
+
+            - plv: PLV, i.e. average instantaneous phase difference
+            - marp: mean absolute relative phase
+            - mrp: sign of mean continuous relative phase (CRP)
+            - crpsd: standard deviation of CRP
+            - dominant_freqs_var: variance of the dominant frequencies
+
+        With `masked=True`, a tuple of the above and the coverage, i.e. the fraction of the frames used
+    """
+    if df is None:
+        raise TypeError("No input data provided.")
+    if dims is None and isinstance(df, pd.DataFrame):
+        dims = list(df.columns)
+    if dims is None or not isinstance(dims, (tuple, list)):
+        raise TypeError("Invalid input dimensions.")
+    if len(dims) < 2:
+        raise ValueError("Need two or more angles to compute the measures; %d provided."%len(dims))
+
+    yy = _get_signals(df, dims)
+    if masked:
+        valid = _get_valid_frames(yy)
+        yy    = yy[valid] if np.any(valid) else yy
+    yy = _clean_array_gaussian_outliers(yy.T, 3).T if should_remove_outliers else yy
+    yy = yy - np.mean(yy, axis=0)
+
+    # PLV
+    yy_phase      = np.unwrap(np.angle(spsig.hilbert(yy, axis=0)), axis=0)
+    yy_phase_mean = np.mean(yy_phase, axis=0)
+    plv           = yy_phase_mean[:, None] - yy_phase_mean[None, :]
+
+    # PA measures
+    pa_ts         = _calculate_phase_angles(yy, method, normalize)
+    pa_mean       = np.mean(pa_ts, axis=0)
+    mrp           = np.sign(pa_mean[:, None] - pa_mean[None, :])
+    pa_centered   = pa_ts - pa_mean
+    pa_cov        = pa_centered.T @ pa_centered / pa_ts.shape[0]
+    pa_var        = np.diag(pa_cov)
+    crpsd         = np.sqrt(np.maximum(pa_var[:, None] + pa_var[None, :] - 2*pa_cov, 0.))
+    marp          = np.zeros((len(dims), len(dims)))
+    for didx in range(len(dims) - 1):
+        marp[didx, didx + 1:] = np.mean(np.abs(pa_ts[:, didx:didx + 1] - pa_ts[:, didx + 1:]), axis=0)
+    marp         += marp.T
+
+    # FFT measures
+    yy_top_freq   = np.argmax(np.abs(spfft.rfft(yy, axis=0))[0:int(yy.shape[0]/2)], axis=0)
+    dominant_freqs_var = ((yy_top_freq[:, None] - yy_top_freq[None, :]) / 2.)**2
+
+    res = tuple(pd.DataFrame(mat, index=dims, columns=dims) for mat in (plv, marp, mrp, crpsd, dominant_freqs_var))
+    return (res, _get_coverage(valid)) if masked else res
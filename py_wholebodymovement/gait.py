@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+import pandas as pd
+import scipy.signal as spsig
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.articulated_figure import _get_signal
+from py_wholebodymovement.articulated_figure import _get_signals
+from py_wholebodymovement.articulated_figure import _calculate_phase_angles
+from py_wholebodymovement.utils.cleaning_utils import _clean_array_gaussian_outliers
+from py_wholebodymovement.utils.profiling import instrumented
+
+_GAIT_JOINTS = {
+    'Right': ('RightAnkle', 'RightFoot'),
+    'Left': ('LeftAnkle', 'LeftFoot'),
+}
+
+_GAIT_ROOT_JOINTS = ('SpineB', 'Waist')
+
+class GaitCycleIndex():
+    """The heel-strike and toe-off events of a recording, stored as sorted frame offsets per side.
+
+    A gait cycle of a side runs from one of its heel strikes to the next one, so the cycles of every side are
+    the pairs of consecutive heel strikes and indexing them costs no more than slicing the offset arrays.
+
+    Args:
+        heel_strikes: dict, the sorted frames of the heel strikes of every side, e.g. `{'Right': [...], 'Left': [...]}`
+        toe_offs: dict, the sorted frames of the toe offs of every side
+        n_frames: int, the number of frames of the recording
+    """
+    def __init__(self, heel_strikes, toe_offs, n_frames):
+        self._heel_strikes = {side: np.asarray(frames, dtype=np.intp) for side, frames in heel_strikes.items()}
+        self._toe_offs     = {side: np.asarray(frames, dtype=np.intp) for side, frames in toe_offs.items()}
+        self._n_frames     = int(n_frames)
+
+    @property
+    def sides(self):
+        """The sides the events were detected for."""
+        return list(self._heel_strikes)
+
+    @property
+    def n_frames(self):
+        """The number of frames of the recording."""
+        return self._n_frames
+
+    def heel_strikes(self, side):
+        """The frames of the heel strikes of `side`."""
+        return self._heel_strikes[side]
+
+    def toe_offs(self, side):
+        """The frames of the toe offs of `side`."""
+        return self._toe_offs[side]
+
+    def cycles(self, side):
+        """The `(n_cycles, 2)` array of the first and last (i.e. next heel strike) frames of the gait cycles of `side`."""
+        frames = self._heel_strikes[side]
+        return np.stack([frames[:-1], frames[1:]], axis=1)
+
+    def stance_fractions(self, side):
+        """The fraction of every gait cycle of `side` before its toe off, i.e. the stance phase; nan for cycles without one."""
+        cycles   = self.cycles(side)
+        toe_offs = np.append(self._toe_offs[side], self._n_frames)
+        frames   = toe_offs[np.searchsorted(toe_offs, cycles[:, 0], side='right')]
+        return np.where(frames < cycles[:, 1], (frames - cycles[:, 0]) / (cycles[:, 1] - cycles[:, 0]), np.nan)
+
+    def to_dict(self):
+        """The events as a dict of JSON serializable values, e.g. to be stored with a session."""
+        return {'heel_strikes': {side: frames.tolist() for side, frames in self._heel_strikes.items()},
+                'toe_offs': {side: frames.tolist() for side, frames in self._toe_offs.items()},
+                'n_frames': self._n_frames}
+
+    @classmethod
+    def from_dict(cls, values):
+        """Rebuild the index saved with `to_dict`."""
+        return cls(values['heel_strikes'], values['toe_offs'], values['n_frames'])
+
+    def __len__(self):
+        return sum(max(frames.shape[0] - 1, 0) for frames in self._heel_strikes.values())
+
+def _get_joint_names(df, suffixes):
+    """The names of the joints with a coordinate for every suffix in `suffixes` in `df`."""
+    if isinstance(df, JointTensor):
+        return df.joint_names
+    return JointTensor._infer_joint_names(df.columns, suffixes)
+
+def _get_gait_signal(df, joint_name, root_joint, axis, face):
+    """The position of `joint_name` relative to `root_joint` along the walking direction `axis`,
+    with the missing frames linearly interpolated over.
+    """
+    sig   = face*(_get_signal(df, joint_name + axis).astype(np.float64) - _get_signal(df, root_joint + axis))
+    valid = np.isfinite(sig)
+    if not np.all(valid):
+        if not np.any(valid):
+            raise ValueError("No valid frames of joint %s."%joint_name)
+        sig = np.interp(np.arange(sig.shape[0]), np.flatnonzero(valid), sig[valid])
+    return sig
+
+def _find_gait_peaks(sig, distance, prominence):
+    """The frames of the peaks of `sig`, by default only those more prominent than its standard deviation."""
+    return spsig.find_peaks(sig, distance=distance, prominence=np.std(sig) if prominence is None else prominence)[0]
+
+@instrumented
+def detect_gait_cycles(df, joints=None, root_joint=None, axis='_Z', face=1, distance=None, prominence=None, suffixes=('_X', '_Y', '_Z')):
+    """Detect the heel-strike and toe-off events of the sides in `joints` and index the gait cycles between them.
+
+    Following the coordinate-based method of https://doi.org/10.1016/j.gaitpost.2007.07.007, a heel strike is a peak
+    of the position of the ankle relative to the root joint (pelvis) along the walking direction, i.e. the ankle is
+    furthest in front of the body, and a toe off is a trough of the position of the foot, i.e. it is furthest behind.
+    All the peaks are found at once with `scipy.signal.find_peaks`.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        joints: dict, the `(heel_joint, toe_joint)` of every side, by default the ankles and feet
+            of `predefined_schemas._JOINT_NAMES_1` and `_JOINT_NAMES_3`
+        root_joint: str, the joint the ankles and feet positions are relative to; by default `SpineB` or `Waist`,
+            whichever is in `df`
+        axis: str, the suffix of the coordinate along the walking direction
+        face: float, whether participant is walking away from (1) or towards (-1) the recording/display device
+        distance: int, the minimum number of frames between two events of the same kind and side
+        prominence: float, the minimum prominence of the events; by default the standard deviation of the relative positions
+        suffixes: tuple, the suffixes of the coordinate columns the joints of `df` are found by when looking for the root joint
+
+    Returns:
+        a `GaitCycleIndex` of the detected events
+    """
+    if df is None:
+        raise TypeError("No input data provided.")
+    joints = _GAIT_JOINTS if joints is None else joints
+    if not isinstance(joints, dict):
+        raise TypeError("Invalid gait joints.")
+    if root_joint is None:
+        joint_names = set(_get_joint_names(df, suffixes))
+        root_joint  = next((jn for jn in _GAIT_ROOT_JOINTS if jn in joint_names), None)
+        if root_joint is None:
+            raise ValueError("No root joint found; one of %s expected."%', '.join(_GAIT_ROOT_JOINTS))
+
+    heel_strikes, toe_offs = {}, {}
+    for side, (heel_joint, toe_joint) in joints.items():
+        heel_strikes[side] = _find_gait_peaks(_get_gait_signal(df, heel_joint, root_joint, axis, face), distance, prominence)
+        toe_offs[side]     = _find_gait_peaks(-_get_gait_signal(df, toe_joint, root_joint, axis, face), distance, prominence)
+
+    return GaitCycleIndex(heel_strikes, toe_offs, len(df))
+
+def _check_cycles(cycles, n_frames):
+    """The `(n_cycles, 2)` int array of the first and last frames of `cycles`, checked against the `n_frames` of the data."""
+    if cycles is None:
+        raise TypeError("No gait cycles provided.")
+    cycles = np.asarray(cycles)
+    if cycles.ndim != 2 or cycles.shape[1] != 2 or (cycles.size and cycles.dtype.kind not in 'iu'):
+        raise TypeError("Invalid gait cycles; a (n_cycles, 2) integer array expected.")
+    cycles = cycles.astype(np.intp, copy=False)
+    if np.any(cycles[:, 1] <= cycles[:, 0]) or np.any(cycles[:, 0] < 0) or np.any(cycles[:, 1] >= n_frames):
+        raise ValueError("Invalid gait cycles; first frames must precede last frames within the %d frames of the data."%n_frames)
+    return cycles
+
+def _normalize_cycles(yy, cycles, n_points):
+    """Resample every cycle of the `(n_frames, n_signals)` array `yy` to `n_points` evenly spaced points from its first
+    to its last frame, all the cycles at once; returns a `(n_points, n_cycles, n_signals)` array.
+    """
+    pos  = cycles[:, 0] + np.linspace(0., 1., n_points)[:, None]*(cycles[:, 1] - cycles[:, 0])
+    idxs = np.minimum(pos.astype(np.intp), yy.shape[0] - 2)
+    frac = (pos - idxs)[:, :, None]
+    return yy[idxs]*(1. - frac) + yy[idxs + 1]*frac
+
+@instrumented
+def normalize_gait_cycles(df, dims, cycles, n_points=101):
+    """Time-normalize the gait cycles of the time series `dims`, i.e. linearly resample every cycle to `n_points`
+    points from 0% (its first frame) to 100% (its last frame) of the cycle.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        dims: list, the time series (angles or coordinates) to be normalized
+        cycles: array, the `(n_cycles, 2)` first and last frames of the cycles, e.g. `GaitCycleIndex.cycles('Right')`
+        n_points: int, the number of points per cycle
+
+    Returns:
+        a `(n_cycles, n_points, len(dims))` array
+    """
+    if df is None:
+        raise TypeError("No input data provided.")
+    if dims is None or not isinstance(dims, (tuple, list)):
+        raise TypeError("Invalid input dimensions.")
+    if n_points < 2:
+        raise ValueError("Need two or more points per cycle; %d provided."%n_points)
+    cycles = _check_cycles(cycles, len(df))
+
+    return np.ascontiguousarray(_normalize_cycles(_get_signals(df, dims), cycles, n_points).transpose(1, 0, 2))
+
+@instrumented
+def calculate_gait_cycle_synchrony_measures(df, dims, cycles, n_points=101, should_remove_outliers=False, method='arctan', normalize=False):
+    """Calculate the PLV and the PA synchrony measures of two dimensions over every gait cycle.
+
+    All the cycles are time-normalized with `normalize_gait_cycles` and processed together: the PLV as in
+    `calculate_phase_locking_value` and the MARP, MRP and CRPSD as in `calculate_phase_angle_measures`,
+    each on the mean-centered signals of one cycle.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        dims: tuple, the two dimensions (angles) in `df` to compute the measures for
+        cycles: array, the `(n_cycles, 2)` first and last frames of the cycles, e.g. `GaitCycleIndex.cycles('Right')`
+        n_points: int, the number of points per cycle
+        should_remove_outliers: bool, whether to remove outliers of the whole signals before calculating the measures
+        method: str, the PA calculation method; see `calculate_phase_angles`
+        normalize: bool, whether to normalize the position and velocity of every cycle before calculating PA
+
+    Returns:
+        a DataFrame with one row per cycle and the columns `start`, `stop`, `plv`, `marp`, `mrp` and `crpsd`
+    """
+    if df is None:
+        raise TypeError("No input data provided.")
+    if dims is None or not isinstance(dims, (tuple, list)):
+        raise TypeError("Invalid input dimensions.")
+    if len(dims) != 2:
+        raise ValueError("Need two angles to compute the measures; %d provided."%len(dims))
+    if n_points < 2:
+        raise ValueError("Need two or more points per cycle; %d provided."%n_points)
+    cycles = _check_cycles(cycles, len(df))
+
+    yy       = _get_signals(df, dims)
+    yy       = _clean_array_gaussian_outliers(yy.T, 3).T if should_remove_outliers else yy
+    yy       = _normalize_cycles(yy, cycles, n_points)
+    yy       = yy - np.mean(yy, axis=0)
+
+    # PLV, along the points axis of every cycle and dimension
+    yy_phase = np.unwrap(np.angle(spsig.hilbert(yy, axis=0)), axis=0)
+    plv      = np.mean(yy_phase[:, :, 0] - yy_phase[:, :, 1], axis=0)
+
+    # PA measures
+    pa_ts    = _calculate_phase_angles(yy, method, normalize)
+    crp      = pa_ts[:, :, 0] - pa_ts[:, :, 1]
+
+    return pd.DataFrame({'start': cycles[:, 0], 'stop': cycles[:, 1], 'plv': plv,
+                         'marp': np.mean(np.abs(crp), axis=0), 'mrp': np.sign(np.mean(crp, axis=0)), 'crpsd': np.std(crp, axis=0)})
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+import pandas as pd
+
+class JointTensor():
+    """A recording held as one contiguous `(n_frames, n_joints, n_dims)` array of joint coordinates.
+
+    The joints axis follows `joint_names`, e.g. `predefined_schemas._JOINT_NAMES_3`, and the last axis follows
+    `suffixes`, so that coordinate :math:`d` of joint :math:`j` corresponds to the column `joint_names[j] + suffixes[d]`
+    of the equivalent wide DataFrame.
+
+    Args:
+        data: array-like, `(n_frames, n_joints, n_dims)` joint coordinates
+        joint_names: list, names of the joints (points of interest)
+        suffixes: tuple, the suffixes of the coordinate columns, e.g. `('_X', '_Y', '_Z')`
+        index: array-like, the frame labels (e.g. the index of the DataFrame the data comes from)
+        dtype: numpy dtype, the floating point type of the buffer; defaults to the type of `data` or float64
+    """
+    def __init__(self, data, joint_names, suffixes=('_X', '_Y', '_Z'), index=None, dtype=None):
+        data = np.asarray(data)
+        if dtype is None:
+            dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.float64
+        data = np.ascontiguousarray(data, dtype=dtype)
+
+        if data.ndim != 3:
+            raise ValueError("Need a (n_frames, n_joints, n_dims) array; %d dimension(s) provided."%data.ndim)
+        if joint_names is None or len(joint_names) != data.shape[1]:
+            raise ValueError("Need %d joint names."%data.shape[1])
+        if suffixes is None or len(suffixes) != data.shape[2]:
+            raise ValueError("Need %d coordinate suffixes."%data.shape[2])
+        if index is not None and len(index) != data.shape[0]:
+            raise ValueError("Need %d index labels; %d provided."%(data.shape[0], len(index)))
+
+        self._data          = data
+        self._joint_names   = list(joint_names)
+        self._suffixes      = tuple(suffixes)
+        self._index         = index
+        self._joint_idxs    = {jn: jidx for jidx, jn in enumerate(self._joint_names)}
+        self._suffix_idxs   = {sfx: sidx for sidx, sfx in enumerate(self._suffixes)}
+
+    @classmethod
+    def from_dataframe(cls, df, joint_names=None, suffixes=('_X', '_Y', '_Z'), dtype=np.float64):
+        """Build a `JointTensor` from a wide DataFrame whose columns are named `joint_name + suffix`.
+
+        Args:
+            df: DataFrame, input data
+            joint_names: list, names of the joints to be extracted, e.g. `predefined_schemas._JOINT_NAMES_3`.
+                If `None`, all the joints having a column for every suffix are used, in the order of `df` columns.
+            suffixes: tuple, the suffixes of the coordinate columns
+            dtype: numpy dtype, the floating point type of the buffer
+
+        Returns:
+            a `JointTensor` holding the coordinates of `joint_names` in `df`
+        """
+        if df is None:
+            raise TypeError("No input data provided.")
+        if joint_names is None:
+            joint_names = cls._infer_joint_names(df.columns, suffixes)
+
+        columns = [jn + sfx for jn in joint_names for sfx in suffixes]
+        data    = np.ascontiguousarray(df.loc[:, columns].to_numpy(dtype=dtype))
+
+        return cls(data.reshape(df.shape[0], len(joint_names), len(suffixes)), joint_names, suffixes, index=df.index)
+
+    @staticmethod
+    def _infer_joint_names(columns, suffixes):
+        """Find the joints that have a column for every suffix in `suffixes`."""
+        column_set  = set(columns)
+        joint_names = []
+        for col in columns:
+            if isinstance(col, str) and col.endswith(suffixes[0]):
+                jn = col[:len(col) - len(suffixes[0])]
+                if all(jn + sfx in column_set for sfx in suffixes):
+                    joint_names.append(jn)
+        return joint_names
+
+    def to_dataframe(self):
+        """Convert to the wide DataFrame layout with one `joint_name + suffix` column per coordinate.
+
+        Returns:
+            a DataFrame sharing the buffer of this `JointTensor` where possible
+        """
+        return pd.DataFrame(self._data.reshape(self._data.shape[0], -1), columns=self.columns, index=self._index, copy=False)
+
+    @property
+    def data(self):
+        """The `(n_frames, n_joints, n_dims)` coordinates buffer."""
+        return self._data
+
+    @property
+    def joint_names(self):
+        """The names of the joints, in the order of the joints axis."""
+        return self._joint_names
+
+    @property
+    def suffixes(self):
+        """The coordinate suffixes, in the order of the last axis."""
+        return self._suffixes
+
+    @property
+    def index(self):
+        """The frame labels, if any."""
+        return self._index
+
+    @property
+    def columns(self):
+        """The column names of the equivalent wide DataFrame."""
+        return [jn + sfx for jn in self._joint_names for sfx in self._suffixes]
+
+    @property
+    def shape(self):
+        return self._data.shape
+
+    def __len__(self):
+        return self._data.shape[0]
+
+    def __contains__(self, joint_name):
+        return joint_name in self._joint_idxs
+
+    def __getitem__(self, frames):
+        """Select a range of frames as a `JointTensor` viewing the same buffer."""
+        if not isinstance(frames, slice):
+            raise TypeError("JointTensor frames can only be selected with a slice.")
+        index = self._index[frames] if self._index is not None else None
+        return JointTensor(self._data[frames], self._joint_names, self._suffixes, index=index)
+
+    def joint_index(self, joint_name):
+        """Position of the joint `joint_name` on the joints axis."""
+        if joint_name not in self._joint_idxs:
+            raise KeyError(joint_name)
+        return self._joint_idxs[joint_name]
+
+    def suffix_indexer(self, suffixes):
+        """Indexer of the coordinates `suffixes` on the last axis; a slice whenever they are consecutive,
+        so that indexing with it does not copy the buffer.
+        """
+        sidxs = []
+        for sfx in suffixes:
+            if sfx not in self._suffix_idxs:
+                raise KeyError(sfx)
+            sidxs.append(self._suffix_idxs[sfx])
+        if sidxs == list(range(sidxs[0], sidxs[0] + len(sidxs))):
+            return slice(sidxs[0], sidxs[0] + len(sidxs))
+        return np.array(sidxs)
+
+    def joint(self, joint_name):
+        """The `(n_frames, n_dims)` coordinates of the joint `joint_name`, as a view of the buffer."""
+        return self._data[:, self.joint_index(joint_name), :]
+
+    def coordinate(self, column):
+        """The coordinate time series named `column` (i.e. `joint_name + suffix`), as a view of the buffer."""
+        for sfx, sidx in self._suffix_idxs.items():
+            if column.endswith(sfx) and column[:len(column) - len(sfx)] in self._joint_idxs:
+                return self._data[:, self._joint_idxs[column[:len(column) - len(sfx)]], sidx]
+        raise KeyError(column)
+
+    def valid_mask(self, joint_names=None):
+        """The `(n_frames, n_joints)` boolean mask of the frames in which all the coordinates of every joint
+        are finite, i.e. the joint was tracked; only the joints `joint_names` if given.
+        """
+        data = self._data if joint_names is None else self._data[:, [self.joint_index(jn) for jn in joint_names], :]
+        return np.all(np.isfinite(data), axis=2)
+
+    def append_joints(self, joint_names, data):
+        """Build a new `JointTensor` with the extra joints `joint_names` whose coordinates are in the
+        `(n_frames, len(joint_names), n_dims)` array `data`. Existing joints with the same names are overwritten.
+        """
+        data        = np.asarray(data, dtype=self._data.dtype)
+        new_names   = [jn for jn in joint_names if jn not in self._joint_idxs]
+        res         = np.empty((self._data.shape[0], len(self._joint_names) + len(new_names), self._data.shape[2]), dtype=self._data.dtype)
+        res[:, :len(self._joint_names), :] = self._data
+        res         = JointTensor(res, self._joint_names + new_names, self._suffixes, index=self._index)
+        res._data[:, [res._joint_idxs[jn] for jn in joint_names], :] = data
+        return res
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+import pandas as pd
+import scipy.signal as spsig
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.articulated_figure import _get_compute_dtype
+from py_wholebodymovement.articulated_figure import _gather_joint_coordinates
+from py_wholebodymovement.articulated_figure import _get_signals
+from py_wholebodymovement.utils.profiling import instrumented
+
+_KINEMATICS_METHODS = ['gradient', 'savgol']
+_KINEMATICS_ORDERS  = 3
+
+def _check_kinematics_args(sampling_rate, method, window_length, polyorder):
+    if sampling_rate is None or not sampling_rate > 0:
+        raise ValueError("Invalid sampling rate %s; a positive number expected."%str(sampling_rate))
+    if method not in _KINEMATICS_METHODS:
+        raise ValueError("Invalid differentiation method %s; one of %s expected."%(str(method), ', '.join(_KINEMATICS_METHODS)))
+    if method == 'savgol':
+        if polyorder < _KINEMATICS_ORDERS:
+            raise ValueError("Need a polynomial order of %d or more to calculate the jerk; %d provided."%(_KINEMATICS_ORDERS, polyorder))
+        if window_length is None or window_length % 2 == 0 or window_length <= polyorder:
+            raise ValueError("Invalid window length %s; an odd number greater than the polynomial order expected."%str(window_length))
+
+def _get_kinematics_margin(method, window_length):
+    """The number of frames at either end of a block whose derivatives depend on the frames beyond the block."""
+    return _KINEMATICS_ORDERS if method == 'gradient' else window_length // 2
+
+def _calculate_derivatives(arr, sampling_rate, method, window_length, polyorder):
+    """Calculate the velocity, acceleration and jerk of the time series in `arr` along its first axis, all the series at once.
+
+    With `method='gradient'`, the derivatives are successive central differences (`np.gradient`); with `method='savgol'`,
+    each one is the derivative of the Savitzky-Golay polynomial fitted over `window_length` frames, which also smooths it.
+    """
+    if method == 'gradient':
+        res    = []
+        values = arr
+        for _ in range(_KINEMATICS_ORDERS):
+            values = np.gradient(values, 1./sampling_rate, axis=0)
+            res.append(values)
+        return tuple(res)
+    return tuple(spsig.savgol_filter(arr, window_length, polyorder, deriv=order, delta=1./sampling_rate, axis=0).astype(arr.dtype, copy=False)
+                 for order in range(1, _KINEMATICS_ORDERS + 1))
+
+def _get_joint_kinematics_coordinates(df, joint_names, suffixes, dtype):
+    """Extract the `(n_frames, len(joint_names), len(suffixes))` coordinates of `joint_names` in `df` as one array of type `dtype`."""
+    if isinstance(df, JointTensor):
+        coords = df.data if joint_names == df.joint_names else df.data[:, [df.joint_index(jn) for jn in joint_names], :]
+        return coords[:, :, df.suffix_indexer(suffixes)].astype(dtype, copy=False)
+    return _gather_joint_coordinates(df, joint_names, suffixes, dtype)
+
+@instrumented
+def calculate_joint_kinematics(df, joint_names=None, sampling_rate=1., method='gradient', window_length=None, polyorder=3,
+                               suffixes=('_X', '_Y', '_Z'), dtype=None):
+    """Calculate the velocity, acceleration and jerk of the coordinates of every joint in `joint_names`.
+
+    The coordinates of all the joints are gathered into one `(n_frames, n_joints, n_dims)` array and differentiated
+    along the frames axis in one pass, without building a DataFrame per joint.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        joint_names: list, names of the joints, e.g. `predefined_schemas._JOINT_NAMES_3`; by default all the joints of `df`
+        sampling_rate: float, the number of frames per second, so that the derivatives are per second (per frame by default)
+        method: str, the differentiation method: `gradient` for central differences, or `savgol` for
+            Savitzky-Golay smoothing-differentiation
+        window_length: int, the odd number of frames of the Savitzky-Golay window
+        polyorder: int, the order of the Savitzky-Golay polynomial; 3 or more
+        suffixes: tuple, the suffixes of the coordinate columns, e.g. `('_X', '_Y')` for 2D data
+        dtype: float32 or float64, the type the derivatives are calculated in, by default that of a `JointTensor` input else float64
+
+    Returns:
+        tuple of JointTensors of the joints `joint_names`:
+
+            - velocity of the joints
+            - acceleration of the joints
+            - jerk of the joints
+    """
+    if df is None:
+        raise TypeError("No input data provided.")
+    _check_kinematics_args(sampling_rate, method, window_length, polyorder)
+    dtype = _get_compute_dtype(df, dtype)
+    if joint_names is None:
+        joint_names = df.joint_names if isinstance(df, JointTensor) else JointTensor._infer_joint_names(df.columns, suffixes)
+
+    coords = _get_joint_kinematics_coordinates(df, list(joint_names), suffixes, dtype)
+    return tuple(JointTensor(values, joint_names, suffixes, index=df.index)
+                 for values in _calculate_derivatives(coords, sampling_rate, method, window_length, polyorder))
+
+@instrumented
+def calculate_angle_kinematics(df, dims=None, sampling_rate=1., method='gradient', window_length=None, polyorder=3, dtype=None):
+    """Calculate the angular velocity, acceleration and jerk of the time series `dims`, e.g. the articulated figure angles.
+
+    Args:
+        df: DataFrame or JointTensor, input data, e.g. the output of `calculate_3d_articulated_figure_angles`
+        dims: list, the time series to be differentiated; by default all the columns of a DataFrame
+        sampling_rate: float, the number of frames per second, so that the derivatives are per second (per frame by default)
+        method: str, the differentiation method; see `calculate_joint_kinematics`
+        window_length: int, the odd number of frames of the Savitzky-Golay window
+        polyorder: int, the order of the Savitzky-Golay polynomial; 3 or more
+        dtype: float32 or float64, the type the derivatives are calculated in
+
+    Returns:
+        tuple of DataFrames with the columns `dims`:
+
+            - velocity of the time series
+            - acceleration of the time series
+            - jerk of the time series
+    """
+    if df is None:
+        raise TypeError("No input data provided.")
+    if dims is None and isinstance(df, pd.DataFrame):
+        dims = list(df.columns)
+    if dims is None or not isinstance(dims, (tuple, list)):
+        raise TypeError("Invalid input dimensions.")
+    _check_kinematics_args(sampling_rate, method, window_length, polyorder)
+    dtype = _get_compute_dtype(None, dtype)
+
+    yy = _get_signals(df, dims).astype(dtype, copy=False)
+    return tuple(pd.DataFrame(values, columns=list(dims), index=df.index)
+                 for values in _calculate_derivatives(yy, sampling_rate, method, window_length, polyorder))
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.articulated_figure import calculate_2d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import extend_2d_articulated_figure
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+from py_wholebodymovement.articulated_figure import calculate_phase_angle_measures
+from py_wholebodymovement.articulated_figure import calculate_fft_based_synchrony_measures
+from py_wholebodymovement.utils.cleaning_utils import clean_dimensions_gaussian_outliers
+from py_wholebodymovement.utils.cleaning_utils import denoise_data
+
+_SHARED_MEMORY_ALIGNMENT = 8
+
+def _stage_extend(state, n_dims, dims=None):
+    extend = extend_2d_articulated_figure if n_dims == 2 else extend_3d_articulated_figure
+    state['data'] = extend(state['data'], dims)
+
+def _stage_angles(state, n_dims, angles, face=1):
+    calculate = calculate_2d_articulated_figure_angles if n_dims == 2 else calculate_3d_articulated_figure_angles
+    state['signals'] = calculate(state['data'], angles, face)
+
+def _stage_clean(state, sigmas=3, window=None):
+    state['signals'] = clean_dimensions_gaussian_outliers(_get_stage_signals(state), sigmas, window)
+
+def _stage_denoise(state, **kwargs):
+    signals = _get_stage_signals(state)
+    state['signals'] = pd.DataFrame(denoise_data(signals.to_numpy(), **kwargs), columns=signals.columns)
+
+def _stage_phase_locking_value(state, dims=None, should_remove_outliers=False):
+    signals = _get_stage_signals(state)
+    for dim_pair in _get_stage_dim_pairs(signals, dims):
+        state['features']['plv_%s_%s'%dim_pair] = calculate_phase_locking_value(signals, dim_pair, should_remove_outliers)[1]
+
+def _stage_phase_angle_measures(state, dims=None, should_remove_outliers=False, method='arctan', normalize=False):
+    signals = _get_stage_signals(state)
+    for dim_pair in _get_stage_dim_pairs(signals, dims):
+        _, marp, mrp, crpsd = calculate_phase_angle_measures(signals, dim_pair, should_remove_outliers, method, normalize)
+        state['features']['marp_%s_%s'%dim_pair]  = marp
+        state['features']['mrp_%s_%s'%dim_pair]   = mrp
+        state['features']['crpsd_%s_%s'%dim_pair] = crpsd
+
+def _stage_fft_based_synchrony_measures(state, dims=None, should_remove_outliers=False):
+    signals = _get_stage_signals(state)
+    for dim_pair in _get_stage_dim_pairs(signals, dims):
+        state['features']['dominant_freqs_var_%s_%s'%dim_pair] = calculate_fft_based_synchrony_measures(signals, dim_pair, should_remove_outliers)[0]
+
+_PIPELINE_STAGES = {
+    'extend_2d':                    lambda state, **kwargs: _stage_extend(state, 2, **kwargs),
+    'extend_3d':                    lambda state, **kwargs: _stage_extend(state, 3, **kwargs),
+    'angles_2d':                    lambda state, **kwargs: _stage_angles(state, 2, **kwargs),
+    'angles_3d':                    lambda state, **kwargs: _stage_angles(state, 3, **kwargs),
+    'clean':                        _stage_clean,
+    'denoise':                      _stage_denoise,
+    'phase_locking_value':          _stage_phase_locking_value,
+    'phase_angle_measures':         _stage_phase_angle_measures,
+    'fft_based_synchrony_measures': _stage_fft_based_synchrony_measures,
+}
+
+def _get_stage_signals(state):
+    """The signals the synchrony stages work on: the output of the last angles/clean/denoise stage, else the session data."""
+    if state['signals'] is None:
+        state['signals'] = state['data'].to_dataframe() if isinstance(state['data'], JointTensor) else state['data']
+    return state['signals']
+
+def _get_stage_dim_pairs(signals, dims):
+    """The pairs of dimensions a synchrony stage is calculated for; all the pairs of signals if `dims` is None."""
+    if dims is None:
+        return list(itertools.combinations(signals.columns, 2))
+    return [tuple(dim_pair) for dim_pair in dims]
+
+def _compile_stages(stages):
+    """Normalize `stages` to a list of (name, kwargs) pairs, checking the stage names."""
+    if stages is None or not isinstance(stages, (tuple, list)):
+        raise TypeError("Invalid pipeline stages.")
+
+    res = []
+    for stage in stages:
+        name, kwargs = (stage, {}) if isinstance(stage, str) else (stage[0], dict(stage[1]))
+        if name not in _PIPELINE_STAGES:
+            raise ValueError("Invalid pipeline stage %s; one of %s expected."%(str(name), ', '.join(_PIPELINE_STAGES)))
+        res.append((name, kwargs))
+    return res
+
+def _get_session_array(data):
+    """The `(n_frames, n_columns)` array of the numeric data of a session and the layout needed to rebuild the whole data:
+    the index, the dtypes of the numeric columns and the values of the other columns, which are sent along with the layout.
+    """
+    if isinstance(data, JointTensor):
+        return data.data.reshape(data.shape[0], -1), {'joint_names': data.joint_names, 'suffixes': data.suffixes, 'index': data.index}
+    if isinstance(data, pd.DataFrame):
+        dtypes = data.dtypes
+        cols   = [col for col, dtype in dtypes.items() if isinstance(dtype, np.dtype) and dtype.kind in 'biuf']
+        dtype  = np.result_type(*[dtypes[col] for col in cols]) if cols else np.dtype(np.float64)
+        packed = set(cols)
+        others = [(cidx, col, data[col].array) for cidx, col in enumerate(data.columns) if col not in packed]
+        return data.loc[:, cols].to_numpy(dtype=dtype), {'columns': cols, 'index': data.index, 'others': others,
+                                                          'dtypes': {col: dtypes[col] for col in cols if dtypes[col] != dtype}}
+    raise TypeError("Invalid session data of type %s."%type(data).__name__)
+
+def _make_session_data(arr, layout):
+    """Rebuild the session data described by `layout` on top of `arr`, copying only the columns whose dtype differs from it."""
+    if 'joint_names' in layout:
+        return JointTensor(arr.reshape(arr.shape[0], len(layout['joint_names']), len(layout['suffixes'])),
+                           layout['joint_names'], layout['suffixes'], index=layout['index'])
+    res = pd.DataFrame(arr, columns=layout['columns'], index=layout['index'], copy=False)
+    if layout['dtypes']:
+        res = res.astype(layout['dtypes'])
+    for cidx, col, values in layout['others']:
+        res.insert(cidx, col, values)
+    return res
+
+def _run_session_stages(data, stages):
+    """Run `stages` on the data of one session and return its features."""
+    state = {'data': data, 'signals': None, 'features': {}}
+    for name, kwargs in stages:
+        _PIPELINE_STAGES[name](state, **kwargs)
+    return state['features']
+
+def _run_shared_memory_chunk(shm_name, layouts, stages):
+    """Run `stages` on the sessions described by `layouts`, whose arrays live in the shared memory block `shm_name`."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        res = []
+        for offset, shape, dtype, layout in layouts:
+            arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+            res.append(_run_session_stages(_make_session_data(arr, layout), stages))
+            del arr
+        return res
+    finally:
+        shm.close()
+
+def run_pipeline(sessions, stages, n_jobs=None, chunksize=None):
+    """Extract the features of a cohort of sessions by running the same pipeline stages on every session.
+
+    Stages run in order on a per-session state: `extend_2d`/`extend_3d` extend the session data, `angles_2d`/`angles_3d`
+    turn it into angle signals, `clean` and `denoise` transform the signals, and `phase_locking_value`,
+    `phase_angle_measures` and `fft_based_synchrony_measures` add one feature per pair of signals
+    (all the pairs unless `dims` is given), e.g. `plv_<dim1>_<dim2>`, `marp_<dim1>_<dim2>`, etc.
+
+    With `n_jobs` > 1, the numeric data of all the sessions is copied once, in its own dtype, into a shared memory block
+    and the sessions are processed in chunks of `chunksize` by a process pool; the workers rebuild their sessions from
+    the shared memory and the (small) index and non-numeric columns sent along, instead of receiving pickled DataFrames,
+    so that they run on the same data as the serial path, and only the features are sent back. This requires Python 3.8+.
+
+    Args:
+        sessions: iterable, the `Session` objects to be processed
+        stages: list, the stages to be run, each one either a stage name or a `(name, kwargs)` tuple,
+            e.g. `[('angles_3d', {'angles': predefined_schemas._ARTICULATED_FIGURE_ANGLES_3}), 'clean', 'phase_locking_value']`
+        n_jobs: int, number of worker processes; `None` to process all the sessions in the calling process
+        chunksize: int, number of sessions sent to a worker at once; by default about four chunks per worker
+
+    Returns:
+        a DataFrame indexed by session name with the participant ID, session number, activity and features of every session
+    """
+    if sessions is None:
+        raise TypeError("No input sessions provided.")
+    sessions = list(sessions)
+    stages   = _compile_stages(stages)
+
+    if n_jobs is None or n_jobs <= 1 or len(sessions) < 2:
+        features = [_run_session_stages(session._data, stages) for session in sessions]
+    else:
+        # shared memory blocks are only available from Python 3.8 on; the serial path does not need them
+        from multiprocessing import shared_memory
+
+        arrays, layouts, offset = [], [], 0
+        for session in sessions:
+            arr, layout = _get_session_array(session._data)
+            arrays.append(arr)
+            layouts.append((offset, arr.shape, arr.dtype, layout))
+            offset += -(-arr.nbytes // _SHARED_MEMORY_ALIGNMENT)*_SHARED_MEMORY_ALIGNMENT
+
+        if chunksize is None:
+            chunksize = max(1, int(np.ceil(len(sessions)/(4.*n_jobs))))
+        chunks = [layouts[cidx:cidx + chunksize] for cidx in range(0, len(layouts), chunksize)]
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        try:
+            for arr, (offset, shape, dtype, _) in zip(arrays, layouts):
+                np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = arr
+            del arrays
+
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                features = list(itertools.chain.from_iterable(
+                    executor.map(_run_shared_memory_chunk, itertools.repeat(shm.name), chunks, itertools.repeat(stages))))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    res = pd.DataFrame.from_records([dict({'participant_id': session._participant_id,
+                                           'session_number': session._session_number,
+                                           'activity': session._activity}, **session_features)
+                                     for session, session_features in zip(sessions, features)],
+                                    index=pd.Index([session._name for session in sessions], name='session'))
+    return res
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import os
+import shutil
+import subprocess
+
+import numpy as np
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.articulated_figure import _gather_joint_coordinates
+
+_RENDERING_BLOCK_SIZE = 1024
+_RENDERING_MARGIN     = 0.05
+
+def _import_matplotlib():
+    """Import the headless (Agg) matplotlib classes, which are only needed for rendering."""
+    try:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    except ImportError:
+        raise ImportError("Rendering requires matplotlib; install it with `pip install py_wholebodymovement[rendering]`.")
+    return Figure, FigureCanvasAgg
+
+def _check_bones(bones):
+    """The joint names of `bones` and the `(n_bones, 2)` indices of the ends of every bone in them."""
+    if bones is None or not isinstance(bones, (tuple, list)) or not all(isinstance(bone, (tuple, list)) and len(bone) == 2 for bone in bones):
+        raise TypeError("Invalid bones; a list of (joint_name, joint_name) pairs expected.")
+    if len(bones) == 0:
+        raise ValueError("No bones provided.")
+    joint_names = list(dict.fromkeys(jn for bone in bones for jn in bone))
+    jidxs       = {jn: jidx for jidx, jn in enumerate(joint_names)}
+    return joint_names, np.array([[jidxs[jn1], jidxs[jn2]] for jn1, jn2 in bones], dtype=np.intp)
+
+def _get_block_coordinates(df, joint_names, suffixes, start, stop, step):
+    """The `(n_block_frames, n_joints, len(suffixes))` float64 coordinates of every `step`-th frame from `start` to `stop`."""
+    if isinstance(df, JointTensor):
+        jidxs = [df.joint_index(jn) for jn in joint_names]
+        return df.data[start:stop:step][:, jidxs][:, :, df.suffix_indexer(suffixes)].astype(np.float64)
+    return _gather_joint_coordinates(df.iloc[start:stop:step], joint_names, suffixes)
+
+def _iter_coordinate_blocks(df, joint_names, suffixes, step, block_size):
+    """Iterate over the coordinates of every `step`-th frame of `df`, `block_size` rendered frames at a time."""
+    n_frames = len(df)
+    for start in range(0, n_frames, block_size*step):
+        yield _get_block_coordinates(df, joint_names, suffixes, start, min(start + block_size*step, n_frames), step)
+
+def _get_limits(df, joint_names, suffixes, step, block_size):
+    """The `(xmin, xmax, ymin, ymax)` of the rendered coordinates, padded by a margin, found block by block."""
+    lows, highs = np.full(2, np.inf), np.full(2, -np.inf)
+    for coords in _iter_coordinate_blocks(df, joint_names, suffixes, step, block_size):
+        valid = coords[np.all(np.isfinite(coords), axis=2)]
+        if valid.shape[0]:
+            lows, highs = np.minimum(lows, valid.min(axis=0)), np.maximum(highs, valid.max(axis=0))
+    if not np.all(np.isfinite(lows)):
+        raise ValueError("No valid frames to render.")
+    margin = np.maximum(highs - lows, 1e-6)*_RENDERING_MARGIN
+    return lows[0] - margin[0], highs[0] + margin[0], lows[1] - margin[1], highs[1] + margin[1]
+
+def iter_skeleton_frames(df, bones, x_suffix='_X', y_suffix='_Y', step=1, size=(480, 480), dpi=100, limits=None,
+                         invert_y=False, color='k', linewidth=2., markersize=4., background='w', block_size=_RENDERING_BLOCK_SIZE):
+    """Render the articulated figure of every `step`-th frame of `df` and iterate over the rendered images.
+
+    The figure is drawn headless (matplotlib Agg, no pyplot) as one persistent line of all the bones, separated by nan
+    points, over a background drawn once: every frame only restores the background, updates the line's data in place
+    and redraws the line (blitting), instead of redrawing the whole figure. The coordinates are gathered `block_size`
+    rendered frames at a time into a fixed buffer, so the memory used does not grow with the length of the recording.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        bones: list, the `(joint_name, joint_name)` pairs of joints connected by a bone, e.g. `predefined_schemas._BONES_3`
+        x_suffix: str, the suffix of the coordinate drawn on the horizontal axis
+        y_suffix: str, the suffix of the coordinate drawn on the vertical axis, e.g. `_Z` for a top view of 3D data
+        step: int, the frame decimation step: only every `step`-th frame is rendered
+        size: tuple, the `(width, height)` of the images in pixels
+        dpi: int, the resolution the line width and marker size are scaled by
+        limits: tuple, the `(xmin, xmax, ymin, ymax)` of the drawn area; by default the range of all the rendered frames
+        invert_y: bool, whether the vertical axis points downwards, e.g. for image coordinates such as `_JOINT_NAMES_2`
+        color: the color of the bones and joints
+        linewidth: float, the width of the bones in points
+        markersize: float, the size of the joints in points; 0 to draw the bones only
+        background: the color of the background
+        block_size: int, the number of rendered frames whose coordinates are gathered at a time
+
+    Returns:
+        iterator over the `(height, width, 4)` uint8 RGBA images of the rendered frames; the same array is
+        updated in place for every frame, so it must be copied to be kept
+    """
+    if df is None:
+        raise TypeError("No input data provided.")
+    if step < 1 or block_size < 1:
+        raise ValueError("Invalid decimation step %s or block size %s; positive integers expected."%(str(step), str(block_size)))
+    Figure, FigureCanvasAgg = _import_matplotlib()
+    joint_names, ends       = _check_bones(bones)
+    suffixes                = (x_suffix, y_suffix)
+    if limits is None:
+        limits = _get_limits(df, joint_names, suffixes, step, block_size)
+
+    fig    = Figure(figsize=(size[0]/dpi, size[1]/dpi), dpi=dpi, facecolor=background)
+    canvas = FigureCanvasAgg(fig)
+    ax     = fig.add_axes([0., 0., 1., 1.])
+    ax.set_axis_off()
+    ax.set_xlim(limits[0], limits[1])
+    ax.set_ylim((limits[3], limits[2]) if invert_y else (limits[2], limits[3]))
+    line,  = ax.plot([], [], color=color, linewidth=linewidth, marker='o' if markersize else None, markersize=markersize,
+                     solid_capstyle='round', animated=True)
+
+    canvas.draw()
+    bg     = canvas.copy_from_bbox(fig.bbox)
+    image  = np.asarray(canvas.buffer_rgba())
+
+    # the bones as (start, end, nan) triplets of points, so that one line draws them all
+    points = np.full((ends.shape[0], 3, 2), np.nan)
+    for coords in _iter_coordinate_blocks(df, joint_names, suffixes, step, block_size):
+        for frame in coords:
+            points[:, :2] = frame[ends]
+            line.set_data(points[:, :, 0].ravel(), points[:, :, 1].ravel())
+            canvas.restore_region(bg)
+            ax.draw_artist(line)
+            yield image
+
+def render_skeleton_animation(df, bones, path, fps=30., step=1, ffmpeg_path='ffmpeg', **kwargs):
+    """Render the articulated figure of `df` into a video or an animated GIF, chosen by the extension of `path`.
+
+    The frames of `iter_skeleton_frames` are piped one at a time as raw RGBA images into an `ffmpeg` process,
+    which encodes them without any of them being kept in memory; the frame rate is `fps/step`, so that
+    the decimated animation plays at the speed of the recording.
+
+    Args:
+        df: DataFrame or JointTensor, input data
+        bones: list, the `(joint_name, joint_name)` pairs of joints connected by a bone, e.g. `predefined_schemas._BONES_3`
+        path: str, the path of the output file, e.g. `walk.mp4` or `walk.gif`
+        fps: float, the number of frames per second of the recording
+        step: int, the frame decimation step: only every `step`-th frame is rendered
+        ffmpeg_path: str, the name or path of the `ffmpeg` executable
+        **kwargs: the rendering options of `iter_skeleton_frames`, e.g. `size`, `limits` or `invert_y`
+
+    Returns:
+        the number of rendered frames
+    """
+    if not fps > 0:
+        raise ValueError("Invalid frame rate %s; a positive number expected."%str(fps))
+    ffmpeg = shutil.which(ffmpeg_path)
+    if ffmpeg is None:
+        raise FileNotFoundError("Rendering a video requires ffmpeg; %s not found."%ffmpeg_path)
+    width, height = kwargs.get('size', (480, 480))
+    output_args   = ['-filter_complex', '[0:v]split[a][b];[a]palettegen[p];[b][p]paletteuse'] \
+                    if os.path.splitext(path)[1].lower() == '.gif' else ['-pix_fmt', 'yuv420p']
+
+    frames   = iter_skeleton_frames(df, bones, step=step, **kwargs)
+    n_frames = 0
+    with subprocess.Popen([ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', '%dx%d'%(width, height),
+                           '-r', '%g'%(fps/step), '-i', '-'] + output_args + [path],
+                          stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as proc:
+        try:
+            for image in frames:
+                proc.stdin.write(image.data)
+                n_frames += 1
+        except BrokenPipeError:
+            pass
+        finally:
+            frames.close()
+            proc.stdin.close()
+        error = proc.stderr.read()
+    if proc.returncode != 0:
+        raise RuntimeError("ffmpeg failed to write %s: %s"%(path, error.decode(errors='replace').strip()))
+    return n_frames
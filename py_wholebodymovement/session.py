@@ -1,13 +1,459 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.gait import GaitCycleIndex
+from py_wholebodymovement.gait import detect_gait_cycles
+from py_wholebodymovement.articulated_figure import calculate_2d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import extend_2d_articulated_figure
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.pipeline import _stage_phase_locking_value
+from py_wholebodymovement.pipeline import _stage_phase_angle_measures
+from py_wholebodymovement.pipeline import _stage_fft_based_synchrony_measures
+from py_wholebodymovement.utils.cleaning_utils import clean_dimensions_gaussian_outliers
+from py_wholebodymovement.utils.cleaning_utils import denoise_data
+
+_METADATA_FILENAME 	= 'metadata.json'
+_COHORT_FILENAME 	= 'sessions.json'
+
+_FEATURE_PARAMS = {
+	'n_dims': 					3,
+	'extended_dims': 			None,
+	'angles': 					None,
+	'face': 					1,
+	'sigmas': 					None,
+	'window': 					None,
+	'denoise': 					None,
+	'synchrony_dims': 			None,
+	'should_remove_outliers': 	False,
+	'method': 					'arctan',
+	'normalize': 				False,
+}
+
+def _feature_extended(session, params, data):
+	if params['extended_dims'] is None:
+		return data
+	extend = extend_2d_articulated_figure if params['n_dims'] == 2 else extend_3d_articulated_figure
+	return extend(data, params['extended_dims'])
+
+def _feature_angles(session, params, extended):
+	if params['angles'] is None:
+		if session._angles is not None:
+			return session._angles
+		raise ValueError("No angles specification set; see Session.set_feature_params.")
+	calculate = calculate_2d_articulated_figure_angles if params['n_dims'] == 2 else calculate_3d_articulated_figure_angles
+	return calculate(extended, params['angles'], params['face'])
+
+def _feature_cleaned_angles(session, params, angles):
+	if params['sigmas'] is None:
+		return angles
+	return clean_dimensions_gaussian_outliers(angles, params['sigmas'], params['window'])
+
+def _feature_denoised_angles(session, params, angles):
+	if params['denoise'] is None:
+		return angles
+	res = denoise_data(angles.to_numpy(), **params['denoise'])
+	if res.shape[0] == len(angles):
+		index = angles.index
+	elif res.shape[0] < len(angles):
+		# a shrunk signal: the label of the frame every denoised sample starts at
+		index = angles.index[np.arange(res.shape[0])*len(angles)//res.shape[0]]
+	else:
+		index = None
+	return pd.DataFrame(res, columns=angles.columns, index=index)
+
+def _feature_synchrony(stage, *keys):
+	"""A synchrony measures feature running the pipeline `stage` with the feature parameters `keys`."""
+	def feature(session, params, signals):
+		state = {'data': None, 'signals': signals, 'features': {}}
+		stage(state, params['synchrony_dims'], *[params[key] for key in keys])
+		return state['features']
+	return feature
+
+# feature name -> (dependencies, parameters, calculation); the features without dependencies are calculated on the session data
+_SESSION_FEATURES = {
+	'extended': 						((), ('n_dims', 'extended_dims'), _feature_extended),
+	'angles': 							(('extended',), ('n_dims', 'angles', 'face'), _feature_angles),
+	'cleaned_angles': 					(('angles',), ('sigmas', 'window'), _feature_cleaned_angles),
+	'denoised_angles': 					(('cleaned_angles',), ('denoise',), _feature_denoised_angles),
+	'phase_locking_values': 			(('denoised_angles',), ('synchrony_dims', 'should_remove_outliers'),
+										 _feature_synchrony(_stage_phase_locking_value, 'should_remove_outliers')),
+	'phase_angle_measures': 			(('denoised_angles',), ('synchrony_dims', 'should_remove_outliers', 'method', 'normalize'),
+										 _feature_synchrony(_stage_phase_angle_measures, 'should_remove_outliers', 'method', 'normalize')),
+	'fft_based_synchrony_measures': 	(('denoised_angles',), ('synchrony_dims', 'should_remove_outliers'),
+										 _feature_synchrony(_stage_fft_based_synchrony_measures, 'should_remove_outliers')),
+}
+
 class Session():
 	"""Information about individual recording sessions.
+
+	A session also evaluates the features of its data lazily along the feature graph
+
+		extended -> angles -> cleaned_angles -> denoised_angles -> phase_locking_values, phase_angle_measures, fft_based_synchrony_measures
+
+	Requesting a feature with `feature` only calculates the features it depends on, and every calculated feature
+	is memoized on the session until the data or the parameters it depends on change, e.g.
+
+		session.set_feature_params(angles=predefined_schemas._ARTICULATED_FIGURE_ANGLES_3, sigmas=3)
+		session.feature('phase_locking_values')
 	"""
-	def __init__(self, name, data, activity=None, participant_id=None, date_time=None, comments=None):
+	def __init__(self, name, data, activity=None, participant_id=None, date_time=None, comments=None, angles=None, session_number=None, gait_cycles=None):
 		self._name 				= name
 		self._data 				= data
 		self._activity 			= activity
 		self._participant_id 	= participant_id
+		self._session_number 	= session_number
 		self._date_time 		= date_time
-		self._comments 			= comments
\ No newline at end of file
+		self._comments 			= comments
+		self._angles 			= angles
+		self._gait_cycles 		= gait_cycles
+		self._feature_params 	= dict(_FEATURE_PARAMS)
+		self._features 			= {}
+		self._features_data 	= None
+
+	def save(self, path):
+		"""Save the session to the directory `path`: every array (joint tensor, DataFrame column, derived angle)
+		is written to its own `.npy` file and the rest of the session goes to a JSON metadata sidecar.
+
+		Args:
+			path: str, the directory to save the session to; it is created if needed
+		"""
+		os.makedirs(path, exist_ok=True)
+
+		metadata = {
+			'name': 			self._name,
+			'activity': 		self._activity,
+			'participant_id': 	self._participant_id,
+			'session_number': 	self._session_number,
+			'date_time': 		self._date_time.isoformat() if hasattr(self._date_time, 'isoformat') else self._date_time,
+			'comments': 		self._comments,
+			'data': 			_save_array_data(path, 'data', self._data),
+			'angles': 			_save_array_data(path, 'angles', self._angles),
+			'gait_cycles': 		self._gait_cycles.to_dict() if self._gait_cycles is not None else None,
+		}
+
+		with open(os.path.join(path, _METADATA_FILENAME), 'w') as f:
+			json.dump(metadata, f, default=_json_default)
+
+	@classmethod
+	def load(cls, path, mmap_mode='r'):
+		"""Load a session saved with `Session.save`. The arrays are memory-mapped rather than read,
+		so loading costs the same regardless of the size of the recording.
+
+		Args:
+			path: str, the directory the session was saved to
+			mmap_mode: str, the `numpy.load` memory-map mode; None to read the arrays into memory
+
+		Returns:
+			the loaded `Session`
+		"""
+		with open(os.path.join(path, _METADATA_FILENAME)) as f:
+			metadata = json.load(f)
+
+		return cls(metadata['name'],
+				   _load_array_data(path, metadata['data'], mmap_mode),
+				   activity=metadata['activity'],
+				   participant_id=metadata['participant_id'],
+				   date_time=metadata['date_time'],
+				   comments=metadata['comments'],
+				   angles=_load_array_data(path, metadata['angles'], mmap_mode),
+				   session_number=metadata.get('session_number'),
+				   gait_cycles=GaitCycleIndex.from_dict(metadata['gait_cycles']) if metadata.get('gait_cycles') else None)
+
+	@property
+	def data(self):
+		"""The session data; setting it discards all the memoized features."""
+		return self._data
+
+	@data.setter
+	def data(self, data):
+		self._data = data
+		self.invalidate()
+
+	@property
+	def feature_params(self):
+		"""The parameters of the feature graph."""
+		return dict(self._feature_params)
+
+	def set_feature_params(self, **params):
+		"""Set parameters of the feature graph, discarding the memoized features that depend on them.
+
+		Args:
+			n_dims: int, whether the data is 2D (2) or 3D (3)
+			extended_dims: dict, the extra POIs of `extend_2d_articulated_figure`/`extend_3d_articulated_figure`; None not to extend the data
+			angles: dict, the articulated figure angles; None to use the angles the session was created with
+			face: float, whether participant is walking away from (1) or towards (-1) the recording/display device
+			sigmas: float, the outlier threshold of `clean_dimensions_gaussian_outliers`; None not to clean the angles
+			window: int, the rolling window of `clean_dimensions_gaussian_outliers`
+			denoise: dict, the arguments of `denoise_data`; None not to denoise the angles
+			synchrony_dims: list, the pairs of angles of the synchrony measures; None for all the pairs
+			should_remove_outliers: bool, whether the synchrony measures remove outliers first
+			method: str, the PA calculation method of the PA measures
+			normalize: bool, whether to normalize the position and velocity before calculating PA
+		"""
+		for key in params:
+			if key not in _FEATURE_PARAMS:
+				raise ValueError("Invalid feature parameter %s; one of %s expected."%(str(key), ', '.join(_FEATURE_PARAMS)))
+		self._feature_params.update(params)
+		for name, (_, keys, _) in _SESSION_FEATURES.items():
+			if any(key in params for key in keys):
+				self.invalidate(name)
+
+	def invalidate(self, name=None):
+		"""Discard the memoized feature `name` and all the features depending on it, or all the features if `name` is None.
+		Needed after modifying the session data in place, whereas replacing it is detected.
+		"""
+		if name is None:
+			self._features.clear()
+			return
+		if name not in _SESSION_FEATURES:
+			raise ValueError("Invalid feature %s; one of %s expected."%(str(name), ', '.join(_SESSION_FEATURES)))
+		stale = {name}
+		for feature_name, (dependencies, _, _) in _SESSION_FEATURES.items():
+			if any(dependency in stale for dependency in dependencies):
+				stale.add(feature_name)
+		for feature_name in stale:
+			self._features.pop(feature_name, None)
+
+	def feature(self, name):
+		"""Calculate the feature `name`, along with the features it depends on that are not memoized yet.
+
+		Args:
+			name: str, one of `extended`, `angles`, `cleaned_angles`, `denoised_angles`, `phase_locking_values`,
+				`phase_angle_measures` and `fft_based_synchrony_measures`
+
+		Returns:
+			the DataFrame of the data or angles features, or the dict of the synchrony measures keyed 
+			as in `run_pipeline`, e.g. `plv_<dim1>_<dim2>`
+		"""
+		if name not in _SESSION_FEATURES:
+			raise ValueError("Invalid feature %s; one of %s expected."%(str(name), ', '.join(_SESSION_FEATURES)))
+		if self._features_data is not self._data:
+			self._features.clear()
+			self._features_data = self._data
+		if name not in self._features:
+			dependencies, _, calculate = _SESSION_FEATURES[name]
+			args = [self.feature(dependency) for dependency in dependencies] if dependencies else [self._data]
+			self._features[name] = calculate(self, self._feature_params, *args)
+		return self._features[name]
+
+	def detect_gait_cycles(self, **kwargs):
+		"""Detect the gait events of the session data with `gait.detect_gait_cycles` and keep their index with the session,
+		so that it is saved along with it.
+
+		Args:
+			**kwargs: dict, the arguments of `gait.detect_gait_cycles`
+
+		Returns:
+			the `GaitCycleIndex` of the session
+		"""
+		self._gait_cycles = detect_gait_cycles(self._data, **kwargs)
+		return self._gait_cycles
+
+class SessionCollection():
+	"""A collection of sessions indexed by (participant, session number, activity).
+
+	The sessions of a collection built with `from_dataframe` are consecutive slices of one table sorted once by 
+	the key columns, so looking a session up is a dictionary access and iterating over the sessions copies no data.
+
+	Args:
+		sessions: iterable, the `Session` objects of the collection
+	"""
+	def __init__(self, sessions=()):
+		self._sessions 	= []
+		self._index 	= {}
+		for session in sessions:
+			self.add(session)
+
+	@classmethod
+	def from_dataframe(cls, df, participant_col='UserID', session_col='SessionNumber', activity_col='MovementName'):
+		"""Split a long-format capture table, e.g. the one in `captureddata_1.zip`, into one session 
+		per (participant, session number, activity).
+
+		Args:
+			df: DataFrame, the input data with one row per frame
+			participant_col: str, the column of the participant IDs
+			session_col: str, the column of the session numbers
+			activity_col: str, the column of the activity (movement) names
+
+		Returns:
+			a `SessionCollection` whose sessions hold consecutive row slices of `df` sorted by the key columns
+		"""
+		if df is None:
+			raise TypeError("No input data provided.")
+		key_cols = [participant_col, session_col, activity_col]
+		for col in key_cols:
+			if col not in df.columns:
+				raise KeyError(col)
+
+		codes = df.groupby(key_cols, sort=False, dropna=False).ngroup().to_numpy()
+		if np.any(np.diff(codes) < 0):
+			order 	= np.argsort(codes, kind='stable')
+			df 		= df.iloc[order]
+			codes 	= codes[order]
+		offsets = np.concatenate([[0], np.cumsum(np.bincount(codes))])
+
+		res = cls()
+		for gidx in range(len(offsets) - 1):
+			data 	= df.iloc[offsets[gidx]:offsets[gidx + 1]]
+			key 	= tuple(data[col].iat[0] for col in key_cols)
+			res.add(Session('_'.join(str(k) for k in key), data, activity=key[2], participant_id=key[0], session_number=key[1]))
+
+		return res
+
+	@staticmethod
+	def _key(session):
+		"""The (participant, session number, activity) key of `session`."""
+		return (session._participant_id, session._session_number, session._activity)
+
+	def add(self, session):
+		"""Add `session` to the collection; its (participant, session number, activity) key must be new."""
+		key = self._key(session)
+		if key in self._index:
+			raise ValueError("Duplicate session %s."%str(key))
+		self._index[key] = len(self._sessions)
+		self._sessions.append(session)
+
+	def keys(self):
+		"""The (participant, session number, activity) keys of the sessions, in collection order."""
+		return list(self._index)
+
+	def get(self, participant_id, session_number, activity, default=None):
+		"""The session of `participant_id`, `session_number` and `activity`, or `default` if there is none."""
+		sidx = self._index.get((participant_id, session_number, activity))
+		return default if sidx is None else self._sessions[sidx]
+
+	def select(self, participant_id=None, session_number=None, activity=None):
+		"""Iterate over the sessions matching all the given key values; `None` matches any value.
+
+		The selection scans the session keys, not the frames, so it does not depend on the length of the recordings.
+		"""
+		for key, sidx in self._index.items():
+			if (participant_id is None or key[0] == participant_id) and \
+			   (session_number is None or key[1] == session_number) and \
+			   (activity is None or key[2] == activity):
+				yield self._sessions[sidx]
+
+	def __getitem__(self, key):
+		return self._sessions[self._index[tuple(key)]]
+
+	def __contains__(self, key):
+		return tuple(key) in self._index
+
+	def __iter__(self):
+		return iter(self._sessions)
+
+	def __len__(self):
+		return len(self._sessions)
+
+def save_sessions(sessions, path):
+	"""Save a cohort of sessions to the directory `path`, one sub-directory per session plus an index
+	of the session names, so that `load_session` can open any of them without reading the others.
+
+	Args:
+		sessions: iterable, the `Session` objects to be saved
+		path: str, the directory to save the sessions to
+	"""
+	os.makedirs(path, exist_ok=True)
+
+	index = {}
+	for sidx, session in enumerate(sessions):
+		if session._name in index:
+			raise ValueError("Duplicate session name %s."%str(session._name))
+		index[session._name] = 'session_%06d'%sidx
+		session.save(os.path.join(path, index[session._name]))
+
+	with open(os.path.join(path, _COHORT_FILENAME), 'w') as f:
+		json.dump(index, f)
+
+def list_sessions(path):
+	"""List the names of the sessions saved with `save_sessions` in the directory `path`."""
+	with open(os.path.join(path, _COHORT_FILENAME)) as f:
+		return list(json.load(f))
+
+def load_session(path, name, mmap_mode='r'):
+	"""Load the session `name` out of the cohort saved with `save_sessions` in the directory `path`.
+
+	Args:
+		path: str, the directory the sessions were saved to
+		name: str, the name of the session
+		mmap_mode: str, the `numpy.load` memory-map mode; None to read the arrays into memory
+
+	Returns:
+		the loaded `Session`
+	"""
+	with open(os.path.join(path, _COHORT_FILENAME)) as f:
+		index = json.load(f)
+	if name not in index:
+		raise KeyError(name)
+	return Session.load(os.path.join(path, index[name]), mmap_mode=mmap_mode)
+
+def _json_default(obj):
+	"""Convert the numpy scalars found in session metadata to JSON."""
+	if isinstance(obj, np.generic):
+		return obj.item()
+	raise TypeError("Object of type %s is not JSON serializable."%type(obj).__name__)
+
+def _save_array(path, filename, values):
+	"""Save `values` to `filename` in `path`; values of a dtype that cannot be memory-mapped are saved as strings."""
+	values = np.asarray(values)
+	if values.dtype.kind not in 'biufcmM':
+		values = values.astype(str)
+	np.save(os.path.join(path, filename), values, allow_pickle=False)
+	return filename
+
+def _save_index(path, key, index):
+	"""Save the frame labels `index` under `key` in `path`; a RangeIndex is only described by the metadata."""
+	if index is None:
+		return None
+	if isinstance(index, pd.RangeIndex):
+		return {'start': index.start, 'stop': index.stop, 'step': index.step}
+	return _save_array(path, key + '.index.npy', index)
+
+def _load_index(path, metadata, mmap_mode):
+	"""Load the frame labels described by `metadata` from `path`."""
+	if metadata is None:
+		return None
+	if isinstance(metadata, dict):
+		return pd.RangeIndex(metadata['start'], metadata['stop'], metadata['step'])
+	return pd.Index(np.load(os.path.join(path, metadata), mmap_mode=mmap_mode), copy=False)
+
+def _save_array_data(path, key, data):
+	"""Save the DataFrame or JointTensor `data` under `key` in `path` and return its metadata."""
+	if data is None:
+		return None
+
+	if isinstance(data, JointTensor):
+		return {'type': 'joint_tensor',
+				'filename': _save_array(path, key + '.npy', data.data),
+				'joint_names': data.joint_names,
+				'suffixes': list(data.suffixes),
+				'index': _save_index(path, key, data.index)}
+
+	if isinstance(data, pd.DataFrame):
+		return {'type': 'dataframe',
+				'columns': list(data.columns),
+				'filenames': [_save_array(path, '%s.%d.npy'%(key, cidx), data.iloc[:, cidx]) for cidx in range(data.shape[1])],
+				'index': _save_index(path, key, data.index)}
+
+	raise TypeError("Cannot save data of type %s."%type(data).__name__)
+
+def _load_array_data(path, metadata, mmap_mode):
+	"""Load the DataFrame or JointTensor described by `metadata` from `path`."""
+	if metadata is None:
+		return None
+
+	if metadata['type'] == 'joint_tensor':
+		return JointTensor(np.load(os.path.join(path, metadata['filename']), mmap_mode=mmap_mode),
+						   metadata['joint_names'], metadata['suffixes'], index=_load_index(path, metadata['index'], mmap_mode))
+
+	columns = {col: np.load(os.path.join(path, filename), mmap_mode=mmap_mode)
+			   for col, filename in zip(metadata['columns'], metadata['filenames'])}
+	return pd.DataFrame(columns, index=_load_index(path, metadata['index'], mmap_mode), columns=metadata['columns'], copy=False)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import numpy as np
+import pandas as pd
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.articulated_figure import compile_angle_schema
+from py_wholebodymovement.articulated_figure import _get_schema_coordinates
+from py_wholebodymovement.articulated_figure import _calculate_schema_angles
+from py_wholebodymovement.articulated_figure import _get_compute_dtype
+from py_wholebodymovement.kinematics import _check_kinematics_args
+from py_wholebodymovement.kinematics import _get_kinematics_margin
+from py_wholebodymovement.kinematics import _calculate_derivatives
+from py_wholebodymovement.kinematics import _get_joint_kinematics_coordinates
+
+class StreamingAngleCalculator():
+    """Calculates articulated figure angles incrementally over chunks of frames, e.g. from a live capture feed.
+
+    Every chunk is processed with the same batched kernel as `calculate_2d_articulated_figure_angles` and
+    `calculate_3d_articulated_figure_angles`, so the work per chunk is proportional to its length and nothing
+    but a frame counter is kept between chunks.
+
+    Args:
+        angles: dict or CompiledAngleSchema, specification of the articulated figure angles to be calculated,
+            e.g. `predefined_schemas._ARTICULATED_FIGURE_ANGLES_3`
+        n_dims: int, whether to calculate 2D (2) or 3D (3) angles
+        face: float, whether participnt is walking away from (1) or towards (-1) the recording/display device
+        x_suffix: str, the suffix of the x ccordinate column
+        y_suffix: str, the suffix of the y ccordinate column
+        z_suffix: str, the suffix of the z ccordinate column
+        dtype: float32 or float64, the type the angles are calculated in, by default that of each chunk (float64 for DataFrames)
+    """
+    def __init__(self, angles, n_dims=3, face=1, x_suffix='_X', y_suffix='_Y', z_suffix='_Z', dtype=None):
+        if n_dims not in (2, 3):
+            raise ValueError("Invalid number of dimensions %s; 2 or 3 expected."%str(n_dims))
+
+        self._schema   = compile_angle_schema(angles)
+        self._suffixes = (x_suffix, y_suffix, z_suffix)[:n_dims]
+        self._face     = face
+        self._dtype    = None if dtype is None else _get_compute_dtype(None, dtype)
+        self._n_frames = 0
+
+    @property
+    def n_frames(self):
+        """Number of frames processed so far."""
+        return self._n_frames
+
+    def reset(self):
+        """Restart the frame count, e.g. for a new recording."""
+        self._n_frames = 0
+
+    def push(self, frames):
+        """Calculate the angles of a chunk of frames.
+
+        Args:
+            frames: DataFrame, JointTensor or `(n_frames, n_joints, n_dims)` array whose joints axis
+                follows the `joint_names` of the compiled schema
+
+        Returns:
+            a DataFrame of the angles of `frames`, indexed by the running frame number
+        """
+        if frames is None:
+            raise TypeError("No input data provided.")
+
+        if isinstance(frames, np.ndarray):
+            if frames.ndim != 3 or frames.shape[1:] != (len(self._schema.joint_names), len(self._suffixes)):
+                raise ValueError("Need a (n_frames, %d, %d) array."%(len(self._schema.joint_names), len(self._suffixes)))
+            coords, schema = frames, self._schema
+            dtype          = self._dtype if self._dtype is not None else np.result_type(frames.dtype, np.float32)
+        else:
+            dtype          = _get_compute_dtype(frames, self._dtype)
+            coords, schema = _get_schema_coordinates(frames, self._schema, self._suffixes, dtype)
+
+        thetas = _calculate_schema_angles(coords, schema, self._face, dtype=dtype)
+        res    = pd.DataFrame(thetas, columns=self._schema.angle_names,
+                           index=pd.RangeIndex(self._n_frames, self._n_frames + thetas.shape[0]))
+        self._n_frames += thetas.shape[0]
+
+        return res
+
+    def process(self, chunks):
+        """Calculate the angles of every chunk of frames yielded by `chunks`.
+
+        Args:
+            chunks: iterable, chunks of frames as accepted by `push`
+
+        Yields:
+            a DataFrame of the angles of each chunk
+        """
+        for frames in chunks:
+            yield self.push(frames)
+
+class StreamingKinematicsCalculator():
+    """Calculates the velocity, acceleration and jerk of joints incrementally over chunks of frames.
+
+    The derivatives of a frame depend on its neighbours, so the last few frames of every chunk are held back
+    until the next chunk (or `flush`) provides their right context, and a few frames before them are kept as left
+    context. The concatenated output is the same as that of `calculate_joint_kinematics` on the whole recording.
+
+    Args:
+        joint_names: list, names of the joints, e.g. `predefined_schemas._JOINT_NAMES_3`
+        sampling_rate: float, the number of frames per second
+        method: str, the differentiation method: `gradient` or `savgol`; see `calculate_joint_kinematics`
+        window_length: int, the odd number of frames of the Savitzky-Golay window
+        polyorder: int, the order of the Savitzky-Golay polynomial; 3 or more
+        suffixes: tuple, the suffixes of the coordinate columns
+        dtype: float32 or float64, the type the derivatives are calculated in, by default that of each chunk (float64 for DataFrames)
+    """
+    def __init__(self, joint_names, sampling_rate=1., method='gradient', window_length=None, polyorder=3,
+                 suffixes=('_X', '_Y', '_Z'), dtype=None):
+        _check_kinematics_args(sampling_rate, method, window_length, polyorder)
+
+        self._joint_names = list(joint_names)
+        self._suffixes    = tuple(suffixes)
+        self._args        = (sampling_rate, method, window_length, polyorder)
+        self._margin      = _get_kinematics_margin(method, window_length)
+        self._dtype       = None if dtype is None else _get_compute_dtype(None, dtype)
+        self.reset()
+
+    @property
+    def n_frames(self):
+        """Number of frames whose derivatives were output so far."""
+        return self._n_frames
+
+    def reset(self):
+        """Drop the held back frames and restart the frame count, e.g. for a new recording."""
+        self._buffer    = None
+        self._n_context = 0
+        self._n_frames  = 0
+
+    def _get_coordinates(self, frames):
+        if isinstance(frames, np.ndarray):
+            if frames.ndim != 3 or frames.shape[1:] != (len(self._joint_names), len(self._suffixes)):
+                raise ValueError("Need a (n_frames, %d, %d) array."%(len(self._joint_names), len(self._suffixes)))
+            dtype = self._dtype if self._dtype is not None else np.result_type(frames.dtype, np.float32)
+            return frames.astype(dtype, copy=False)
+        return _get_joint_kinematics_coordinates(frames, self._joint_names, self._suffixes, _get_compute_dtype(frames, self._dtype))
+
+    def _output(self, data, stop):
+        """Calculate the derivatives of the buffered `data` and output those of its frames from the end of the context to `stop`."""
+        if stop > self._n_context:
+            derivatives = _calculate_derivatives(data, *self._args)
+        else:
+            derivatives = 3*(np.empty((0,) + data.shape[1:], dtype=data.dtype),)
+            stop        = self._n_context
+        index = pd.RangeIndex(self._n_frames, self._n_frames + stop - self._n_context)
+        res   = tuple(JointTensor(values[self._n_context:stop], self._joint_names, self._suffixes, index=index) for values in derivatives)
+        self._n_frames += stop - self._n_context
+        return res
+
+    def push(self, frames):
+        """Calculate the derivatives of a chunk of frames, except for the last ones, which wait for the next chunk.
+
+        Args:
+            frames: DataFrame, JointTensor or `(n_frames, n_joints, n_dims)` array whose joints axis follows `joint_names`
+
+        Returns:
+            tuple of JointTensors of the velocity, acceleration and jerk of the frames ready, indexed by the running frame number
+        """
+        if frames is None:
+            raise TypeError("No input data provided.")
+
+        coords = self._get_coordinates(frames)
+        data   = coords if self._buffer is None else np.concatenate([self._buffer.astype(coords.dtype, copy=False), coords])
+        # the derivatives of the frames up to `stop` no longer depend on the frames to come
+        stop   = data.shape[0] - self._margin if data.shape[0] > 2*self._margin else 0
+        res    = self._output(data, stop)
+
+        start           = max(max(stop, self._n_context) - 2*self._margin, 0)
+        self._buffer    = data[start:]
+        self._n_context = max(stop, self._n_context) - start
+        return res
+
+    def flush(self):
+        """Calculate the derivatives of the frames held back, at the end of the recording.
+
+        Returns:
+            tuple of JointTensors of the velocity, acceleration and jerk of the remaining frames
+        """
+        if self._buffer is None:
+            return self._output(np.empty((0, len(self._joint_names), len(self._suffixes))), 0)
+        res             = self._output(self._buffer, self._buffer.shape[0])
+        self._buffer    = None
+        self._n_context = 0
+        return res
+
+    def process(self, chunks):
+        """Calculate the derivatives of every chunk of frames yielded by `chunks`, flushing the last frames at the end.
+
+        Args:
+            chunks: iterable, chunks of frames as accepted by `push`
+
+        Yields:
+            tuples of JointTensors of the velocity, acceleration and jerk of the frames ready after each chunk
+        """
+        for frames in chunks:
+            yield self.push(frames)
+        yield self.flush()
@@ -19,15 +19,24 @@ from py_wholebodymovement.utils.cleaning_utils import clean_gaussian_outliers
 from py_wholebodymovement.utils.cleaning_utils import clean_dimensions_gaussian_outliers
 from py_wholebodymovement.utils.cleaning_utils import denoise_data
 
+from py_wholebodymovement.articulated_figure import compile_angle_schema
 from py_wholebodymovement.articulated_figure import calculate_2d_articulated_figure_angle
 from py_wholebodymovement.articulated_figure import calculate_2d_articulated_figure_angles
 from py_wholebodymovement.articulated_figure import extend_2d_articulated_figure
 from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angle
 from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
 from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.articulated_figure import calculate_cohort_articulated_figure_angles
 from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+from py_wholebodymovement.articulated_figure import iter_windowed_phase_locking_values
+from py_wholebodymovement.articulated_figure import calculate_windowed_phase_locking_value
 from py_wholebodymovement.articulated_figure import calculate_phase_angles
 from py_wholebodymovement.articulated_figure import calculate_phase_angle_measures
+from py_wholebodymovement.articulated_figure import calculate_fft_based_synchrony_measures
+from py_wholebodymovement.articulated_figure import calculate_synchrony_matrices
+from py_wholebodymovement.streaming import StreamingAngleCalculator
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.session import Session
 
 datasets_path   = os.sep.join([get_install_path(), 'tests', 'test_datasets'])
 
@@ -92,3 +101,334 @@ class ArticulatedFigureTestCases(unittest.TestCase):
         self.assertEqual(_angles[-1], 135.)
 
         print(_angles)
+
+    def test_calculate_3d_articulated_figure_angle_batch(self):
+        _joint_names = ['Head', 'RightShoulder', 'Torso']
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(_joint_names, _dim_names)]
+
+        _test_data   = pd.DataFrame([[0, 0, 0, 1, 0, 0, 0, 1, 0],
+                                     [0, 0, 0, 1, 0, 1, 1, 0, 0],
+                                     [0, 0, 0, 1, 0, 0, 2, 0, 0]], columns=_columns)
+
+        _angles      = calculate_3d_articulated_figure_angle(_test_data, 'Head', 'RightShoulder', 'Torso')
+
+        self.assertIsInstance(_angles, np.ndarray)
+        np.testing.assert_allclose(_angles, [90., 45., 360.])
+
+        _angles      = calculate_3d_articulated_figure_angle(_test_data, 'Head', 'RightShoulder', 'Torso', pos_angles=False)
+
+        np.testing.assert_allclose(_angles, [90., 45., 0.])
+
+        _test_data.loc[1, 'Torso_Y'] = np.nan
+
+        self.assertRaises(ValueError, calculate_3d_articulated_figure_angle, _test_data, 'Head', 'RightShoulder', 'Torso')
+
+    def test_calculate_2d_articulated_figure_angle_degenerate(self):
+        _joint_names = ['Head', 'RightShoulder', 'Torso']
+        _dim_names   = ['_X', '_Y']
+        _columns     = [jn + dn for jn, dn in itertools.product(_joint_names, _dim_names)]
+
+        # coincident joints, whose zero vectors have -0. dot and cross products with other vectors
+        _test_data   = pd.DataFrame([[1, 2, 1, 2, 0, -1],
+                                     [0, 0, 0, 0, -1, -1],
+                                     [0, 0, 1, -1, 0, 0],
+                                     [0, 0, 0, 0, 0, 0],
+                                     [0, 0, 1, 0, 0, 1]], columns=_columns, dtype=np.float64)
+
+        for z_dir in [1, -1]:
+            # the per-frame formula the batched calculation replaces
+            _o_e1_vecs   = np.array([_test_data['RightShoulder' + dn] - _test_data['Head' + dn] for dn in _dim_names] + [np.zeros(5)]).T
+            _o_e2_vecs   = np.array([_test_data['Torso' + dn] - _test_data['Head' + dn] for dn in _dim_names] + [np.zeros(5)]).T
+            _thetas      = np.arctan2(np.einsum('ij,ij->i', np.cross(_o_e1_vecs, _o_e2_vecs), np.array(5*[(0, 0, z_dir)])),
+                                      np.einsum('ij,ij->i', _o_e1_vecs, _o_e2_vecs))*180./np.pi
+            _expected    = np.where(_thetas >= 0, _thetas, 360. + _thetas)
+
+            np.testing.assert_array_equal(calculate_2d_articulated_figure_angle(_test_data, 'Head', 'RightShoulder', 'Torso', z_dir), _expected)
+            np.testing.assert_array_equal(calculate_2d_articulated_figure_angles(_test_data, {'theta': ('Head', 'RightShoulder', 'Torso', z_dir, True)})['theta'],
+                                          _expected)
+            np.testing.assert_array_equal(_expected[:4], [0.]*4)
+
+    def test_calculate_3d_articulated_figure_angle_degenerate(self):
+        _joint_names = ['Head', 'RightShoulder', 'Torso']
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(_joint_names, _dim_names)]
+
+        # coincident joints, whose zero vectors have -0. dot products with vectors of negative coordinates
+        _test_data   = pd.DataFrame([[0, 0, 0, 0, 0, 0, -1, -1, -1],
+                                     [1, 1, 1, 1, 1, 1, 0, 0, 0],
+                                     [1, 2, 3, -1, 5, 2, 1, 2, 3],
+                                     [0, 0, 0, 0, 0, 0, 0, 0, 0]], columns=_columns, dtype=np.float64)
+
+        # the per-frame loop the batched calculation replaces
+        _expected    = []
+        for _, _row in _test_data.iterrows():
+            _o_e1_vec    = tuple(_row['RightShoulder' + dn] - _row['Head' + dn] for dn in _dim_names)
+            _o_e2_vec    = tuple(_row['Torso' + dn] - _row['Head' + dn] for dn in _dim_names)
+            _theta       = np.arctan2(np.linalg.norm(np.cross(_o_e1_vec, _o_e2_vec)), np.dot(_o_e1_vec, _o_e2_vec))*180./np.pi
+            _expected.append(_theta if _theta > 0 else 360. + _theta)
+
+        np.testing.assert_array_equal(calculate_3d_articulated_figure_angle(_test_data, 'Head', 'RightShoulder', 'Torso'), _expected)
+        np.testing.assert_array_equal(_expected, [360.]*4)
+
+    def test_compile_angle_schema(self):
+        _schema      = compile_angle_schema(psc._ARTICULATED_FIGURE_ANGLES_3)
+
+        self.assertEqual(_schema.angle_names, list(psc._ARTICULATED_FIGURE_ANGLES_3))
+        self.assertEqual(len(_schema.joint_names), len(set(_schema.joint_names)))
+        self.assertEqual(_schema.joint_names[_schema.vertices[0]], 'RightShoulder')
+        self.assertEqual(_schema.joint_names[_schema.ends1[0]], 'Neck')
+        self.assertEqual(_schema.joint_names[_schema.ends2[0]], 'RightElbow')
+        self.assertFalse(_schema.pos_angles[-1])
+        self.assertIs(compile_angle_schema(_schema), _schema)
+
+        self.assertRaises(TypeError, compile_angle_schema, None)
+        self.assertRaises(TypeError, compile_angle_schema, {'bad_theta': ("Neck", "", "Head", 1, True)})
+
+    def test_calculate_articulated_figure_angles(self):
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_1, _dim_names)]
+        _test_data   = pd.DataFrame(np.random.RandomState(0).normal(size=(50, len(_columns))), columns=_columns)
+
+        _angles_2d   = calculate_2d_articulated_figure_angles(_test_data, psc._ARTICULATED_FIGURE_ANGLES_1, face=-1)
+        _angles_3d   = calculate_3d_articulated_figure_angles(_test_data, psc._ARTICULATED_FIGURE_ANGLES_1)
+
+        self.assertEqual(list(_angles_2d.columns), list(psc._ARTICULATED_FIGURE_ANGLES_1))
+        self.assertEqual(list(_angles_3d.columns), list(psc._ARTICULATED_FIGURE_ANGLES_1))
+
+        for angle_name, (o_dim, e1_dim, e2_dim, z_dir, pos_angles) in psc._ARTICULATED_FIGURE_ANGLES_1.items():
+            np.testing.assert_allclose(_angles_2d[angle_name], 
+                calculate_2d_articulated_figure_angle(_test_data, o_dim, e1_dim, e2_dim, -z_dir, pos_angles))
+            np.testing.assert_allclose(_angles_3d[angle_name], 
+                calculate_3d_articulated_figure_angle(_test_data, o_dim, e1_dim, e2_dim, pos_angles))
+
+    def test_calculate_articulated_figure_angles_float32(self):
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, _dim_names)]
+        _test_data   = pd.DataFrame(1. + 0.3*np.random.RandomState(0).normal(size=(200, len(_columns))), columns=_columns)
+
+        _extended    = extend_3d_articulated_figure(_test_data, psc._EXTENDED_JOINT_NAMES_3, dtype=np.float32)
+        _angles_3d   = calculate_3d_articulated_figure_angles(_extended, psc._ARTICULATED_FIGURE_ANGLES_3, dtype=np.float32)
+        _angles_2d   = calculate_2d_articulated_figure_angles(_extended, psc._ARTICULATED_FIGURE_ANGLES_3, dtype=np.float32)
+        _extended    = extend_3d_articulated_figure(_test_data, psc._EXTENDED_JOINT_NAMES_3)
+
+        self.assertEqual(_angles_3d.dtypes.unique().tolist(), [np.float32])
+        self.assertEqual(_angles_2d.dtypes.unique().tolist(), [np.float32])
+        np.testing.assert_allclose(_angles_3d, calculate_3d_articulated_figure_angles(_extended, psc._ARTICULATED_FIGURE_ANGLES_3), atol=1e-3)
+        np.testing.assert_allclose(_angles_2d, calculate_2d_articulated_figure_angles(_extended, psc._ARTICULATED_FIGURE_ANGLES_3), atol=1e-3)
+        self.assertEqual(calculate_2d_articulated_figure_angle(_extended, 'Neck', 'Head', 'SpineSh', dtype=np.float32).dtype, np.float32)
+        self.assertEqual(calculate_3d_articulated_figure_angle(_extended, 'Neck', 'Head', 'SpineSh', dtype=np.float32).dtype, np.float32)
+        self.assertRaises(TypeError, calculate_3d_articulated_figure_angles, _extended, psc._ARTICULATED_FIGURE_ANGLES_3, dtype=np.int32)
+
+    def test_calculate_articulated_figure_angles_masked(self):
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_1, _dim_names)]
+        _test_data   = pd.DataFrame(np.random.RandomState(0).normal(size=(50, len(_columns))), columns=_columns)
+        _angles      = calculate_3d_articulated_figure_angles(_test_data, psc._ARTICULATED_FIGURE_ANGLES_1)
+        _joint_name  = psc._ARTICULATED_FIGURE_ANGLES_1[_angles.columns[0]][0]
+        _test_data.loc[10:14, _joint_name + '_Y'] = np.nan
+
+        self.assertRaises(ValueError, calculate_3d_articulated_figure_angles, _test_data, psc._ARTICULATED_FIGURE_ANGLES_1)
+
+        _masked, _coverage = calculate_3d_articulated_figure_angles(_test_data, psc._ARTICULATED_FIGURE_ANGLES_1, masked=True)
+
+        self.assertEqual(list(_coverage.index), list(_angles.columns))
+        for angle_name, (o_dim, e1_dim, e2_dim, z_dir, pos_angles) in psc._ARTICULATED_FIGURE_ANGLES_1.items():
+            _missing = _joint_name in (o_dim, e1_dim, e2_dim)
+            self.assertEqual(_coverage[angle_name], 0.9 if _missing else 1.)
+            self.assertEqual(bool(np.all(np.isnan(_masked[angle_name][10:15]))), _missing)
+            np.testing.assert_allclose(_masked[angle_name].drop(index=range(10, 15)), _angles[angle_name].drop(index=range(10, 15)))
+
+        _thetas, _coverage = calculate_3d_articulated_figure_angle(_test_data, _joint_name, *psc._ARTICULATED_FIGURE_ANGLES_1[_angles.columns[0]][1:3], masked=True)
+
+        self.assertEqual(_coverage, 0.9)
+        np.testing.assert_allclose(_thetas, _masked[_angles.columns[0]])
+
+    def test_calculate_cohort_articulated_figure_angles(self):
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, _dim_names)]
+        _rs          = np.random.RandomState(0)
+        _sessions    = [Session('s%d'%sidx, extend_3d_articulated_figure(pd.DataFrame(_rs.normal(size=(n_frames, len(_columns))), columns=_columns), 
+                                                                        psc._EXTENDED_JOINT_NAMES_3))
+                        for sidx, n_frames in enumerate([30, 7, 0, 52])]
+        _sessions[1]._data = JointTensor.from_dataframe(_sessions[1]._data)
+
+        _angles      = calculate_cohort_articulated_figure_angles(_sessions, psc._ARTICULATED_FIGURE_ANGLES_3)
+
+        self.assertEqual([len(angles) for angles in _angles], [30, 7, 0, 52])
+        for session, angles in zip(_sessions, _angles):
+            self.assertEqual(list(angles.columns), list(psc._ARTICULATED_FIGURE_ANGLES_3))
+            if len(session._data) > 0:
+                np.testing.assert_allclose(angles, calculate_3d_articulated_figure_angles(session._data, psc._ARTICULATED_FIGURE_ANGLES_3))
+
+        _angles_2d   = calculate_cohort_articulated_figure_angles([session._data for session in _sessions], psc._ARTICULATED_FIGURE_ANGLES_3, n_dims=2)
+        np.testing.assert_allclose(_angles_2d[3], calculate_2d_articulated_figure_angles(_sessions[3]._data, psc._ARTICULATED_FIGURE_ANGLES_3))
+
+        _sessions[0]._data.loc[3:5, 'Head_X'] = np.nan
+        self.assertRaises(ValueError, calculate_cohort_articulated_figure_angles, _sessions, psc._ARTICULATED_FIGURE_ANGLES_3)
+
+        _angles, _coverage = calculate_cohort_articulated_figure_angles(_sessions, psc._ARTICULATED_FIGURE_ANGLES_3, masked=True)
+
+        self.assertEqual(list(_coverage.index), ['s0', 's1', 's2', 's3'])
+        self.assertEqual(_coverage.loc['s0', 'rnck_theta'], 0.9)
+        self.assertEqual(_coverage.loc['s1', 'rnck_theta'], 1.)
+        self.assertEqual(_coverage.loc['s2', 'rnck_theta'], 0.)
+        self.assertTrue(np.all(np.isnan(_angles[0]['rnck_theta'][3:6])))
+        self.assertEqual(calculate_cohort_articulated_figure_angles([], psc._ARTICULATED_FIGURE_ANGLES_3), [])
+
+    def test_extend_articulated_figure(self):
+        _dim_names   = ['_X', '_Y']
+        _columns     = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_2, _dim_names)]
+        _test_data   = pd.DataFrame(np.random.RandomState(0).normal(size=(20, len(_columns))), columns=_columns)
+
+        _extended    = extend_2d_articulated_figure(_test_data, psc._EXTENDED_JOINT_NAMES_2)
+
+        self.assertEqual(_test_data.shape[1], len(_columns))
+        self.assertEqual(_extended.shape[1], len(_columns) + 2*len(psc._EXTENDED_JOINT_NAMES_2))
+        np.testing.assert_allclose(_extended['vaxis_X'], (_test_data['lhip_X'] + _test_data['rhip_X']) / 2.)
+        np.testing.assert_allclose(_extended['vaxis_Y'], (_test_data['lshldr_Y'] + _test_data['rshldr_Y']) / 2.)
+
+        _extended    = extend_2d_articulated_figure(_test_data, psc._EXTENDED_JOINT_NAMES_2, copy=False)
+
+        self.assertIs(_extended, _test_data)
+        self.assertIn('torso_Y', _test_data.columns)
+
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, _dim_names)]
+        _test_data   = pd.DataFrame(np.random.RandomState(0).normal(size=(20, len(_columns))), columns=_columns)
+
+        _extended    = extend_3d_articulated_figure(_test_data, psc._EXTENDED_JOINT_NAMES_3)
+
+        np.testing.assert_allclose(_extended['spinem_at_neck_Y'], _test_data['Neck_Y'])
+        np.testing.assert_allclose(_extended['spinem_at_neck_Z'], _test_data['SpineM_Z'])
+        self.assertEqual(calculate_3d_articulated_figure_angles(_extended, psc._ARTICULATED_FIGURE_ANGLES_3).shape, (20, 18))
+
+        self.assertRaises(TypeError, extend_3d_articulated_figure, _test_data, None)
+
+    def test_streaming_angle_calculator(self):
+        _dim_names   = ['_X', '_Y', '_Z']
+        _columns     = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_1, _dim_names)]
+        _test_data   = pd.DataFrame(np.random.RandomState(0).normal(size=(100, len(_columns))), columns=_columns)
+
+        _calculator  = StreamingAngleCalculator(psc._ARTICULATED_FIGURE_ANGLES_1)
+        _chunks      = [_test_data.iloc[start:start + 30] for start in range(0, 100, 30)]
+        _angles      = pd.concat(list(_calculator.process(_chunks)))
+
+        self.assertEqual(_calculator.n_frames, 100)
+        pd.testing.assert_frame_equal(_angles, calculate_3d_articulated_figure_angles(_test_data, psc._ARTICULATED_FIGURE_ANGLES_1))
+
+        _calculator  = StreamingAngleCalculator(psc._ARTICULATED_FIGURE_ANGLES_1, n_dims=2, face=-1)
+        _schema      = compile_angle_schema(psc._ARTICULATED_FIGURE_ANGLES_1)
+        _coords      = _test_data.loc[:, [jn + dn for jn in _schema.joint_names for dn in _dim_names[:2]]].to_numpy()
+        _angles      = _calculator.push(_coords.reshape(100, len(_schema.joint_names), 2))
+
+        pd.testing.assert_frame_equal(_angles, calculate_2d_articulated_figure_angles(_test_data, psc._ARTICULATED_FIGURE_ANGLES_1, face=-1))
+        self.assertRaises(ValueError, _calculator.push, _coords)
+
+    def test_calculate_windowed_phase_locking_value(self):
+        _ts          = np.arange(1000)
+        _test_data   = pd.DataFrame({'lkn_theta': 120. + 10.*np.sin(_ts / 10.) + np.random.RandomState(0).normal(size=1000), 
+                                     'rkn_theta': 120. + 10.*np.sin(_ts / 10. + .5)})
+
+        _starts, _plvs = calculate_windowed_phase_locking_value(_test_data, ('lkn_theta', 'rkn_theta'), 200, hop=150, block_size=2)
+
+        np.testing.assert_array_equal(_starts, [0, 150, 300, 450, 600, 750])
+        for start, plv in zip(_starts, _plvs):
+            self.assertAlmostEqual(plv, calculate_phase_locking_value(_test_data.iloc[start:start + 200], ('lkn_theta', 'rkn_theta'))[1])
+
+        _windows     = list(iter_windowed_phase_locking_values(_test_data, ('lkn_theta', 'rkn_theta'), 200, hop=150))
+
+        self.assertEqual([start for start, _ in _windows], list(_starts))
+        np.testing.assert_allclose([plv for _, plv in _windows], _plvs)
+
+        _starts, _plvs = calculate_windowed_phase_locking_value(_test_data, ('lkn_theta', 'rkn_theta'), 2000)
+
+        self.assertEqual(len(_starts), 0)
+        self.assertRaises(ValueError, calculate_windowed_phase_locking_value, _test_data, ('lkn_theta',), 200)
+
+    def test_calculate_synchrony_matrices(self):
+        _ts          = np.arange(1000)
+        _rs          = np.random.RandomState(0)
+        _test_data   = pd.DataFrame({angle_name: 120. + (10. + aidx)*np.sin(_ts / (10. + aidx) + aidx) + _rs.normal(size=1000)
+                                     for aidx, angle_name in enumerate(['lkn_theta', 'rkn_theta', 'lhip_theta', 'rhip_theta'])})
+
+        _plv, _marp, _mrp, _crpsd, _freqs_var = calculate_synchrony_matrices(_test_data, should_remove_outliers=True)
+
+        self.assertEqual(list(_plv.index), list(_test_data.columns))
+        self.assertEqual(list(_crpsd.columns), list(_test_data.columns))
+        for dim1, dim2 in itertools.product(_test_data.columns, repeat=2):
+            _, plv, _, _, _, _ = calculate_phase_locking_value(_test_data, (dim1, dim2), True)
+            _, marp, mrp, crpsd = calculate_phase_angle_measures(_test_data, (dim1, dim2), True)
+            freqs_var, _ = calculate_fft_based_synchrony_measures(_test_data, (dim1, dim2), True)
+            self.assertAlmostEqual(_plv.loc[dim1, dim2], plv)
+            self.assertAlmostEqual(_marp.loc[dim1, dim2], marp)
+            self.assertEqual(_mrp.loc[dim1, dim2], mrp)
+            self.assertAlmostEqual(_crpsd.loc[dim1, dim2], crpsd, places=6)
+            self.assertEqual(_freqs_var.loc[dim1, dim2], freqs_var)
+
+        self.assertRaises(ValueError, calculate_synchrony_matrices, _test_data, ['lkn_theta'])
+
+    def test_synchrony_measures_masked(self):
+        _ts          = np.arange(1000)
+        _rs          = np.random.RandomState(0)
+        _test_data   = pd.DataFrame({angle_name: 120. + (10. + aidx)*np.sin(_ts / (10. + aidx) + aidx) + _rs.normal(size=1000)
+                                     for aidx, angle_name in enumerate(['lkn_theta', 'rkn_theta', 'lhip_theta'])})
+        _missing     = _test_data.copy()
+        _missing.loc[100:149, 'lkn_theta'] = np.nan
+        _missing.loc[500:549, 'rkn_theta'] = np.nan
+        _valid       = _missing.notna().all(axis=1).to_numpy()
+        _dims        = ('lkn_theta', 'rkn_theta')
+
+        (_ipd, _plv, _, _, _, _), _coverage = calculate_phase_locking_value(_missing, _dims, masked=True)
+
+        self.assertEqual(_coverage, 0.9)
+        self.assertEqual(_ipd.shape, (1000,))
+        self.assertTrue(np.all(np.isnan(_ipd[~_valid])))
+        self.assertAlmostEqual(_plv, calculate_phase_locking_value(_test_data[_valid], _dims)[1])
+
+        (_crp, _marp, _mrp, _crpsd), _coverage = calculate_phase_angle_measures(_missing, _dims, masked=True)
+        _, marp, mrp, crpsd = calculate_phase_angle_measures(_test_data[_valid], _dims)
+
+        self.assertEqual(_coverage, 0.9)
+        self.assertTrue(np.all(np.isnan(_crp[~_valid])))
+        self.assertAlmostEqual(_marp, marp)
+        self.assertEqual(_mrp, mrp)
+        self.assertAlmostEqual(_crpsd, crpsd)
+
+        (_freqs_var, _), _coverage = calculate_fft_based_synchrony_measures(_missing, _dims, masked=True)
+
+        self.assertEqual(_freqs_var, calculate_fft_based_synchrony_measures(_test_data[_valid], _dims)[0])
+
+        _matrices, _coverage = calculate_synchrony_matrices(_missing, masked=True)
+
+        self.assertEqual(_coverage, 0.9)
+        for _matrix, _expected in zip(_matrices, calculate_synchrony_matrices(_test_data[_valid])):
+            np.testing.assert_allclose(_matrix, _expected)
+
+        _, _coverage = calculate_phase_locking_value(pd.DataFrame({'lkn_theta': [np.nan]*4, 'rkn_theta': [1., 2., 3., 4.]}), _dims, masked=True)
+
+        self.assertEqual(_coverage, 0.)
+
+    def test_calculate_phase_angles(self):
+        _ts          = np.arange(0, 400) / 20.
+        _test_data   = pd.DataFrame({'lkn_theta': 120. + 10.*np.sin(_ts), 'rkn_theta': 120. + 10.*np.cos(_ts)})
+
+        _yy          = _test_data['lkn_theta'] - np.mean(_test_data['lkn_theta'])
+        _expected    = np.arctan(np.gradient(_yy) / _yy)*180/np.pi
+        _pa_ts       = calculate_phase_angles(_test_data, 'lkn_theta')
+
+        self.assertEqual(_pa_ts.shape, (400,))
+        np.testing.assert_allclose(_pa_ts, _expected)
+
+        _pa_ts       = calculate_phase_angles(pd.DataFrame({'lkn_theta': [2., 0., -2., 0., 0.]}), 'lkn_theta')
+
+        np.testing.assert_allclose(_pa_ts, [-45., -90., 0., 90., 0.])
+
+        _pa_ts       = calculate_phase_angles(_test_data, ['lkn_theta', 'rkn_theta'], method='arctan2', normalize=True)
+
+        self.assertEqual(_pa_ts.shape, (400, 2))
+        self.assertFalse(np.any(np.isnan(_pa_ts)))
+        self.assertTrue(np.all(np.abs(_pa_ts) <= 180.))
+        self.assertGreater(np.max(np.abs(_pa_ts)), 90.)
+
+        self.assertRaises(ValueError, calculate_phase_angles, _test_data, 'lkn_theta', method='arcsin')
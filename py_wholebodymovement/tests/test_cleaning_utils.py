@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+
+import numpy as np
+import pandas as pd
+import scipy.interpolate
+import pywt
+
+from py_wholebodymovement.utils.cleaning_utils import clean_gaussian_outliers
+from py_wholebodymovement.utils.cleaning_utils import clean_dimensions_gaussian_outliers
+from py_wholebodymovement.utils.cleaning_utils import denoise_data
+from py_wholebodymovement.utils.cleaning_utils import resample_data
+from py_wholebodymovement.utils.cleaning_utils import iter_resampled_data
+from py_wholebodymovement.utils.cleaning_utils import _bspline_design_matrix
+from py_wholebodymovement.joint_tensor import JointTensor
+
+class CleaningUtilsTestCases(unittest.TestCase):
+    def setUp(self):
+        self._test_sig = np.random.RandomState(0).normal(size=500)
+        self._test_sig[[0, 1, 100, 101, 300]] = [10., -12., 9., 11., -15.]
+
+    def test_clean_gaussian_outliers(self):
+        _sig         = self._test_sig.copy()
+        _cleaned     = clean_gaussian_outliers(_sig)
+
+        np.testing.assert_array_equal(_sig, self._test_sig)
+        self.assertEqual(_cleaned[0], np.mean(self._test_sig))
+        self.assertEqual(_cleaned[1], np.mean(self._test_sig))
+        self.assertEqual(_cleaned[100], self._test_sig[99])
+        self.assertEqual(_cleaned[101], self._test_sig[99])
+        self.assertEqual(_cleaned[300], self._test_sig[299])
+        self.assertTrue(np.all(np.abs(_cleaned) < 5.))
+
+        _res         = clean_gaussian_outliers(_sig, inplace=True)
+
+        self.assertIs(_res, _sig)
+        np.testing.assert_array_equal(_sig, _cleaned)
+
+        _series      = pd.Series(self._test_sig)
+        np.testing.assert_array_equal(clean_gaussian_outliers(_series), _cleaned)
+        np.testing.assert_array_equal(_series, self._test_sig)
+
+    def test_clean_gaussian_outliers_missing_values(self):
+        _sig         = self._test_sig.copy()
+        _sig[[2, 99, 102]] = np.nan
+        _cleaned     = clean_gaussian_outliers(_sig)
+
+        self.assertTrue(np.all(np.isnan(_cleaned[[2, 99, 102]])))
+        self.assertEqual(_cleaned[0], np.nanmean(_sig))
+        self.assertEqual(_cleaned[100], self._test_sig[98])
+        self.assertEqual(_cleaned[101], self._test_sig[98])
+        self.assertEqual(_cleaned[300], self._test_sig[299])
+        self.assertTrue(np.all(np.abs(_cleaned[~np.isnan(_cleaned)]) < 5.))
+        np.testing.assert_array_equal(clean_gaussian_outliers(_sig, window=51)[[2, 99, 102]], np.nan)
+
+    def test_clean_gaussian_outliers_rolling_window(self):
+        _sig         = np.concatenate([np.zeros(200), 100. + np.zeros(200)]) + np.random.RandomState(0).normal(size=400)
+        _sig[50]     = 8.
+        _sig[250]    = 92.
+
+        _cleaned     = clean_gaussian_outliers(_sig, window=51)
+
+        self.assertEqual(_cleaned[50], _sig[49])
+        self.assertEqual(_cleaned[250], _sig[249])
+        np.testing.assert_array_equal(clean_gaussian_outliers(_sig), _sig)
+
+    def test_clean_dimensions_gaussian_outliers(self):
+        _rs          = np.random.RandomState(1)
+        _test_data   = pd.DataFrame({'Head_X': self._test_sig, 
+                                     'Head_Y': _rs.normal(size=500).astype(np.float32), 
+                                     'Head_Z': _rs.normal(size=500),
+                                     'Label': 500*['walk']}, index=np.arange(1000, 1500))
+        _test_data.loc[1200, 'Head_Z'] = 50.
+
+        _cleaned     = clean_dimensions_gaussian_outliers(_test_data)
+
+        self.assertEqual(list(_cleaned.columns), list(_test_data.columns))
+        pd.testing.assert_index_equal(_cleaned.index, _test_data.index)
+        pd.testing.assert_series_equal(_cleaned.dtypes, _test_data.dtypes)
+        pd.testing.assert_series_equal(_cleaned['Label'], _test_data['Label'])
+        self.assertEqual(_test_data.loc[1200, 'Head_Z'], 50.)
+        for col in ['Head_X', 'Head_Y', 'Head_Z']:
+            np.testing.assert_allclose(_cleaned[col], clean_gaussian_outliers(_test_data[col]))
+
+        pd.testing.assert_frame_equal(clean_dimensions_gaussian_outliers(_test_data, n_jobs=2), _cleaned)
+
+    def test_denoise_data(self):
+        _sig         = 100. + 30.*np.sin(np.linspace(0, 20, 1001)) + np.random.RandomState(0).normal(size=1001)
+
+        _denoised    = denoise_data(_sig, haarlevel=3, shrinking_factor=2)
+
+        _sig_dn      = pywt.wavedec(_sig, "haar", level=3, mode="periodization")[0]
+        _tck         = scipy.interpolate.splrep(np.linspace(1, 1001, len(_sig_dn)), _sig_dn, s=0)
+        _expected    = scipy.interpolate.splev(np.linspace(1, 1001, 500), _tck)
+        _expected   /= np.mean(scipy.interpolate.splev(np.linspace(1, 1001, 1001), _tck) / _sig)
+
+        self.assertEqual(_denoised.shape, (500,))
+        np.testing.assert_allclose(_denoised, _expected)
+
+        _sigs        = np.stack([_sig, 2.*_sig + 5., _sig[::-1]], axis=1)
+        _denoised    = denoise_data(_sigs, haarlevel=3, shrinking_factor=2)
+
+        self.assertEqual(_denoised.shape, (500, 3))
+        for cidx in range(3):
+            np.testing.assert_allclose(_denoised[:, cidx], denoise_data(_sigs[:, cidx], haarlevel=3, shrinking_factor=2))
+        np.testing.assert_allclose(denoise_data(_sigs.T, axis=1, haarlevel=3, shrinking_factor=2), _denoised.T)
+
+    def test_bspline_design_matrix_fallback(self):
+        _x           = np.linspace(1, 1001, 126)
+        _knots       = np.concatenate([np.repeat(_x[0], 4), _x[2:-2], np.repeat(_x[-1], 4)])
+        _xnew        = np.linspace(1, 1001, 500)
+        _expected    = _bspline_design_matrix(_xnew, _knots, 3).toarray()
+
+        # scipy < 1.8 has no BSpline.design_matrix
+        _design      = scipy.interpolate.BSpline.__dict__.get('design_matrix')
+        if _design is not None:
+            delattr(scipy.interpolate.BSpline, 'design_matrix')
+        try:
+            np.testing.assert_allclose(_bspline_design_matrix(_xnew, _knots, 3).toarray(), _expected, atol=1e-12)
+        finally:
+            if _design is not None:
+                setattr(scipy.interpolate.BSpline, 'design_matrix', _design)
+
+    def test_float32(self):
+        _cleaned     = clean_gaussian_outliers(self._test_sig, dtype=np.float32)
+
+        self.assertEqual(_cleaned.dtype, np.float32)
+        np.testing.assert_allclose(_cleaned, clean_gaussian_outliers(self._test_sig), atol=1e-6)
+
+        _test_data   = pd.DataFrame({'Head_X': self._test_sig, 'Head_Y': self._test_sig[::-1]})
+        _cleaned     = clean_dimensions_gaussian_outliers(_test_data, dtype=np.float32)
+
+        self.assertEqual(_cleaned.dtypes.unique().tolist(), [np.float32])
+        np.testing.assert_allclose(_cleaned, clean_dimensions_gaussian_outliers(_test_data), atol=1e-6)
+
+        _sig         = 100. + 30.*np.sin(np.linspace(0, 20, 1001)) + np.random.RandomState(0).normal(size=1001)
+        _denoised    = denoise_data(_sig, haarlevel=3, shrinking_factor=2, dtype=np.float32)
+
+        self.assertEqual(_denoised.dtype, np.float32)
+        np.testing.assert_allclose(_denoised, denoise_data(_sig, haarlevel=3, shrinking_factor=2), rtol=1e-5)
+
+    def test_resample_data(self):
+        _rs          = np.random.RandomState(0)
+        _ts          = np.arange(600) / 30. + _rs.uniform(-0.005, 0.005, size=600)
+        _keep        = np.ones(600, dtype=bool)
+        _keep[100:103] = False
+        _keep[300:330] = False
+        _test_data   = pd.DataFrame({'Timestamp': _ts[_keep], 
+                                     'Head_X': np.sin(_ts[_keep]), 
+                                     'Head_Y': np.cos(_ts[_keep]),
+                                     'Label': 'walk'})
+        _test_data.loc[50, 'Head_Y'] = np.nan
+
+        _resampled   = resample_data(_test_data, 60.)
+        _grid        = np.arange(np.ceil(_ts[0]*60), np.floor(_ts[-1]*60) + 1) / 60.
+
+        self.assertEqual(list(_resampled.columns), ['Timestamp', 'Head_X', 'Head_Y'])
+        np.testing.assert_allclose(_resampled['Timestamp'], _grid)
+        np.testing.assert_allclose(_resampled['Head_X'], np.interp(_grid, _test_data['Timestamp'], _test_data['Head_X']))
+        _valid       = _test_data['Head_Y'].notna()
+        np.testing.assert_allclose(_resampled['Head_Y'], np.interp(_grid, _test_data['Timestamp'][_valid], _test_data['Head_Y'][_valid]))
+
+        _resampled   = resample_data(_test_data, 60., method='cubic')
+        np.testing.assert_allclose(_resampled['Head_X'], np.sin(_grid), atol=5e-3)
+
+        _resampled   = resample_data(_test_data, 60., max_gap=0.2)
+        _gap         = np.logical_and(_grid > _ts[299], _grid < _ts[330])
+        self.assertTrue(_resampled['Head_X'][_gap].isna().all())
+        self.assertFalse(_resampled['Head_X'][~_gap].isna().any())
+
+        _chunks      = [_test_data.iloc[start:start + 70] for start in range(0, len(_test_data), 70)]
+        pd.testing.assert_frame_equal(pd.concat(list(iter_resampled_data(_chunks, 60., max_gap=0.2)), ignore_index=True), _resampled)
+        _streamed    = pd.concat(list(iter_resampled_data(_chunks, 60., method='cubic')), ignore_index=True)
+        np.testing.assert_allclose(_streamed['Head_X'], resample_data(_test_data, 60., method='cubic')['Head_X'], atol=1e-4)
+
+        _jt          = JointTensor(_test_data[['Head_X', 'Head_Y']].to_numpy().reshape(-1, 1, 2), ['Head'], ['_X', '_Y'], 
+                                   index=_test_data['Timestamp'])
+        _resampled   = resample_data(_jt, 60., max_gap=0.2)
+        np.testing.assert_allclose(_resampled.coordinate('Head_X'), resample_data(_test_data, 60., max_gap=0.2)['Head_X'])
+        self.assertRaises(ValueError, resample_data, _test_data, 60., method='quadratic')
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+import tempfile
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.session import Session
+
+from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+from py_wholebodymovement.articulated_figure import calculate_phase_angle_measures
+from py_wholebodymovement.gait import GaitCycleIndex
+from py_wholebodymovement.gait import detect_gait_cycles
+from py_wholebodymovement.gait import normalize_gait_cycles
+from py_wholebodymovement.gait import calculate_gait_cycle_synchrony_measures
+
+class GaitTestCases(unittest.TestCase):
+    def setUp(self):
+        _ts              = np.arange(1000)
+        _rs              = np.random.RandomState(0)
+        _dim_names       = ['_X', '_Y', '_Z']
+        _columns         = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, _dim_names)]
+        self._test_data  = pd.DataFrame(_rs.normal(scale=0.002, size=(1000, len(_columns))), columns=_columns)
+
+        # walking away from the device at 1 unit per 100 frames cycle, the right heel striking at frames 25, 125, ...
+        for jn in psc._JOINT_NAMES_3:
+            self._test_data[jn + '_Z'] += _ts / 100.
+        for side, phase in [('Right', 0.), ('Left', np.pi)]:
+            self._test_data[side + 'Ankle_Z'] += 0.4*np.sin(2*np.pi*_ts/100. + phase)
+            self._test_data[side + 'Foot_Z']  += 0.4*np.sin(2*np.pi*(_ts - 10)/100. + phase)
+
+        self._test_data['lkn_theta'] = 120. + 10.*np.sin(2*np.pi*_ts/100.) + _rs.normal(size=1000)
+        self._test_data['rkn_theta'] = 120. + 10.*np.sin(2*np.pi*_ts/100. + 1.) + _rs.normal(size=1000)
+
+    def test_detect_gait_cycles(self):
+        _dim_names   = ['_X', '_Y', '_Z']
+        _index       = detect_gait_cycles(self._test_data)
+
+        self.assertEqual(_index.sides, ['Right', 'Left'])
+        np.testing.assert_allclose(_index.heel_strikes('Right'), np.arange(25, 1000, 100), atol=3)
+        np.testing.assert_allclose(_index.heel_strikes('Left'), np.arange(75, 1000, 100), atol=3)
+        np.testing.assert_allclose(_index.toe_offs('Right'), np.arange(85, 900, 100), atol=3)
+        self.assertEqual(len(_index), 18)
+        self.assertEqual(_index.cycles('Right').shape, (9, 2))
+        np.testing.assert_array_equal(_index.cycles('Right')[:, 1], _index.heel_strikes('Right')[1:])
+        np.testing.assert_allclose(_index.stance_fractions('Right'), 0.6, atol=0.05)
+
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+        np.testing.assert_array_equal(detect_gait_cycles(_jt).heel_strikes('Left'), _index.heel_strikes('Left'))
+
+        _z_columns   = [jn + '_Z' for jn in psc._JOINT_NAMES_3]
+        _reversed    = detect_gait_cycles(self._test_data.assign(**{col: -self._test_data[col] for col in _z_columns}), face=-1)
+        np.testing.assert_array_equal(_reversed.heel_strikes('Right'), _index.heel_strikes('Right'))
+
+        _restored    = GaitCycleIndex.from_dict(_index.to_dict())
+        np.testing.assert_array_equal(_restored.toe_offs('Left'), _index.toe_offs('Left'))
+
+        self.assertRaises(ValueError, detect_gait_cycles, self._test_data.drop(columns=['SpineB_X', 'SpineB_Y', 'SpineB_Z']))
+
+        _renamed     = self._test_data.rename(columns=lambda col: col[:-2] + col[-2:].lower() if col[-2:] in _dim_names else col)
+        _custom      = detect_gait_cycles(_renamed, axis='_z', suffixes=('_x', '_y', '_z'))
+        np.testing.assert_array_equal(_custom.heel_strikes('Left'), _index.heel_strikes('Left'))
+        self.assertRaises(ValueError, detect_gait_cycles, _renamed, axis='_z')
+
+    def test_normalize_gait_cycles(self):
+        _cycles      = np.array([[0, 100], [100, 125]])
+        _normalized  = normalize_gait_cycles(self._test_data, ['lkn_theta', 'rkn_theta'], _cycles, n_points=51)
+
+        self.assertEqual(_normalized.shape, (2, 51, 2))
+        np.testing.assert_allclose(_normalized[0, :, 0], self._test_data['lkn_theta'][0:101:2])
+        np.testing.assert_allclose(_normalized[1, ::2, 1], self._test_data['rkn_theta'][100:126])
+        np.testing.assert_allclose(_normalized[1, 1, 1], self._test_data['rkn_theta'][100:102].mean())
+
+        self.assertRaises(ValueError, normalize_gait_cycles, self._test_data, ['lkn_theta'], [[10, 5]])
+        self.assertRaises(ValueError, normalize_gait_cycles, self._test_data, ['lkn_theta'], [[0, 1000]])
+        self.assertRaises(TypeError, normalize_gait_cycles, self._test_data, ['lkn_theta'], [0, 100])
+
+    def test_calculate_gait_cycle_synchrony_measures(self):
+        _cycles      = detect_gait_cycles(self._test_data).cycles('Right')
+        _dims        = ('lkn_theta', 'rkn_theta')
+        _measures    = calculate_gait_cycle_synchrony_measures(self._test_data, _dims, _cycles)
+
+        self.assertEqual(list(_measures.columns), ['start', 'stop', 'plv', 'marp', 'mrp', 'crpsd'])
+        self.assertEqual(len(_measures), len(_cycles))
+
+        for (start, stop), (_, row) in zip(_cycles, _measures.iterrows()):
+            _cycle   = pd.DataFrame(normalize_gait_cycles(self._test_data, list(_dims), [[start, stop]])[0], columns=list(_dims))
+            _, plv, _, _, _, _ = calculate_phase_locking_value(_cycle, _dims)
+            _, marp, mrp, crpsd = calculate_phase_angle_measures(_cycle, _dims)
+            self.assertAlmostEqual(row['plv'], plv)
+            self.assertAlmostEqual(row['marp'], marp)
+            self.assertEqual(row['mrp'], mrp)
+            self.assertAlmostEqual(row['crpsd'], crpsd)
+
+        self.assertRaises(ValueError, calculate_gait_cycle_synchrony_measures, self._test_data, ['lkn_theta'], _cycles)
+
+    def test_session_gait_cycles(self):
+        _session     = Session('walk', self._test_data)
+        _index       = _session.detect_gait_cycles(distance=50)
+
+        self.assertIs(_session._gait_cycles, _index)
+        self.assertEqual(len(_index), 18)
+
+        with tempfile.TemporaryDirectory() as path:
+            _session.save(path)
+            _loaded  = Session.load(path)
+
+            np.testing.assert_array_equal(_loaded._gait_cycles.cycles('Left'), _index.cycles('Left'))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.joint_tensor import JointTensor
+
+from py_wholebodymovement.articulated_figure import calculate_2d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angle
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+
+class JointTensorTestCases(unittest.TestCase):
+    def setUp(self):
+        _dim_names       = ['_X', '_Y', '_Z']
+        _columns         = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, _dim_names)]
+        self._test_data  = pd.DataFrame(np.random.RandomState(0).normal(size=(40, len(_columns))), columns=_columns)
+        self._test_data.insert(0, 'Timestamp', np.arange(40))
+
+    def test_dataframe_round_trip(self):
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+
+        self.assertEqual(_jt.shape, (40, len(psc._JOINT_NAMES_3), 3))
+        self.assertTrue(_jt.data.flags['C_CONTIGUOUS'])
+        self.assertEqual(_jt.joint_names, psc._JOINT_NAMES_3)
+
+        _df          = _jt.to_dataframe()
+
+        pd.testing.assert_frame_equal(_df, self._test_data.drop(columns='Timestamp'))
+        self.assertTrue(np.shares_memory(_df.to_numpy(), _jt.data))
+
+        self.assertEqual(JointTensor.from_dataframe(self._test_data).joint_names, psc._JOINT_NAMES_3)
+        self.assertEqual(JointTensor.from_dataframe(self._test_data, dtype=np.float32).data.dtype, np.float32)
+
+    def test_views(self):
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+
+        self.assertTrue(np.shares_memory(_jt.joint('Head'), _jt.data))
+        self.assertTrue(np.shares_memory(_jt.coordinate('Neck_Y'), _jt.data))
+        np.testing.assert_array_equal(_jt.coordinate('Neck_Y'), self._test_data['Neck_Y'])
+        self.assertTrue(np.shares_memory(_jt[10:20].data, _jt.data))
+        self.assertEqual(len(_jt[10:20]), 10)
+
+        self.assertRaises(KeyError, _jt.joint, 'Tail')
+        self.assertRaises(ValueError, JointTensor, np.zeros((3, 2)), ['Head'])
+
+    def test_valid_mask(self):
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+        _jt.data[5, _jt.joint_index('Head'), 1] = np.nan
+
+        _mask        = _jt.valid_mask()
+
+        self.assertEqual(_mask.shape, (40, len(psc._JOINT_NAMES_3)))
+        self.assertEqual(np.count_nonzero(~_mask), 1)
+        self.assertFalse(_mask[5, _jt.joint_index('Head')])
+        np.testing.assert_array_equal(_jt.valid_mask(['Head', 'Neck']), _mask[:, [_jt.joint_index('Head'), _jt.joint_index('Neck')]])
+
+    def test_articulated_figure_functions(self):
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+        _extended_jt = extend_3d_articulated_figure(_jt, psc._EXTENDED_JOINT_NAMES_3)
+        _extended_df = extend_3d_articulated_figure(self._test_data, psc._EXTENDED_JOINT_NAMES_3)
+
+        self.assertIn('spinem_at_neck', _extended_jt)
+        np.testing.assert_allclose(_extended_jt.coordinate('spinem_at_neck_Y'), _extended_df['spinem_at_neck_Y'])
+
+        pd.testing.assert_frame_equal(calculate_3d_articulated_figure_angles(_extended_jt, psc._ARTICULATED_FIGURE_ANGLES_3),
+                                      calculate_3d_articulated_figure_angles(_extended_df, psc._ARTICULATED_FIGURE_ANGLES_3))
+        pd.testing.assert_frame_equal(calculate_2d_articulated_figure_angles(_extended_jt, psc._ARTICULATED_FIGURE_ANGLES_3),
+                                      calculate_2d_articulated_figure_angles(_extended_df, psc._ARTICULATED_FIGURE_ANGLES_3))
+        np.testing.assert_allclose(calculate_3d_articulated_figure_angle(_jt, 'Neck', 'Head', 'SpineSh'),
+                                   calculate_3d_articulated_figure_angle(self._test_data, 'Neck', 'Head', 'SpineSh'))
+
+        _plv_jt      = calculate_phase_locking_value(_jt, ('LeftKnee_Y', 'RightKnee_Y'))
+        _plv_df      = calculate_phase_locking_value(self._test_data, ('LeftKnee_Y', 'RightKnee_Y'))
+
+        self.assertAlmostEqual(_plv_jt[1], _plv_df[1])
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.kinematics import calculate_joint_kinematics
+from py_wholebodymovement.kinematics import calculate_angle_kinematics
+from py_wholebodymovement.streaming import StreamingKinematicsCalculator
+
+class KinematicsTestCases(unittest.TestCase):
+    def setUp(self):
+        _ts              = np.arange(300) / 30.
+        _rs              = np.random.RandomState(0)
+        _dim_names       = ['_X', '_Y', '_Z']
+        _columns         = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, _dim_names)]
+        _phases          = _rs.uniform(0., 2*np.pi, size=len(_columns))
+        self._ts         = _ts
+        self._test_data  = pd.DataFrame(np.sin(2.*_ts[:, None] + _phases) + _rs.normal(scale=1e-3, size=(300, len(_columns))),
+                                        columns=_columns)
+
+    def test_calculate_joint_kinematics(self):
+        _velocity, _acceleration, _jerk = calculate_joint_kinematics(self._test_data, sampling_rate=30.)
+
+        self.assertEqual(_velocity.joint_names, psc._JOINT_NAMES_3)
+        self.assertEqual(_jerk.shape, (300, len(psc._JOINT_NAMES_3), 3))
+        np.testing.assert_allclose(_velocity.coordinate('Head_Y'), np.gradient(self._test_data['Head_Y'], 1/30.))
+        np.testing.assert_allclose(_acceleration.coordinate('Head_Y'), np.gradient(np.gradient(self._test_data['Head_Y'], 1/30.), 1/30.))
+
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+        _velocity, _acceleration, _jerk = calculate_joint_kinematics(_jt, ['Neck', 'Head'], 30., method='savgol', window_length=15)
+
+        self.assertEqual(_velocity.joint_names, ['Neck', 'Head'])
+        np.testing.assert_allclose(_jerk.joint('Head'), calculate_joint_kinematics(self._test_data, None, 30., 'savgol', 15)[2].joint('Head'))
+
+        # the Savitzky-Golay derivatives of a cubic are exact, including at the ends
+        _cubic       = JointTensor(np.stack([self._ts**3, self._ts**2, self._ts], axis=1)[:, None, :], ['Head'])
+        _velocity, _acceleration, _jerk = calculate_joint_kinematics(_cubic, sampling_rate=30., method='savgol', window_length=7)
+
+        np.testing.assert_allclose(_velocity.joint('Head'), np.stack([3*self._ts**2, 2*self._ts, np.ones(300)], axis=1), atol=1e-9)
+        np.testing.assert_allclose(_acceleration.coordinate('Head_X'), 6*self._ts, atol=1e-9)
+        np.testing.assert_allclose(_jerk.coordinate('Head_X'), 6., atol=1e-6)
+        np.testing.assert_allclose(_jerk.coordinate('Head_Y'), 0., atol=1e-6)
+
+        self.assertEqual(calculate_joint_kinematics(_jt, dtype=np.float32)[2].data.dtype, np.float32)
+        self.assertRaises(ValueError, calculate_joint_kinematics, _jt, method='savgol', window_length=14)
+        self.assertRaises(ValueError, calculate_joint_kinematics, _jt, method='savgol', window_length=15, polyorder=2)
+        self.assertRaises(ValueError, calculate_joint_kinematics, _jt, sampling_rate=0.)
+        self.assertRaises(ValueError, calculate_joint_kinematics, _jt, method='spline')
+
+    def test_calculate_angle_kinematics(self):
+        _extended    = extend_3d_articulated_figure(self._test_data, psc._EXTENDED_JOINT_NAMES_3)
+        _angles      = calculate_3d_articulated_figure_angles(_extended, psc._ARTICULATED_FIGURE_ANGLES_3)
+        _velocity, _acceleration, _jerk = calculate_angle_kinematics(_angles, sampling_rate=30.)
+
+        self.assertEqual(list(_jerk.columns), list(_angles.columns))
+        np.testing.assert_allclose(_velocity['lkn_theta'], np.gradient(_angles['lkn_theta'], 1/30.))
+
+        _velocity, _, _ = calculate_angle_kinematics(_angles, ['lkn_theta'], method='savgol', window_length=9)
+        self.assertEqual(list(_velocity.columns), ['lkn_theta'])
+
+    def test_streaming_kinematics_calculator(self):
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+        for kwargs in [{}, {'method': 'savgol', 'window_length': 11}]:
+            _expected    = calculate_joint_kinematics(_jt, sampling_rate=30., **kwargs)
+            _calculator  = StreamingKinematicsCalculator(psc._JOINT_NAMES_3, 30., **kwargs)
+            _chunks      = [_jt.data[start:stop] for start, stop in [(0, 3), (3, 4), (4, 50), (50, 57), (57, 300)]]
+            _outputs     = list(_calculator.process(_chunks))
+
+            self.assertEqual(_calculator.n_frames, 300)
+            for oidx, expected in enumerate(_expected):
+                _streamed = np.concatenate([output[oidx].data for output in _outputs])
+                np.testing.assert_allclose(_streamed, expected.data, atol=1e-9)
+            np.testing.assert_array_equal(np.concatenate([output[0].index for output in _outputs]), np.arange(300))
+
+        _calculator  = StreamingKinematicsCalculator(psc._JOINT_NAMES_3)
+        _velocity, _, _ = _calculator.push(self._test_data.iloc[:20])
+        self.assertEqual(len(_velocity), 17)
+        self.assertRaises(ValueError, _calculator.push, np.zeros((5, 2, 3)))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.session import Session
+from py_wholebodymovement.pipeline import run_pipeline
+from py_wholebodymovement.pipeline import _get_session_array
+from py_wholebodymovement.pipeline import _make_session_data
+
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+from py_wholebodymovement.articulated_figure import calculate_phase_angle_measures
+from py_wholebodymovement.utils.cleaning_utils import clean_dimensions_gaussian_outliers
+
+class PipelineTestCases(unittest.TestCase):
+    def setUp(self):
+        _columns         = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, ['_X', '_Y', '_Z'])]
+        _rs              = np.random.RandomState(0)
+        self._sessions   = []
+        for sidx in range(5):
+            _df          = pd.DataFrame(_rs.normal(size=(100 + 10*sidx, len(_columns))), columns=_columns)
+            _df.insert(0, 'MovementName', 'walk')
+            _data        = JointTensor.from_dataframe(_df, psc._JOINT_NAMES_3) if sidx % 2 else _df
+            self._sessions.append(Session('s%d'%sidx, _data, activity='walk', participant_id=sidx))
+        self._stages     = [('extend_3d', {'dims': psc._EXTENDED_JOINT_NAMES_3}),
+                            ('angles_3d', {'angles': psc._ARTICULATED_FIGURE_ANGLES_3}),
+                            'clean',
+                            ('phase_locking_value', {'dims': [('lkn_theta', 'rkn_theta')]}),
+                            ('phase_angle_measures', {'dims': [('lkn_theta', 'rkn_theta')]})]
+
+    def test_run_pipeline(self):
+        _features    = run_pipeline(self._sessions, self._stages)
+
+        self.assertEqual(list(_features.index), ['s0', 's1', 's2', 's3', 's4'])
+        self.assertEqual(list(_features.columns), ['participant_id', 'session_number', 'activity', 'plv_lkn_theta_rkn_theta',
+                                                   'marp_lkn_theta_rkn_theta', 'mrp_lkn_theta_rkn_theta', 'crpsd_lkn_theta_rkn_theta'])
+
+        _angles      = calculate_3d_articulated_figure_angles(extend_3d_articulated_figure(self._sessions[2]._data, psc._EXTENDED_JOINT_NAMES_3),
+                                                              psc._ARTICULATED_FIGURE_ANGLES_3)
+        _angles      = clean_dimensions_gaussian_outliers(_angles)
+        self.assertAlmostEqual(_features.loc['s2', 'plv_lkn_theta_rkn_theta'], calculate_phase_locking_value(_angles, ('lkn_theta', 'rkn_theta'))[1])
+        self.assertAlmostEqual(_features.loc['s2', 'marp_lkn_theta_rkn_theta'], calculate_phase_angle_measures(_angles, ('lkn_theta', 'rkn_theta'))[1])
+
+        pd.testing.assert_frame_equal(run_pipeline(self._sessions, self._stages, n_jobs=2, chunksize=2), _features)
+
+        self.assertRaises(ValueError, run_pipeline, self._sessions, ['angles'])
+        self.assertRaises(TypeError, run_pipeline, self._sessions, None)
+
+    def test_run_pipeline_float32(self):
+        _sessions    = []
+        for sidx, session in enumerate(self._sessions):
+            _data    = session._data.to_dataframe() if isinstance(session._data, JointTensor) else session._data
+            _data    = _data.set_index(pd.RangeIndex(1000, 1000 + len(_data)))
+            _data    = JointTensor.from_dataframe(_data, psc._JOINT_NAMES_3, dtype=np.float32) if sidx % 2 else \
+                       _data.astype({col: np.float32 for col in _data.columns[1:]})
+            _sessions.append(Session(session._name, _data, activity='walk', participant_id=sidx))
+
+        pd.testing.assert_frame_equal(run_pipeline(_sessions, self._stages, n_jobs=2, chunksize=2), run_pipeline(_sessions, self._stages))
+
+        # the workers rebuild the same data as the serial path gets
+        for session in _sessions[:2]:
+            _arr, _layout = _get_session_array(session._data)
+            _rebuilt     = _make_session_data(_arr, _layout)
+            if isinstance(session._data, JointTensor):
+                np.testing.assert_array_equal(_rebuilt.data, session._data.data)
+                self.assertEqual(_rebuilt.data.dtype, np.float32)
+                pd.testing.assert_index_equal(_rebuilt.index, session._data.index)
+            else:
+                pd.testing.assert_frame_equal(_rebuilt, session._data)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+import json
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.profiling as profiling
+
+from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+from py_wholebodymovement.articulated_figure import iter_windowed_phase_locking_values
+from py_wholebodymovement.utils.cleaning_utils import denoise_data
+
+class ProfilingTestCases(unittest.TestCase):
+    def setUp(self):
+        _t               = np.arange(1000) / 30.
+        self._test_data  = pd.DataFrame({'a': np.sin(_t), 'b': np.cos(1.1*_t)})
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_profile(self):
+        calculate_phase_locking_value(self._test_data, ('a', 'b'))
+        self.assertEqual(profiling.records(), [])
+
+        with profiling.profile(trace_memory=True):
+            calculate_phase_locking_value(self._test_data, ('a', 'b'), should_remove_outliers=True)
+            denoise_data(self._test_data['a'] + 2., haarlevel=2)
+            list(iter_windowed_phase_locking_values(self._test_data, ('a', 'b'), 100))
+
+        self.assertFalse(profiling.is_enabled())
+        _summary     = profiling.summary()
+
+        self.assertEqual(_summary['cleaning_utils.clean_gaussian_outliers']['calls'], 2)
+        self.assertEqual(_summary['articulated_figure.calculate_phase_locking_value']['frames'], 1000)
+        self.assertEqual(_summary['articulated_figure.iter_windowed_phase_locking_values']['calls'], 1)
+        self.assertEqual(_summary['cleaning_utils.denoise_data']['calls'], 1)
+
+        _records     = profiling.records()
+        self.assertEqual([_record['function'] for _record in _records[:3]], ['cleaning_utils.clean_gaussian_outliers', 
+                                                                             'cleaning_utils.clean_gaussian_outliers', 
+                                                                             'articulated_figure.calculate_phase_locking_value'])
+        self.assertGreaterEqual(_records[2]['bytes'], max(_records[0]['bytes'], _records[1]['bytes']))
+        self.assertGreater(_records[2]['wall_time'], 0.)
+
+        self.assertEqual(json.loads(profiling.to_json()), profiling.to_dict())
+
+    def test_profile_without_reset_peak(self):
+        # tracemalloc.reset_peak is only available from Python 3.9 on
+        _has_reset_peak              = profiling._HAS_RESET_PEAK
+        profiling._HAS_RESET_PEAK    = False
+        try:
+            with profiling.profile(trace_memory=True):
+                calculate_phase_locking_value(self._test_data, ('a', 'b'), should_remove_outliers=True)
+        finally:
+            profiling._HAS_RESET_PEAK = _has_reset_peak
+
+        _records     = profiling.records()
+        self.assertEqual(len(_records), 3)
+        self.assertGreater(_records[0]['bytes'], 0)
+        self.assertGreaterEqual(_records[2]['bytes'], max(_records[0]['bytes'], _records[1]['bytes']))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import unittest
+import tempfile
+import itertools
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.rendering import iter_skeleton_frames
+from py_wholebodymovement.rendering import render_skeleton_animation
+
+_HAS_MATPLOTLIB = importlib.util.find_spec('matplotlib') is not None
+
+class RenderingTestCases(unittest.TestCase):
+    def setUp(self):
+        _rs              = np.random.RandomState(0)
+        _dim_names       = ['_X', '_Y', '_Z']
+        _columns         = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, _dim_names)]
+        self._test_data  = pd.DataFrame(_rs.normal(size=(100, len(_columns))), columns=_columns)
+
+    def test_bones(self):
+        for joint_names, bones in [(psc._JOINT_NAMES_1, psc._BONES_1), (psc._JOINT_NAMES_2, psc._BONES_2), (psc._JOINT_NAMES_3, psc._BONES_3)]:
+            self.assertTrue(all(jn in joint_names for bone in bones for jn in bone))
+            self.assertEqual(len(set(bones)), len(bones))
+
+    @unittest.skipIf(not _HAS_MATPLOTLIB, "matplotlib not installed")
+    def test_iter_skeleton_frames(self):
+        _frames      = [image.copy() for image in iter_skeleton_frames(self._test_data, psc._BONES_3, size=(64, 48))]
+
+        self.assertEqual(len(_frames), 100)
+        self.assertEqual(_frames[0].shape, (48, 64, 4))
+        self.assertEqual(_frames[0].dtype, np.uint8)
+        self.assertTrue(np.any(_frames[0] != _frames[1]))
+
+        # decimated frames, gathered in blocks smaller than the recording, are the same images
+        _decimated   = [image.copy() for image in iter_skeleton_frames(self._test_data, psc._BONES_3, step=7, size=(64, 48), block_size=4,
+                                                                       limits=(-4., 4., -4., 4.))]
+        _jt          = JointTensor.from_dataframe(self._test_data, psc._JOINT_NAMES_3)
+        _expected    = [image.copy() for image in iter_skeleton_frames(_jt, psc._BONES_3, size=(64, 48), limits=(-4., 4., -4., 4.))][::7]
+        self.assertEqual(len(_decimated), 15)
+        for image, expected in zip(_decimated, _expected):
+            np.testing.assert_array_equal(image, expected)
+
+        # a frame with missing joints leaves out their bones only
+        _missing     = self._test_data.copy()
+        _missing.loc[0, ['Head_X', 'Head_Y']] = np.nan
+        _image       = next(iter_skeleton_frames(_missing, psc._BONES_3, size=(64, 48), limits=(-4., 4., -4., 4.)))
+        self.assertTrue(np.any(_image[:, :, :3] < 255))
+
+        self.assertRaises(TypeError, lambda: next(iter_skeleton_frames(self._test_data, ['Head', 'Neck'])))
+        self.assertRaises(ValueError, lambda: next(iter_skeleton_frames(self._test_data, psc._BONES_3, step=0)))
+
+    @unittest.skipIf(not _HAS_MATPLOTLIB, "matplotlib not installed")
+    def test_render_skeleton_animation(self):
+        self.assertRaises(FileNotFoundError, render_skeleton_animation, self._test_data, psc._BONES_3, 'walk.gif',
+                          ffmpeg_path='no-such-ffmpeg')
+        if shutil.which('ffmpeg') is None:
+            self.skipTest("ffmpeg not installed")
+
+        with tempfile.TemporaryDirectory() as path:
+            _n_frames    = render_skeleton_animation(self._test_data, psc._BONES_3, os.path.join(path, 'walk.gif'), step=2, size=(64, 48))
+
+            self.assertEqual(_n_frames, 50)
+            self.assertGreater(os.path.getsize(os.path.join(path, 'walk.gif')), 0)
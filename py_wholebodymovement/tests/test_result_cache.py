@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+import itertools
+import tempfile
+import os
+import time
+
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.utils.result_cache import ResultCache
+from py_wholebodymovement.utils.cleaning_utils import denoise_data
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+
+class ResultCacheTestCases(unittest.TestCase):
+    def setUp(self):
+        _columns         = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, ['_X', '_Y', '_Z'])]
+        _test_data       = pd.DataFrame(np.random.RandomState(0).normal(size=(50, len(_columns))), columns=_columns)
+        self._test_data  = extend_3d_articulated_figure(_test_data, psc._EXTENDED_JOINT_NAMES_3)
+        self._tmp_dir    = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_cached_calls(self):
+        _cache       = ResultCache(self._tmp_dir.name)
+        _angles      = _cache(calculate_3d_articulated_figure_angles)
+
+        _res         = _angles(self._test_data, psc._ARTICULATED_FIGURE_ANGLES_3)
+        self.assertEqual(_cache.stats, {'hits': 0, 'misses': 1, 'evictions': 0})
+
+        pd.testing.assert_frame_equal(_angles(self._test_data.copy(), psc._ARTICULATED_FIGURE_ANGLES_3), _res)
+        pd.testing.assert_frame_equal(ResultCache(self._tmp_dir.name)(calculate_3d_articulated_figure_angles)(self._test_data, psc._ARTICULATED_FIGURE_ANGLES_3), _res)
+        self.assertEqual(_cache.stats['hits'], 1)
+
+        _angles(self._test_data, psc._ARTICULATED_FIGURE_ANGLES_3, face=-1)
+        _modified    = self._test_data.copy()
+        _modified.iloc[3, 3] += 1.
+        _angles(_modified, psc._ARTICULATED_FIGURE_ANGLES_3)
+        self.assertEqual(_cache.stats, {'hits': 1, 'misses': 3, 'evictions': 0})
+
+        _sig         = np.random.RandomState(0).normal(size=(64, 3))
+        np.testing.assert_array_equal(_cache.call(denoise_data, _sig, haarlevel=2), denoise_data(_sig, haarlevel=2))
+        self.assertNotEqual(_cache.key(denoise_data, _sig, haarlevel=2), _cache.key(denoise_data, _sig, haarlevel=3))
+        self.assertNotEqual(_cache.key(denoise_data, _sig), _cache.key(denoise_data, _sig.astype(np.float32)))
+
+    def test_keys(self):
+        _cache       = ResultCache(self._tmp_dir.name)
+        _angles      = psc._ARTICULATED_FIGURE_ANGLES_3
+        _key         = _cache.key(calculate_3d_articulated_figure_angles, self._test_data, _angles)
+
+        self.assertEqual(_cache.key(calculate_3d_articulated_figure_angles, self._test_data, _angles, face=1), _key)
+        self.assertEqual(_cache.key(calculate_3d_articulated_figure_angles, self._test_data, _angles, 1), _key)
+        self.assertEqual(_cache.key(calculate_3d_articulated_figure_angles, df=self._test_data, angles=_angles), _key)
+        self.assertNotEqual(_cache.key(calculate_3d_articulated_figure_angles, self._test_data, _angles, face=-1), _key)
+
+        with mock.patch.object(py_wholebodymovement, '__version__', '0.0.0'):
+            self.assertNotEqual(_cache.key(calculate_3d_articulated_figure_angles, self._test_data, _angles), _key)
+
+        self.assertRaises(TypeError, _cache.key, denoise_data, self._test_data, dtype=object())
+
+        # Series and Index labels are part of the key, as the results carry them
+        _sig         = self._test_data['Head_X']
+        _key         = _cache.key(denoise_data, _sig)
+        self.assertEqual(_cache.key(denoise_data, _sig.copy()), _key)
+        self.assertNotEqual(_cache.key(denoise_data, _sig.rename('Head_Y')), _key)
+        self.assertNotEqual(_cache.key(denoise_data, _sig.set_axis(_sig.index + 1)), _key)
+        self.assertNotEqual(_cache.key(denoise_data, _sig.index), _cache.key(denoise_data, _sig.index.rename('frame')))
+
+    def test_lru_eviction(self):
+        _cache       = ResultCache(self._tmp_dir.name, max_bytes=3000)
+        for _idx in range(3):
+            _cache.put('k%d'%_idx, np.zeros(100) + _idx)
+            time.sleep(0.01)
+        _cache.get('k0')
+        _cache.put('k3', np.zeros(100) + 3)
+
+        self.assertEqual(_cache.stats['evictions'], 1)
+        self.assertIsNone(_cache.get('k1'))
+        np.testing.assert_array_equal(_cache.get('k0'), np.zeros(100))
+
+        _cache.clear()
+        self.assertEqual(os.listdir(self._tmp_dir.name), [])
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+import unittest
+import itertools
+import tempfile
+import os
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement.utils.predefined_schemas as psc
+
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.session import Session
+from py_wholebodymovement.session import SessionCollection
+from py_wholebodymovement.session import save_sessions
+from py_wholebodymovement.session import list_sessions
+from py_wholebodymovement.session import load_session
+
+from py_wholebodymovement.articulated_figure import calculate_3d_articulated_figure_angles
+from py_wholebodymovement.articulated_figure import extend_3d_articulated_figure
+from py_wholebodymovement.articulated_figure import calculate_phase_locking_value
+from py_wholebodymovement.utils.cleaning_utils import clean_dimensions_gaussian_outliers
+from py_wholebodymovement.utils.cleaning_utils import denoise_data
+
+class SessionTestCases(unittest.TestCase):
+    def setUp(self):
+        _columns         = [jn + dn for jn, dn in itertools.product(psc._JOINT_NAMES_3, ['_X', '_Y', '_Z'])]
+        self._test_data  = pd.DataFrame(np.random.RandomState(0).normal(size=(40, len(_columns))), columns=_columns)
+        self._test_data.insert(0, 'MovementName', 40*['walk'])
+        self._tmp_dir    = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_save_load(self):
+        _angles      = calculate_3d_articulated_figure_angles(extend_3d_articulated_figure(self._test_data, psc._EXTENDED_JOINT_NAMES_3), 
+                                                              psc._ARTICULATED_FIGURE_ANGLES_3)
+        _session     = Session('s1', self._test_data, activity='walk', participant_id=7, 
+                               date_time=pd.Timestamp('2020-01-02 03:04:05'), angles=_angles)
+        _session.save(self._tmp_dir.name)
+
+        _loaded      = Session.load(self._tmp_dir.name)
+
+        self.assertEqual(_loaded._name, 's1')
+        self.assertEqual(_loaded._participant_id, 7)
+        self.assertEqual(_loaded._date_time, '2020-01-02T03:04:05')
+        pd.testing.assert_frame_equal(_loaded._data, self._test_data, check_dtype=False)
+        pd.testing.assert_frame_equal(_loaded._angles, _angles)
+
+    def test_save_load_joint_tensor(self):
+        _jt          = JointTensor.from_dataframe(self._test_data.set_index(pd.Index(np.arange(100, 140)[::-1])), psc._JOINT_NAMES_3)
+        Session('s1', _jt).save(self._tmp_dir.name)
+
+        _loaded      = Session.load(self._tmp_dir.name)._data
+
+        self.assertIsInstance(_loaded.data.base, np.memmap)
+        np.testing.assert_array_equal(_loaded.data, _jt.data)
+        pd.testing.assert_index_equal(_loaded.index, _jt.index)
+        self.assertEqual(_loaded.joint_names, _jt.joint_names)
+        self.assertIsNone(Session.load(self._tmp_dir.name)._angles)
+
+    def test_feature_graph(self):
+        _session     = Session('s1', self._test_data)
+        _dims        = [('lkn_theta', 'rkn_theta')]
+        _session.set_feature_params(extended_dims=psc._EXTENDED_JOINT_NAMES_3, angles=psc._ARTICULATED_FIGURE_ANGLES_3, synchrony_dims=_dims)
+
+        _angles      = _session.feature('angles')
+
+        self.assertEqual(sorted(_session._features), ['angles', 'extended'])
+        pd.testing.assert_frame_equal(_angles, calculate_3d_articulated_figure_angles(
+            extend_3d_articulated_figure(self._test_data, psc._EXTENDED_JOINT_NAMES_3), psc._ARTICULATED_FIGURE_ANGLES_3))
+
+        _plvs        = _session.feature('phase_locking_values')
+
+        self.assertIs(_session.feature('angles'), _angles)
+        self.assertIs(_session.feature('denoised_angles'), _angles)
+        self.assertEqual(list(_plvs), ['plv_lkn_theta_rkn_theta'])
+        self.assertAlmostEqual(_plvs['plv_lkn_theta_rkn_theta'], calculate_phase_locking_value(_angles, _dims[0])[1])
+
+        _session.set_feature_params(sigmas=2)
+
+        self.assertEqual(sorted(_session._features), ['angles', 'extended'])
+        self.assertIs(_session.feature('angles'), _angles)
+        pd.testing.assert_frame_equal(_session.feature('cleaned_angles'), clean_dimensions_gaussian_outliers(_angles, 2))
+        self.assertIsNot(_session.feature('phase_locking_values'), _plvs)
+
+        _session.data = self._test_data.iloc[:20]
+
+        self.assertEqual(len(_session._features), 0)
+        self.assertEqual(len(_session.feature('angles')), 20)
+
+        _session._data = self._test_data
+        self.assertEqual(len(_session.feature('angles')), 40)
+
+        _session.invalidate('cleaned_angles')
+        self.assertEqual(sorted(_session._features), ['angles', 'extended'])
+
+        self.assertRaises(ValueError, _session.feature, 'velocity')
+        self.assertRaises(ValueError, _session.set_feature_params, schema=psc._ARTICULATED_FIGURE_ANGLES_3)
+        self.assertRaises(ValueError, Session('s2', self._test_data).feature, 'angles')
+
+        _angles      = Session('s3', self._test_data, angles=_angles).feature('angles')
+        self.assertEqual(len(_angles), 40)
+
+    def test_feature_graph_denoise(self):
+        _session     = Session('s1', self._test_data)
+        _session.set_feature_params(extended_dims=psc._EXTENDED_JOINT_NAMES_3, angles=psc._ARTICULATED_FIGURE_ANGLES_3,
+                                    denoise={'shrinking_factor': 2}, synchrony_dims=[('lkn_theta', 'rkn_theta')])
+
+        _angles      = _session.feature('angles')
+        _denoised    = _session.feature('denoised_angles')
+
+        self.assertEqual(_denoised.shape, (20, _angles.shape[1]))
+        pd.testing.assert_index_equal(_denoised.index, _angles.index[::2])
+        np.testing.assert_allclose(_denoised.to_numpy(), denoise_data(_angles.to_numpy(), shrinking_factor=2))
+        self.assertEqual(list(_session.feature('phase_locking_values')), ['plv_lkn_theta_rkn_theta'])
+
+        _session.set_feature_params(denoise={'shrinking_factor': 0.5})
+        self.assertEqual(len(_session.feature('denoised_angles')), 80)
+
+    def test_cohort(self):
+        _sessions    = [Session('s%d'%sidx, self._test_data.iloc[sidx*10:(sidx + 1)*10]) for sidx in range(4)]
+        save_sessions(_sessions, self._tmp_dir.name)
+
+        self.assertEqual(list_sessions(self._tmp_dir.name), ['s0', 's1', 's2', 's3'])
+        pd.testing.assert_frame_equal(load_session(self._tmp_dir.name, 's2', mmap_mode=None)._data, 
+                                      self._test_data.iloc[20:30], check_dtype=False)
+        self.assertRaises(KeyError, load_session, self._tmp_dir.name, 's4')
+        self.assertRaises(ValueError, save_sessions, _sessions + _sessions[:1], os.path.join(self._tmp_dir.name, 'dup'))
+
+class SessionCollectionTestCases(unittest.TestCase):
+    def setUp(self):
+        _rs              = np.random.RandomState(0)
+        self._test_data  = pd.DataFrame({'UserID': _rs.choice([3, 1, 2], size=300),
+                                         'SessionNumber': _rs.choice([1, 2], size=300),
+                                         'MovementName': _rs.choice(['walk', 'jump'], size=300),
+                                         'Head_Y': _rs.normal(size=300)})
+
+    def test_from_dataframe(self):
+        _collection  = SessionCollection.from_dataframe(self._test_data)
+        _groups      = self._test_data.groupby(['UserID', 'SessionNumber', 'MovementName'])
+
+        self.assertEqual(len(_collection), _groups.ngroups)
+        self.assertEqual(sum(len(_session._data) for _session in _collection), len(self._test_data))
+        for _key, _group in _groups:
+            self.assertIn(_key, _collection)
+            pd.testing.assert_frame_equal(_collection[_key]._data, _group)
+            self.assertIs(_collection.get(*_key), _collection[_key])
+
+        self.assertIsNone(_collection.get(4, 1, 'walk'))
+        self.assertEqual(sorted(_session._session_number for _session in _collection.select(participant_id=2, activity='jump')), [1, 2])
+        self.assertRaises(KeyError, SessionCollection.from_dataframe, self._test_data, participant_col='ParticipantID')
+        self.assertRaises(ValueError, _collection.add, next(iter(_collection)))
@@ -1,48 +1,168 @@
 #!/usr/bin/env python
 # coding: utf-8
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 import scipy
+import scipy.interpolate
+import scipy.sparse
+import scipy.sparse.linalg
 import pywt
 
-def clean_gaussian_outliers(sig, sigmas=3):
+from py_wholebodymovement.joint_tensor import JointTensor
+from py_wholebodymovement.utils.profiling import instrumented
+
+_SPLINE_BASES_CACHE_SIZE 	= 32
+_CUBIC_RESAMPLING_OVERLAP 	= 4
+
+def _gaussian_bounds(arr, sigmas, window=None):
+	"""Calculates the lower and upper bounds of the non-outlier values of `arr` along its last axis, either once for 
+	the whole data or over a centered rolling window of `window` samples, as well as the mean used to replace leading outliers.
+	Missing (nan) values are left out of the statistics.
+	"""
+	if window is None:
+		has_nan = np.isnan(np.sum(arr))
+		mean 	= (np.nanmean if has_nan else np.mean)(arr, axis=-1, keepdims=True)
+		std 	= (np.nanstd if has_nan else np.std)(arr, axis=-1, keepdims=True)
+	else:
+		rolling = pd.DataFrame(arr.reshape(-1, arr.shape[-1]).T).rolling(int(window), center=True, min_periods=1)
+		mean 	= rolling.mean().to_numpy(dtype=arr.dtype).T.reshape(arr.shape)
+		std 	= rolling.std(ddof=0).to_numpy(dtype=arr.dtype).T.reshape(arr.shape)
+	return mean - sigmas * std, mean + sigmas * std, mean if window is None else mean[..., :1]
+
+def _fill_forward_outliers(arr, lower, upper, mean):
+	"""Fills forward the values of `arr` outside of `(lower, upper)` along its last axis by propagating the index 
+	of the last valid (non-outlier, non-nan) value. Leading outliers are replaced with `mean`; nan values are kept.
+	"""
+	outliers = np.logical_or(arr > upper, arr < lower)
+	if not np.any(outliers):
+		return arr.copy()
+
+	eligible 	= ~outliers & ~np.isnan(arr)
+	all_idxs 	= np.broadcast_to(np.arange(arr.shape[-1]), arr.shape)
+	fill_idxs 	= np.where(eligible, all_idxs, 0)
+	np.maximum.accumulate(fill_idxs, axis=-1, out=fill_idxs)
+	fill_idxs 	= np.where(outliers, fill_idxs, all_idxs)
+	res = np.take_along_axis(arr, fill_idxs, axis=-1)
+
+	leading = outliers & ~np.logical_or.accumulate(eligible, axis=-1)
+	if np.any(leading):
+		res = np.where(leading, mean, res).astype(arr.dtype, copy=False)
+	return res
+
+def _clean_array_gaussian_outliers(arr, sigmas, window=None):
+	"""Cleans the floating point array `arr` along its last axis, with separate statistics for every row."""
+	lower, upper, mean = _gaussian_bounds(arr, sigmas, window)
+	return _fill_forward_outliers(arr, lower, upper, mean)
+
+@instrumented
+def clean_gaussian_outliers(sig, sigmas=3, window=None, inplace=False, dtype=None):
 	"""Fills forward the values more than `sigmas` standard deviations away from `sig`'s mean. 
 	If the first value is an outlier, it is replaced with `sig`'s mean.
 
+	The mean and standard deviation are calculated once on the input data, or over a centered rolling 
+	window of `window` samples for long non-stationary recordings.
+
 	Args:
 		sig: iterable, the input data to be cleaned
 		sigmas: int, number of standard deviations to be used for cleaning
+		window: int, length of the rolling window used to calculate the mean and standard deviation; `None` to use the whole data
+		inplace: bool, whether to overwrite `sig` with the cleaned data or to return a new array
+		dtype: float32 or float64, the type the data is cleaned in; by default that of `sig` if it is a floating point type, float64 otherwise
 
 	Returns:
-		cleaned version of the input data `sig`
+		cleaned version of the input data `sig`; a new numpy array unless `inplace` is True, in which case `sig` itself
 	"""
-	for sigidx in range(len(sig)):
-		if (sig[sigidx] > np.mean(sig) + sigmas * np.std(sig) or 
-			sig[sigidx] < np.mean(sig) - sigmas * np.std(sig)):
-			if sigidx > 0:
-				sig[sigidx] = sig[sigidx-1]
-			else:
-				sig[sigidx] = np.mean(sig)
-	return sig
-
-def clean_dimensions_gaussian_outliers(df, sigmas=3):
-	"""Cleans all the columns in the input data `df` by calling the function `clean_gaussian_outliers` 
-	on them.
+	arr = np.asarray(sig)
+	if dtype is not None:
+		arr = arr.astype(dtype, copy=False)
+	elif not np.issubdtype(arr.dtype, np.floating):
+		arr = arr.astype(np.float64)
+	if arr.shape[0] == 0:
+		return sig if inplace else arr.copy()
+
+	res = _clean_array_gaussian_outliers(arr, sigmas, window)
+
+	if inplace:
+		sig[:] = res
+		return sig
+	return res
+
+@instrumented
+def clean_dimensions_gaussian_outliers(df, sigmas=3, window=None, n_jobs=None, dtype=None):
+	"""Cleans all the numeric columns in the input data `df` at once, the same way `clean_gaussian_outliers` 
+	cleans a single column, i.e. using per-column statistics and forward filling.
 
 	Args:
 		df: DataFrame, the input data
 		sigmas: int, number of standard deviations to be used for cleaning
+		window: int, length of the rolling window used to calculate the mean and standard deviation; `None` to use the whole data
+		n_jobs: int, number of threads to spread the columns of very wide inputs over; `None` to clean all the columns in the calling thread
+		dtype: float32 or float64, the type the data is cleaned in and the cleaned columns are returned as; `None` to clean 
+			in the widest type of the numeric columns (at least float32) and return every column with its original type
 
 	Returns:
-		a cleaned of the input data `df`
+		a cleaned copy of the input data `df` with the same index and columns
 	"""
-	res = pd.DataFrame(columns=df.columns)
-	for col in df.columns:
-		res.loc[:, col] = clean_gaussian_outliers(df.loc[:, col], sigmas=sigmas)
-	return res
+	if df is None:
+		raise TypeError("No input data provided.")
+
+	cols = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+	if df.shape[0] == 0 or len(cols) == 0:
+		return df.copy()
+
+	arr = df.loc[:, cols].to_numpy(dtype=np.result_type(np.float32, *df.loc[:, cols].dtypes) if dtype is None else dtype).T
+
+	if n_jobs is None or n_jobs <= 1 or len(cols) < 2:
+		cleaned = _clean_array_gaussian_outliers(arr, sigmas, window)
+	else:
+		cleaned = np.empty_like(arr)
+		bounds 	= np.linspace(0, len(cols), min(n_jobs, len(cols)) + 1).astype(int)
+		def _clean_chunk(cidx):
+			cleaned[bounds[cidx]:bounds[cidx + 1]] = _clean_array_gaussian_outliers(arr[bounds[cidx]:bounds[cidx + 1]], sigmas, window)
+		with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+			list(executor.map(_clean_chunk, range(len(bounds) - 1)))
+
+	cleaned = dict(zip(cols, cleaned))
+	return pd.DataFrame({col: (cleaned[col] if dtype is not None else cleaned[col].astype(df[col].dtype, copy=False)) if col in cleaned else df[col] 
+						for col in df.columns}, index=df.index)
+
+def _bspline_design_matrix(x, knots, k):
+	"""The sparse design matrix of the B-spline basis of degree `k` and `knots` at `x`. `BSpline.design_matrix` 
+	is only available from scipy 1.8 on; older versions evaluate every basis element at once, as a dense matrix.
+	"""
+	if hasattr(scipy.interpolate.BSpline, 'design_matrix'):
+		return scipy.interpolate.BSpline.design_matrix(x, knots, k)
+	return scipy.sparse.csr_matrix(scipy.interpolate.BSpline(knots, np.eye(len(knots) - k - 1), k)(x))
+
+@lru_cache(maxsize=_SPLINE_BASES_CACHE_SIZE)
+def _wavelet_spline_bases(sig_len, haarlevel, shrinking_factor, dtype=np.float64):
+	"""Builds the cubic spline bases used by the wavelet denoising of signals of length `sig_len`, i.e. the factorized 
+	collocation matrix of the not-a-knot cubic spline interpolating the approximation coefficients, and the sparse 
+	B-spline design matrices evaluating that spline on the denoised (shrunk/expanded) and on the original time grids. 
+	The bases only depend on the arguments, so they are cached and shared by all the signals of the same length and type.
+	"""
+	coeffs_len = sig_len
+	for _ in range(haarlevel):
+		coeffs_len = pywt.dwt_coeff_len(coeffs_len, 2, "periodization")
+	if coeffs_len <= 3:
+		raise ValueError("Signal of length %d is too short for haarlevel %d."%(sig_len, haarlevel))
+
+	x 			= np.linspace(1, sig_len, coeffs_len)
+	knots 		= np.concatenate([np.repeat(x[0], 4), x[2:-2], np.repeat(x[-1], 4)])
+	colloc 		= scipy.sparse.linalg.splu(scipy.sparse.csc_matrix(_bspline_design_matrix(x, knots, 3), dtype=dtype))
+	xnew 		= np.linspace(1, sig_len, int(sig_len/shrinking_factor))
+	basis 		= scipy.sparse.csr_matrix(_bspline_design_matrix(xnew, knots, 3), dtype=dtype)
+	rxnew 		= np.linspace(1, sig_len, sig_len)
+	rbasis 		= scipy.sparse.csr_matrix(_bspline_design_matrix(rxnew, knots, 3), dtype=dtype)
 
-def denoise_data(sig, method='wavelet', **kwargs):
+	return colloc, basis, rbasis
+
+@instrumented
+def denoise_data(sig, method='wavelet', axis=0, dtype=np.float64, **kwargs):
 	"""Denoise the input data `sig` using the denoising method specified by the other arguments. 
 
 	Note: at this moment, only the wavelet method for denoising is implemented.
@@ -50,10 +170,19 @@ def denoise_data(sig, method='wavelet', **kwargs):
 	(1) 'haarlevel' to be used to discard high-frequency components, and 
 	(2) 'shrinking_factor' which determines how much the denoised signal should be shruk/expanded.
 
+	Multi-channel data, e.g. a `(frames, channels)` array, is denoised along `axis` for all the channels at once, 
+	and the spline bases are cached per (length, haarlevel, shrinking_factor) so that signals of the same length reuse them.
+
 	Args:
 		sig: iterable, the input data to be denoised
 		method: str, the denoising method to be used
+		axis: int, the time axis of `sig`
+		dtype: float32 or float64, the type the data is denoised in. With float32, the wavelet transform and the spline 
+			solves are done in single precision, and the result differs from the float64 one by about 1e-6 times the signal amplitude
 		**kwargs: dict, input arguments for the denoising method. 
+
+	Returns:
+		the denoised version of `sig`, with `int(len/shrinking_factor)` samples along `axis`
 	"""
 	if method is None:
 		raise TypeError("No denoising method provided.")
@@ -64,23 +193,191 @@ def denoise_data(sig, method='wavelet', **kwargs):
 		haarlevel = int(kwargs['haarlevel']) if 'haarlevel' in kwargs else 2
 		shrinking_factor = float(kwargs['shrinking_factor']) if 'shrinking_factor' in kwargs else 1
 
-		coeffs = pywt.wavedec(sig, "haar", level=haarlevel, mode="periodization")
+		sig = np.moveaxis(np.asarray(sig, dtype=dtype), axis, 0)
+		sig_shape = sig.shape
+		sig = sig.reshape(sig_shape[0], -1)
+
+		coeffs = pywt.wavedec(sig, "haar", level=haarlevel, mode="periodization", axis=0)
 		sig_dn = coeffs[0]
 
 		# Cubic Spline Interpolation
-		x = np.linspace(1, len(sig), len(sig_dn))
-		tck = scipy.interpolate.splrep(x, sig_dn, s=0)
-		xnew = np.linspace(1, len(sig), int(len(sig)/shrinking_factor))
-		sig_dn_scaled = scipy.interpolate.splev(xnew, tck, der=0)
+		colloc, basis, rbasis = _wavelet_spline_bases(sig_shape[0], haarlevel, shrinking_factor, np.dtype(dtype))
+		spline_coeffs = colloc.solve(sig_dn)
+		sig_dn_scaled = basis @ spline_coeffs
 
 		# Calculate the Rescaling Factor
-		rx = np.linspace(1, len(sig), len(sig_dn))
-		rtck = scipy.interpolate.splrep(rx, sig_dn, s=0)
-		rxnew = np.linspace(1, len(sig), len(sig))
-		rsig_dn = scipy.interpolate.splev(rxnew, rtck, der=0)
+		rsig_dn = rbasis @ spline_coeffs
 
-		scale = np.mean(rsig_dn/sig)
+		scale = np.mean(rsig_dn/sig, axis=0)
 		sig_dn_scaled /= scale
 
-		return sig_dn_scaled
+		return np.moveaxis(sig_dn_scaled.reshape((sig_dn_scaled.shape[0],) + sig_shape[1:]), 0, axis)
+
+def _get_timed_values(data, timestamp_col, dtype):
+	"""Split `data` into its float64 timestamps, its `(n_frames, n_columns)` values and the layout needed to rebuild it."""
+	if isinstance(data, JointTensor):
+		if data.index is None:
+			raise ValueError("Need a JointTensor indexed by the frame timestamps.")
+		return (np.asarray(data.index, dtype=np.float64), 
+				data.data.reshape(data.shape[0], -1).astype(data.data.dtype if dtype is None else dtype, copy=False),
+				(JointTensor, data.joint_names, data.suffixes))
+	if isinstance(data, pd.DataFrame):
+		timestamps 	= data.index if timestamp_col is None else data[timestamp_col]
+		cols 		= [col for col in data.columns if col != timestamp_col and pd.api.types.is_numeric_dtype(data[col])]
+		if dtype is None:
+			dtype 	= np.result_type(np.float32, *data.loc[:, cols].dtypes)
+		return np.asarray(timestamps, dtype=np.float64), data.loc[:, cols].to_numpy(dtype=dtype), (pd.DataFrame, cols)
+	raise TypeError("Invalid input data of type %s."%type(data).__name__)
+
+def _make_timed_data(layout, timestamp_col, timestamps, values):
+	"""Rebuild the data split by `_get_timed_values` with new `timestamps` and `values`."""
+	if layout[0] is JointTensor:
+		return JointTensor(values.reshape(values.shape[0], len(layout[1]), len(layout[2])), layout[1], layout[2], 
+						   index=pd.Index(timestamps))
+	if timestamp_col is None:
+		return pd.DataFrame(values, columns=layout[1], index=pd.Index(timestamps))
+	res = pd.DataFrame(values, columns=layout[1])
+	res.insert(0, timestamp_col, timestamps)
+	return res
+
+def _sort_timestamps(timestamps, values):
+	"""Sort the frames by timestamp and drop the frames with repeated timestamps."""
+	if np.any(np.diff(timestamps) <= 0):
+		order 		= np.argsort(timestamps, kind='stable')
+		timestamps 	= timestamps[order]
+		values 		= values[order]
+		keep 		= np.concatenate([[True], np.diff(timestamps) > 0])
+		timestamps 	= timestamps[keep]
+		values 		= values[keep]
+	return timestamps, values
+
+def _get_resampling_grid(rate, first_step, end, inclusive):
+	"""The fixed rate timestamps `k/rate` from step `first_step` up to `end`."""
+	last_step = np.floor(np.round(end*rate, 9)) + 1 if inclusive else np.ceil(np.round(end*rate, 9))
+	return np.arange(first_step, max(first_step, last_step)) / rate
+
+def _resample_array(timestamps, values, grid, max_gap, method):
+	"""Interpolate the columns of `values` sampled at `timestamps` at the timestamps in `grid`. The nan values are 
+	treated as missing samples, and the columns sharing the same missing samples are interpolated at once. 
+	The grid points outside of the samples or within gaps longer than `max_gap` are set to nan.
+	"""
+	res = np.full((grid.shape[0], values.shape[1]), np.nan, dtype=values.dtype)
+	if grid.shape[0] == 0 or values.shape[1] == 0:
+		return res
+
+	missing = np.isnan(values)
+	if not np.any(missing):
+		groups = [(slice(None), slice(None))]
+	else:
+		patterns, inverse = np.unique(missing.T, axis=0, return_inverse=True)
+		groups = [(np.flatnonzero(inverse.ravel() == pidx), np.logical_not(pattern)) for pidx, pattern in enumerate(patterns)]
+
+	for cols, rows in groups:
+		tt = timestamps[rows]
+		yy = values[rows][:, cols]
+		if tt.shape[0] < 2:
+			continue
+
+		idxs 	= np.clip(np.searchsorted(tt, grid, side='right') - 1, 0, tt.shape[0] - 2)
+		filled 	= np.logical_and(grid >= tt[0], grid <= tt[-1])
+		if max_gap is not None:
+			filled &= np.logical_or.reduce([tt[idxs + 1] - tt[idxs] <= max_gap, grid == tt[idxs], grid == tt[idxs + 1]])
+
+		if method == 'linear':
+			weights = ((grid - tt[idxs]) / (tt[idxs + 1] - tt[idxs])).astype(values.dtype)[:, None]
+			interp 	= yy[idxs] + weights*(yy[idxs + 1] - yy[idxs])
+		else:
+			interp 	= scipy.interpolate.CubicSpline(tt, yy, axis=0)(grid).astype(values.dtype, copy=False)
+		res[:, cols] = np.where(filled[:, None], interp, np.nan)
+
+	return res
+
+def _check_resampling_args(rate, method):
+	"""Check the sampling rate and interpolation method of a resampling."""
+	if rate is None or rate <= 0:
+		raise ValueError("Invalid sampling rate %s."%str(rate))
+	if method not in ['linear', 'cubic']:
+		raise ValueError("Invalid interpolation method %s; 'linear' or 'cubic' expected."%str(method))
+
+@instrumented
+def resample_data(data, rate, max_gap=None, method='linear', timestamp_col='Timestamp', dtype=None):
+	"""Resample the frames of `data`, captured at irregular timestamps and possibly with dropped frames, 
+	to the fixed rate `rate`, i.e. at the timestamps :math:`k/rate` within the recording.
+
+	All the columns (joints) are interpolated at once. Missing samples, i.e. dropped frames and nan values, 
+	are filled by the interpolation as long as the gap between the samples around them is at most `max_gap`; 
+	the frames within longer gaps are set to nan.
+
+	Args:
+		data: DataFrame or JointTensor, the input data; the timestamps of a JointTensor are its index
+		rate: float, the target sampling rate, in samples per timestamp unit (e.g. Hz for timestamps in seconds)
+		max_gap: float, the longest gap to be filled, in timestamp units; `None` to fill all the gaps
+		method: str, 'linear' or 'cubic' (cubic spline) interpolation
+		timestamp_col: str, the timestamp column of a DataFrame `data`; `None` to use its index
+		dtype: float32 or float64, the type of the resampled values; by default that of the input values (at least float32)
+
+	Returns:
+		the resampled data of the same type as `data`; a DataFrame only keeps its timestamp and numeric columns
+	"""
+	if data is None:
+		raise TypeError("No input data provided.")
+	_check_resampling_args(rate, method)
+
+	timestamps, values, layout 	= _get_timed_values(data, timestamp_col, dtype)
+	timestamps, values 			= _sort_timestamps(timestamps, values)
+	if timestamps.shape[0] == 0:
+		return _make_timed_data(layout, timestamp_col, timestamps, values)
+
+	grid = _get_resampling_grid(rate, np.ceil(np.round(timestamps[0]*rate, 9)), timestamps[-1], inclusive=True)
+	return _make_timed_data(layout, timestamp_col, grid, _resample_array(timestamps, values, grid, max_gap, method))
+
+@instrumented
+def iter_resampled_data(chunks, rate, max_gap=None, method='linear', timestamp_col='Timestamp', dtype=None):
+	"""Resample consecutive chunks of a recording, e.g. read from a large file or a live feed, the same way 
+	`resample_data` resamples a whole recording, without ever holding more than one chunk.
+
+	The last few frames of every chunk are carried over to the next one, so that the frames in between chunks 
+	are interpolated too; the resampled frames that need them are yielded with the next chunk. Linear interpolation 
+	gives the same result as `resample_data` provided that each column has a sample in the last two frames of 
+	every chunk, whereas cubic splines are fitted per chunk and may differ slightly around the chunk boundaries.
+
+	Args:
+		chunks: iterable, consecutive chunks of the recording, as accepted by `resample_data`
+		rate: float, the target sampling rate, in samples per timestamp unit
+		max_gap: float, the longest gap to be filled, in timestamp units; `None` to fill all the gaps
+		method: str, 'linear' or 'cubic' (cubic spline) interpolation
+		timestamp_col: str, the timestamp column of DataFrame chunks; `None` to use their index
+		dtype: float32 or float64, the type of the resampled values
+
+	Yields:
+		the resampled frames of each chunk, of the same type as the chunks
+	"""
+	_check_resampling_args(rate, method)
+
+	overlap 	= 1 if method == 'linear' else _CUBIC_RESAMPLING_OVERLAP
+	carry 		= None
+	next_step 	= None
+	layout 		= None
+
+	for chunk in chunks:
+		timestamps, values, layout = _get_timed_values(chunk, timestamp_col, dtype)
+		if carry is not None:
+			timestamps 	= np.concatenate([carry[0], timestamps])
+			values 		= np.concatenate([carry[1], values.astype(carry[1].dtype, copy=False)])
+		timestamps, values = _sort_timestamps(timestamps, values)
+		if timestamps.shape[0] == 0:
+			continue
+
+		if next_step is None:
+			next_step = np.ceil(np.round(timestamps[0]*rate, 9))
+		if timestamps.shape[0] > overlap:
+			grid = _get_resampling_grid(rate, next_step, timestamps[-overlap], inclusive=False)
+			if grid.shape[0] > 0:
+				next_step += grid.shape[0]
+				yield _make_timed_data(layout, timestamp_col, grid, _resample_array(timestamps, values, grid, max_gap, method))
+		carry = (timestamps[-2*overlap:], values[-2*overlap:])
 
+	if carry is not None:
+		grid = _get_resampling_grid(rate, next_step, carry[0][-1], inclusive=True)
+		if grid.shape[0] > 0:
+			yield _make_timed_data(layout, timestamp_col, grid, _resample_array(carry[0], carry[1], grid, max_gap, method))
@@ -44,6 +44,28 @@ _ARTICULATED_FIGURE_ANGLES_1 = {
     'trso_theta': ("Torso", "Neck", "Waist", 1, True), ## Torso	
 }
 
+_BONES_1 = [
+    ('Waist', 'Torso'),
+    ('Torso', 'Neck'),
+    ('Neck', 'Head'),
+    ('Neck', 'LeftShoulder'),
+    ('LeftShoulder', 'LeftElbow'),
+    ('LeftElbow', 'LeftWrist'),
+    ('LeftWrist', 'LeftHand'),
+    ('Neck', 'RightShoulder'),
+    ('RightShoulder', 'RightElbow'),
+    ('RightElbow', 'RightWrist'),
+    ('RightWrist', 'RightHand'),
+    ('Waist', 'LeftHip'),
+    ('LeftHip', 'LeftKnee'),
+    ('LeftKnee', 'LeftAnkle'),
+    ('LeftAnkle', 'LeftFoot'),
+    ('Waist', 'RightHip'),
+    ('RightHip', 'RightKnee'),
+    ('RightKnee', 'RightAnkle'),
+    ('RightAnkle', 'RightFoot'),
+]
+
 _JOINT_NAMES_2 = [
 	'nose',
 	'leye',
@@ -64,6 +86,25 @@ _JOINT_NAMES_2 = [
 	'rankl'
 ]
 
+_BONES_2 = [
+    ('nose', 'leye'),
+    ('nose', 'reye'),
+    ('leye', 'lear'),
+    ('reye', 'rear'),
+    ('lshldr', 'rshldr'),
+    ('lshldr', 'lelbw'),
+    ('lelbw', 'lwrst'),
+    ('rshldr', 'relbw'),
+    ('relbw', 'rwrst'),
+    ('lshldr', 'lhip'),
+    ('rshldr', 'rhip'),
+    ('lhip', 'rhip'),
+    ('lhip', 'lkn'),
+    ('lkn', 'lankl'),
+    ('rhip', 'rkn'),
+    ('rkn', 'rankl'),
+]
+
 _EXTENDED_JOINT_NAMES_2 = {
     'neck': ('lshldr', 'rshldr', 'lshldr', 'rshldr'), ## Neck
     'torso': ('lhip', 'rhip', 'lhip', 'rhip'), ## Torso
@@ -105,6 +146,29 @@ _JOINT_NAMES_3 = [
     'RightFoot',
 ]
 
+_BONES_3 = [
+    ('SpineB', 'SpineM'),
+    ('SpineM', 'SpineSh'),
+    ('SpineSh', 'Neck'),
+    ('Neck', 'Head'),
+    ('SpineSh', 'LeftShoulder'),
+    ('LeftShoulder', 'LeftElbow'),
+    ('LeftElbow', 'LeftWrist'),
+    ('LeftWrist', 'LeftHand'),
+    ('SpineSh', 'RightShoulder'),
+    ('RightShoulder', 'RightElbow'),
+    ('RightElbow', 'RightWrist'),
+    ('RightWrist', 'RightHand'),
+    ('SpineB', 'LeftHip'),
+    ('LeftHip', 'LeftKnee'),
+    ('LeftKnee', 'LeftAnkle'),
+    ('LeftAnkle', 'LeftFoot'),
+    ('SpineB', 'RightHip'),
+    ('RightHip', 'RightKnee'),
+    ('RightKnee', 'RightAnkle'),
+    ('RightAnkle', 'RightFoot'),
+]
+
 _EXTENDED_JOINT_NAMES_3 = {
     'spinem_at_neck': ('SpineM', 'SpineM', 'Neck', 'Neck', 'SpineM', 'SpineM'), ## SpineM (torso) at neck height
 }
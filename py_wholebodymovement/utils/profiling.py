@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import json
+import time
+import inspect
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+
+_PROFILING_ENABLED 	= False
+_TRACE_MEMORY 		= False
+_PROFILING_RECORDS 	= []
+_PROFILING_LOCK 	= threading.Lock()
+_PROFILING_LOCAL 	= threading.local()
+_HAS_RESET_PEAK 	= hasattr(tracemalloc, 'reset_peak')
+
+def enable(trace_memory=False):
+	"""Start recording the calls of the instrumented functions.
+
+	Args:
+		trace_memory: bool, whether to also record the peak bytes allocated by every call using `tracemalloc`,
+			which slows the calls down considerably. `tracemalloc` traces a single process-wide peak, so the peaks 
+			are only reliable for calls made from one thread at a time, e.g. not with `n_jobs` threads; before 
+			Python 3.9, the peak of a call that does not exceed the peak of an earlier call is underestimated
+	"""
+	global _PROFILING_ENABLED, _TRACE_MEMORY
+	if trace_memory and not tracemalloc.is_tracing():
+		tracemalloc.start()
+	_TRACE_MEMORY 		= trace_memory
+	_PROFILING_ENABLED 	= True
+
+def disable():
+	"""Stop recording the calls of the instrumented functions; the records collected so far are kept."""
+	global _PROFILING_ENABLED, _TRACE_MEMORY
+	_PROFILING_ENABLED 	= False
+	_TRACE_MEMORY 		= False
+
+def is_enabled():
+	"""Whether the calls of the instrumented functions are being recorded."""
+	return _PROFILING_ENABLED
+
+def reset():
+	"""Discard all the records."""
+	with _PROFILING_LOCK:
+		del _PROFILING_RECORDS[:]
+
+@contextmanager
+def profile(trace_memory=False):
+	"""Record the calls of the instrumented functions within a `with` block, e.g.
+
+		with profiling.profile():
+			run_pipeline(sessions, stages)
+		print(profiling.summary())
+
+	Args:
+		trace_memory: bool, whether to also record the peak bytes allocated by every call; see `enable`
+	"""
+	was_enabled, was_tracing_memory, was_tracing = _PROFILING_ENABLED, _TRACE_MEMORY, tracemalloc.is_tracing()
+	enable(trace_memory)
+	try:
+		yield
+	finally:
+		if was_enabled:
+			enable(was_tracing_memory)
+		else:
+			disable()
+		if trace_memory and not was_tracing:
+			tracemalloc.stop()
+
+def records():
+	"""The records of the calls of the instrumented functions, in order of completion.
+
+	Returns:
+		list of dicts with the `function` name, `wall_time` in seconds, number of `frames` of the first argument
+		(None if it has no length) and peak `bytes` allocated (None unless memory was traced) of every call
+	"""
+	with _PROFILING_LOCK:
+		return [dict(record) for record in _PROFILING_RECORDS]
+
+def summary():
+	"""The records aggregated by function.
+
+	Returns:
+		dict mapping the function names to dicts of the number of `calls`, the total `wall_time` and `frames`,
+		and the largest peak `bytes` allocated by a call
+	"""
+	res = {}
+	for record in records():
+		func_summary = res.setdefault(record['function'], {'calls': 0, 'wall_time': 0., 'frames': 0, 'bytes': None})
+		func_summary['calls'] 		+= 1
+		func_summary['wall_time'] 	+= record['wall_time']
+		func_summary['frames'] 		+= record['frames'] or 0
+		if record['bytes'] is not None:
+			func_summary['bytes'] = max(func_summary['bytes'] or 0, record['bytes'])
+	return res
+
+def to_dict():
+	"""The records and their summary as a dict of JSON serializable values."""
+	return {'records': records(), 'summary': summary()}
+
+def to_json(path=None, **kwargs):
+	"""Export the records and their summary as JSON.
+
+	Args:
+		path: str, the file to write the JSON to; None to only return it
+		**kwargs: dict, additional arguments of `json.dumps`, e.g. `indent`
+
+	Returns:
+		the JSON string
+	"""
+	res = json.dumps(to_dict(), **kwargs)
+	if path is not None:
+		with open(path, 'w') as f:
+			f.write(res)
+	return res
+
+def _count_frames(args):
+	"""The number of frames of the first argument of an instrumented call, if it has any."""
+	if not args:
+		return None
+	shape = getattr(args[0], 'shape', None)
+	if shape:
+		return int(shape[0])
+	try:
+		return len(args[0])
+	except TypeError:
+		return None
+
+def _start_call():
+	"""Start measuring a call; calls nest, so the peak allocation of an outer call accounts for its inner calls."""
+	if not _TRACE_MEMORY:
+		return time.perf_counter(), None
+	stack = getattr(_PROFILING_LOCAL, 'stack', None)
+	if stack is None:
+		stack = _PROFILING_LOCAL.stack = []
+	current, peak = tracemalloc.get_traced_memory()
+	if _HAS_RESET_PEAK:
+		if stack:
+			stack[-1][1] = max(stack[-1][1], peak)
+		tracemalloc.reset_peak()
+	stack.append([current, current, peak])
+	return time.perf_counter(), current
+
+def _end_call(func_name, args, start):
+	"""Finish measuring a call started with `_start_call` and record it."""
+	wall_time 	= time.perf_counter() - start[0]
+	n_bytes 	= None
+	if start[1] is not None:
+		stack 					= _PROFILING_LOCAL.stack
+		base, peak, start_peak 	= stack.pop()
+		if tracemalloc.is_tracing():
+			current, end_peak = tracemalloc.get_traced_memory()
+			if _HAS_RESET_PEAK:
+				peak 	= max(peak, end_peak)
+			else:
+				# without reset_peak (Python < 3.9) the traced peak only tells the call's peak if the call raised it
+				peak 	= end_peak if end_peak > start_peak else max(peak, current)
+			n_bytes 	= peak - base
+		if stack and _HAS_RESET_PEAK:
+			stack[-1][1] = max(stack[-1][1], peak)
+
+	with _PROFILING_LOCK:
+		_PROFILING_RECORDS.append({'function': func_name, 'wall_time': wall_time, 'frames': _count_frames(args), 'bytes': n_bytes})
+
+def instrumented(func):
+	"""Decorate `func` so that its calls are recorded while profiling is enabled.
+	When it is disabled, the only overhead is checking a global flag."""
+	func_name = func.__module__.rsplit('.', 1)[-1] + '.' + func.__qualname__
+
+	if inspect.isgeneratorfunction(func):
+		@functools.wraps(func)
+		def generator_wrapper(*args, **kwargs):
+			if not _PROFILING_ENABLED:
+				return (yield from func(*args, **kwargs))
+			start = _start_call()
+			try:
+				return (yield from func(*args, **kwargs))
+			finally:
+				_end_call(func_name, args, start)
+		return generator_wrapper
+
+	@functools.wraps(func)
+	def wrapper(*args, **kwargs):
+		if not _PROFILING_ENABLED:
+			return func(*args, **kwargs)
+		start = _start_call()
+		try:
+			return func(*args, **kwargs)
+		finally:
+			_end_call(func_name, args, start)
+	return wrapper
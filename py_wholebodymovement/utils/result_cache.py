@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+import os
+import re
+import pickle
+import inspect
+import hashlib
+import functools
+
+import numpy as np
+import pandas as pd
+
+import py_wholebodymovement
+
+from py_wholebodymovement.joint_tensor import JointTensor
+
+_CACHE_FORMAT_VERSION 	= 1
+_CACHE_FILE_SUFFIX 		= '.pkl'
+_MEMORY_ADDRESS_REPR 	= re.compile(r' at 0x[0-9a-fA-F]+')
+
+def _update_hash(h, obj):
+	"""Feed `obj` to the hash `h`: arrays by dtype, shape and buffer, containers recursively and anything else by `repr`, 
+	unless the `repr` holds a memory address, which would make a key that never hits."""
+	if isinstance(obj, np.ndarray):
+		h.update(b'ndarray%s%s'%(obj.dtype.str.encode(), str(obj.shape).encode()))
+		if obj.dtype.hasobject:
+			h.update(repr(obj.tolist()).encode())
+		else:
+			h.update(np.ascontiguousarray(obj).view(np.uint8).reshape(-1).data)
+	elif isinstance(obj, JointTensor):
+		h.update(b'JointTensor')
+		_update_hash(h, (obj.data, obj.joint_names, obj.suffixes, obj.index))
+	elif isinstance(obj, pd.DataFrame):
+		h.update(b'DataFrame')
+		_update_hash(h, (obj.index, list(obj.columns)))
+		for cidx in range(obj.shape[1]):
+			_update_hash_values(h, obj.iloc[:, cidx])
+	elif isinstance(obj, pd.Series):
+		h.update(b'Series')
+		_update_hash(h, (obj.name, obj.index))
+		_update_hash_values(h, obj)
+	elif isinstance(obj, pd.Index):
+		h.update(type(obj).__name__.encode())
+		_update_hash(h, list(obj.names))
+		_update_hash_values(h, obj)
+	elif isinstance(obj, dict):
+		h.update(b'dict%d'%len(obj))
+		for key, value in obj.items():
+			_update_hash(h, key)
+			_update_hash(h, value)
+	elif isinstance(obj, (tuple, list)):
+		h.update(b'%s%d'%(type(obj).__name__.encode(), len(obj)))
+		for item in obj:
+			_update_hash(h, item)
+	else:
+		obj_repr = repr(obj)
+		if _MEMORY_ADDRESS_REPR.search(obj_repr):
+			raise TypeError("Cannot hash an argument of type %s, whose representation depends on its memory address."%type(obj).__name__)
+		h.update(b'%s:%s'%(type(obj).__name__.encode(), obj_repr.encode()))
+
+def _bind_arguments(func, args, kwargs):
+	"""The `(name, value)` pairs of all the arguments of calling `func` with `args` and `kwargs`, defaults included, 
+	so that the calls passing an argument by position, by keyword or not at all (as its default) are the same."""
+	try:
+		signature = inspect.signature(func)
+	except (TypeError, ValueError):
+		return (args, sorted(kwargs.items()))
+	bound = signature.bind(*args, **kwargs)
+	bound.apply_defaults()
+	return [(name, sorted(value.items()) if signature.parameters[name].kind == inspect.Parameter.VAR_KEYWORD else value)
+			for name, value in bound.arguments.items()]
+
+def _update_hash_values(h, obj):
+	"""Feed the dtype and values of the Series or Index `obj` to the hash `h`, without its labels."""
+	h.update(str(obj.dtype).encode())
+	if isinstance(obj, pd.RangeIndex):
+		h.update(repr((obj.start, obj.stop, obj.step)).encode())
+	else:
+		_update_hash(h, obj.to_numpy())
+
+class ResultCache():
+	"""A content-addressed on-disk cache of function results, evicting the least recently used results
+	once the cached files exceed `max_bytes`.
+
+	Results are keyed by a BLAKE2 hash of the package version, the function name and its arguments (defaults included), 
+	hashing arrays, DataFrames and JointTensors by their buffers, so a result is reused whenever the input data, schema 
+	and parameters are the same, e.g. when an analysis notebook is restarted. Arguments that can only be told apart 
+	by their memory address raise a TypeError:
+
+		cache 	= ResultCache('~/.cache/wbm')
+		angles 	= cache(calculate_3d_articulated_figure_angles)(df, predefined_schemas._ARTICULATED_FIGURE_ANGLES_3)
+
+	Args:
+		path: str, the directory the results are stored in; it is created if needed
+		max_bytes: int, the maximum total size of the stored results
+	"""
+	def __init__(self, path, max_bytes=2**30):
+		self._path 		= os.path.expanduser(path)
+		self._max_bytes = max_bytes
+		self._stats 	= {'hits': 0, 'misses': 0, 'evictions': 0}
+		os.makedirs(self._path, exist_ok=True)
+
+	@property
+	def path(self):
+		"""The directory the results are stored in."""
+		return self._path
+
+	@property
+	def stats(self):
+		"""The number of cache hits, misses and evicted results since the cache was created."""
+		return dict(self._stats)
+
+	def key(self, func, *args, **kwargs):
+		"""The cache key of calling `func` with `args` and `kwargs`, which also depends on the package version, 
+		so that the results of an older release are not reused after an upgrade."""
+		h = hashlib.blake2b(digest_size=20)
+		_update_hash(h, (_CACHE_FORMAT_VERSION, py_wholebodymovement.__version__, func.__module__, func.__qualname__, 
+						 _bind_arguments(func, args, kwargs)))
+		return h.hexdigest()
+
+	def _filename(self, key):
+		return os.path.join(self._path, key + _CACHE_FILE_SUFFIX)
+
+	def get(self, key, default=None):
+		"""The result stored under `key`, or `default` if there is none; a hit marks the result as recently used."""
+		filename = self._filename(key)
+		try:
+			with open(filename, 'rb') as f:
+				res = pickle.load(f)
+		except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+			self._stats['misses'] += 1
+			return default
+		os.utime(filename)
+		self._stats['hits'] += 1
+		return res
+
+	def put(self, key, value):
+		"""Store `value` under `key` and evict the least recently used results if the cache is over its size limit."""
+		filename = self._filename(key)
+		tmp_filename = '%s.%d.tmp'%(filename, os.getpid())
+		with open(tmp_filename, 'wb') as f:
+			pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp_filename, filename)
+		self._evict()
+
+	def _evict(self):
+		"""Remove the least recently used results until the cache fits in `max_bytes`."""
+		entries = [(entry.path, entry.stat()) for entry in os.scandir(self._path) if entry.name.endswith(_CACHE_FILE_SUFFIX)]
+		total 	= sum(stat.st_size for _, stat in entries)
+		for filename, stat in sorted(entries, key=lambda entry: entry[1].st_mtime_ns):
+			if total <= self._max_bytes:
+				break
+			try:
+				os.remove(filename)
+			except FileNotFoundError:
+				continue
+			total -= stat.st_size
+			self._stats['evictions'] += 1
+
+	def call(self, func, *args, **kwargs):
+		"""Return the cached result of `func(*args, **kwargs)`, calculating and storing it on a miss."""
+		key = self.key(func, *args, **kwargs)
+		res = self.get(key, _MISSING)
+		if res is _MISSING:
+			res = func(*args, **kwargs)
+			self.put(key, res)
+		return res
+
+	def __call__(self, func):
+		"""Wrap `func` so that its results are looked up in and stored to the cache."""
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+			return self.call(func, *args, **kwargs)
+		return wrapper
+
+	def clear(self):
+		"""Remove all the stored results."""
+		for entry in os.scandir(self._path):
+			if entry.name.endswith(_CACHE_FILE_SUFFIX):
+				os.remove(entry.path)
+
+_MISSING = object()
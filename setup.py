@@ -49,7 +49,7 @@ if __name__ == "__main__":
 
     setuptools.setup(
         name='py_wholebodymovement',
-        version='0.1.1',
+        version='0.1.2',
         description='Python library for modeling whole body movement kinematics.',
         long_description=LONG_DESCRIPTION,
         url='http://www.columbia.edu/~aa4348/py_wholebodymovement',
@@ -92,6 +92,9 @@ if __name__ == "__main__":
             "scikit-learn==0.22.1",
             "pywavelets"
         ],
+        extras_require={
+            "rendering": ["matplotlib"]
+        },
         include_package_data=True,
         zip_safe=False
     )